@@ -7,11 +7,63 @@ import json
 
 CONFIG_DIR = Path(__file__).parent / "config"
 
-def create_crew(client_type: str, processed_documents=None, ca_report_data=None):
+# Workflow profiles: "quick" runs one consolidated task, "full" the three-task workflow
+WORKFLOW_PROFILES = {
+    "quick": {"max_completion_tokens": 6000, "max_execution_time": 120},
+    "full": {"max_completion_tokens": 20000, "max_execution_time": 300},
+}
+
+# Inputs at or below these limits are handled by the quick profile
+QUICK_MAX_INPUT_CHARS = 15000
+QUICK_MAX_DOCUMENTS = 2
+QUICK_MAX_TRANSACTIONS = 300
+
+def select_workflow_profile(client_type: str, processed_documents=None, ca_report_data=None, requested_mode: str = "auto"):
+    """
+    Estimate input size and complexity and choose the quick or full ITR workflow
+    """
+    documents = processed_documents if isinstance(processed_documents, dict) else {}
+    doc_text = documents.get("condensed_text") or documents.get("combined_text", "") or ""
+    ca_text = (ca_report_data or {}).get("raw_content", "") or ""
+    doc_count = len(documents.get("individual_documents", []))
+    transaction_count = sum(m.get("transaction_count", 0) for m in documents.get("metadata", []))
+    input_chars = len(doc_text) + len(ca_text)
+    
+    estimate = {
+        "input_chars": input_chars,
+        "documents": doc_count,
+        "transactions": transaction_count,
+    }
+    
+    requested_mode = (requested_mode or "auto").lower()
+    if requested_mode in WORKFLOW_PROFILES:
+        return {"profile": requested_mode, "reason": "requested", **estimate}
+    
+    if client_type.lower() == "business":
+        reason = "business entities always use the full workflow"
+    elif input_chars > QUICK_MAX_INPUT_CHARS:
+        reason = f"input size {input_chars} chars exceeds {QUICK_MAX_INPUT_CHARS}"
+    elif doc_count > QUICK_MAX_DOCUMENTS:
+        reason = f"{doc_count} documents exceeds {QUICK_MAX_DOCUMENTS}"
+    elif transaction_count > QUICK_MAX_TRANSACTIONS:
+        reason = f"{transaction_count} transactions exceeds {QUICK_MAX_TRANSACTIONS}"
+    else:
+        return {"profile": "quick", "reason": "small, simple input", **estimate}
+    
+    return {"profile": "full", "reason": reason, **estimate}
+
+def create_crew(client_type: str, processed_documents=None, ca_report_data=None, profile: str = None):
     """
     Create focused CrewAI crew for ITR processing with complete output generation
+    
+    profile selects the workflow ("quick" or "full"); when omitted it is chosen
+    by select_workflow_profile from the input size.
     """
-    print(f"Creating ITR crew for client_type: {client_type}")
+    if profile not in WORKFLOW_PROFILES:
+        profile = select_workflow_profile(client_type, processed_documents, ca_report_data)["profile"]
+    profile_settings = WORKFLOW_PROFILES[profile]
+    
+    print(f"Creating ITR crew for client_type: {client_type} (profile: {profile})")
     print(f"CA report available: {ca_report_data is not None}")
     print(f"Documents provided: {len(processed_documents) if processed_documents else 0}")
     
@@ -31,7 +83,7 @@ def create_crew(client_type: str, processed_documents=None, ca_report_data=None)
         api_key=cerebras_api_key,
         base_url="https://api.cerebras.ai/v1",
         temperature=0.3,
-        max_completion_tokens=20000,
+        max_completion_tokens=profile_settings["max_completion_tokens"],
     )
     
     # Initialize Serper tool for web research
@@ -63,7 +115,10 @@ def create_crew(client_type: str, processed_documents=None, ca_report_data=None)
     }
     
     # Get tasks for the client type
-    selected_tasks = task_workflows.get(client_type.lower(), task_workflows["salaried"])
+    if profile == "quick":
+        selected_tasks = ["quick_itr_review"]
+    else:
+        selected_tasks = task_workflows.get(client_type.lower(), task_workflows["salaried"])
     
     # Create tasks
     task_instances = []
@@ -110,7 +165,7 @@ IMPORTANT: Provide a complete, detailed analysis. Do not just mention what you w
         process=Process.sequential,
         verbose=True,
         memory=False,  # Disable memory to avoid issues
-        max_execution_time=300  # 5 minute timeout
+        max_execution_time=profile_settings["max_execution_time"]
     )
     
     print(f"Created crew with {len(agents)} agents and {len(task_instances)} tasks")
@@ -131,9 +186,13 @@ def _build_task_context(processed_documents, ca_report_data, client_type):
     # Add document information
     if processed_documents:
         if isinstance(processed_documents, dict):
-            doc_text = processed_documents.get("combined_text", "")
+            doc_text = processed_documents.get("condensed_text") or processed_documents.get("combined_text", "")
             doc_count = len(processed_documents.get("individual_documents", []))
             context_parts.append(f"USER DOCUMENTS: {doc_count} documents processed")
+            statement_summary = processed_documents.get("statement_summary")
+            if statement_summary:
+                context_parts.append("PRECOMPUTED TRANSACTION TOTALS (use these figures, do not re-add raw transactions):")
+                context_parts.append(statement_summary)
             context_parts.append(f"DOCUMENT CONTENT PREVIEW: {doc_text[:1000]}...")
         else:
             context_parts.append(f"USER DOCUMENTS: {str(processed_documents)[:500]}...")
@@ -6,8 +6,10 @@ import shutil
 import re
 from datetime import datetime
 
-from .crew import create_crew
+from .crew import create_crew, select_workflow_profile, CONFIG_DIR
 from .utils.document_processor import ITRDocumentProcessor, CAReportFetcher
+from common.readiness import readiness, config_check, env_check
+from common.report_store import report_store
 
 router = APIRouter(prefix="/itr", tags=["ITR Agent"])
 
@@ -16,6 +18,10 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 
 templates = Jinja2Templates(directory="ITR_agent/templates")
 
+# Dependency checks for /ready
+readiness.register("config", "itr_agent", config_check(CONFIG_DIR / "agents.yaml", CONFIG_DIR / "tasks.yaml"))
+readiness.register("cerebras_api_key", "itr_agent", env_check("CEREBRAS_API_KEY"))
+
 @router.get("/")
 def itr_index(request: Request):
     """
@@ -40,25 +46,23 @@ async def list_ca_reports():
         all_reports = ca_fetcher.get_all_ca_reports()
         
         reports_info = []
-        for report_path in all_reports:
-            report_file = Path(report_path)
-            if report_file.exists():
-                # Extract info from filename
-                filename = report_file.name
-                # Example: CA_Report_business_20251002_234946.md
-                parts = filename.replace('.md', '').split('_')
-                if len(parts) >= 4:
-                    client_type = parts[2]
-                    timestamp = parts[3] + '_' + parts[4] if len(parts) > 4 else parts[3]
-                    
-                    reports_info.append({
-                        "file_path": report_path,
-                        "filename": filename,
-                        "client_type": client_type,
-                        "timestamp": timestamp,
-                        "size": report_file.stat().st_size,
-                        "modified": report_file.stat().st_mtime
-                    })
+        for report in all_reports:
+            # Extract info from filename
+            filename = report.filename
+            # Example: CA_Report_business_20251002_234946.md
+            parts = filename.replace('.md', '').split('_')
+            if len(parts) >= 4:
+                client_type = parts[2]
+                timestamp = parts[3] + '_' + parts[4] if len(parts) > 4 else parts[3]
+                
+                reports_info.append({
+                    "filename": filename,
+                    "client_type": client_type,
+                    "timestamp": timestamp,
+                    "size": report.size,
+                    "modified": report.created_at,
+                    "content_hash": report.digest
+                })
         
         return JSONResponse(content={
             "available_reports": reports_info,
@@ -72,10 +76,14 @@ async def list_ca_reports():
 async def analyze_itr_documents(
     client_type: str = Form(...),
     ca_markdown: str = Form(...),
-    files: list[UploadFile] = File(...)
+    files: list[UploadFile] = File(...),
+    mode: str = Form(default="auto")
 ):
     """
     ITR document analysis endpoint with direct CA report markdown input
+    
+    mode: "auto" picks the quick or full workflow from the input size,
+    "quick" or "full" force a profile
     """
     saved_files = []
     for file in files:
@@ -107,11 +115,21 @@ async def analyze_itr_documents(
         print(f"Using direct CA markdown input (length: {len(ca_markdown)})")
         print(f"Processing {len(saved_files)} additional documents")
         
+        # Choose the workflow profile from input size and complexity
+        workflow = select_workflow_profile(
+            client_category,
+            processed_data["user_documents"],
+            ca_report_data,
+            mode
+        )
+        print(f"Selected ITR workflow profile: {workflow['profile']} ({workflow['reason']})")
+        
         # Create crew with processed documents and direct CA markdown data
         crew, task_name = create_crew(
             client_category, 
             processed_data["user_documents"], 
-            ca_report_data
+            ca_report_data,
+            profile=workflow["profile"]
         )
         
         # Execute the crew with enhanced error handling
@@ -195,12 +213,9 @@ BASIC RECOMMENDATIONS:
 This is a fallback report. Please try again or contact support for detailed analysis.
 """
         
-        # Save the ITR analysis report
-        markdown_dir = Path("./ITR_agent/output_reports")
-        markdown_dir.mkdir(exist_ok=True)
+        # Save the ITR analysis report in the shared report store
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"ITR_TaxReduction_Report_{client_type}_{timestamp}.md"
-        file_path = markdown_dir / filename
         
         markdown_content = f"# ITR Tax Reduction Report - {client_type.upper()}\n\n"
         markdown_content += f"*Generated:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
@@ -208,21 +223,23 @@ This is a fallback report. Please try again or contact support for detailed anal
         markdown_content += f"*CA Report Used:* {'Yes (Direct Input)' if ca_markdown and len(ca_markdown.strip()) > 0 else 'No'}\n\n"
         markdown_content += f"*CA Report Length:* {len(ca_markdown) if ca_markdown else 0} characters\n\n"
         markdown_content += f"*Documents Processed:* {len(saved_files)}\n\n"
+        markdown_content += f"*Workflow Profile:* {workflow['profile']}\n\n"
         markdown_content += "---\n\n"
         markdown_content += result_content
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        stored = report_store.put("itr", filename, markdown_content)
         
         return JSONResponse(content={
             "task": task_name,
             "result": result_content,
             "markdown": markdown_content,
-            "file_saved": str(file_path),
+            "file_saved": stored.filename,
+            "content_hash": stored.digest,
             "ca_report_used": bool(ca_markdown and len(ca_markdown.strip()) > 0),
             "ca_report_length": len(ca_markdown) if ca_markdown else 0,
             "files_processed": len(saved_files),
             "client_category": client_category,
+            "workflow_profile": workflow,
             "document_processing_status": "success"
         })
         
@@ -3,6 +3,9 @@ import PyPDF2
 from pathlib import Path
 import re
 
+from common.statement_summarizer import summarize_statement
+from common.report_store import report_store
+
 class ITRDocumentProcessor:
     """
     Enhanced document processor for ITR agent with CA report matching logic
@@ -147,8 +150,22 @@ class ITRDocumentProcessor:
                 print(f"Error processing {file_path}: {str(e)}")
                 continue
         
+        # Replace bank statement / ledger rows with computed summaries for the crew
+        statement_summaries = []
+        condensed_text = []
+        for text, metadata in zip(all_text, document_metadata):
+            summary = summarize_statement(text)
+            if summary:
+                metadata["transaction_count"] = summary["transaction_count"]
+                statement_summaries.append(f"[{Path(metadata['file_path']).name}]\n{summary['summary_markdown']}")
+                condensed_text.append(summary["residual_text"])
+            else:
+                condensed_text.append(text)
+        
         return {
             "combined_text": "\n\n--- Document Separator ---\n\n".join(all_text),
+            "condensed_text": "\n\n--- Document Separator ---\n\n".join(condensed_text),
+            "statement_summary": "\n\n".join(statement_summaries),
             "individual_documents": all_text,
             "metadata": document_metadata
         }
@@ -271,40 +288,37 @@ class ITRDocumentProcessor:
 
 class CAReportFetcher:
     """
-    Utility to fetch the latest CA report for a client
+    Utility to fetch the latest CA report for a client from the shared report store
     """
-    def __init__(self, ca_reports_dir="./ca_agent/markdown_files"):
-        self.ca_reports_dir = Path(ca_reports_dir)
+    def __init__(self, store=None):
+        self.store = store or report_store
     
     def get_latest_ca_report(self, client_type=None):
         """
-        Get the latest CA report file path
+        Get the latest CA report, preferring reports for client_type when any exist
         """
-        if not self.ca_reports_dir.exists():
-            return None
-        
-        # Get all markdown files
-        markdown_files = list(self.ca_reports_dir.glob("CA_Report_*.md"))
+        reports = self.get_all_ca_reports()
         
-        if not markdown_files:
+        if not reports:
             return None
         
         # Filter by client type if specified
         if client_type:
-            filtered_files = [f for f in markdown_files if client_type.lower() in f.name.lower()]
-            if filtered_files:
-                markdown_files = filtered_files
+            filtered_reports = [r for r in reports if client_type.lower() in r.filename.lower()]
+            if filtered_reports:
+                reports = filtered_reports
         
-        # Sort by modification time and return the latest
-        latest_file = max(markdown_files, key=lambda f: f.stat().st_mtime)
-        return str(latest_file)
+        # Reports are listed newest first
+        return reports[0]
     
     def get_all_ca_reports(self):
         """
-        Get all CA report file paths
+        Get all CA reports, newest first
         """
-        if not self.ca_reports_dir.exists():
-            return []
-        
-        markdown_files = list(self.ca_reports_dir.glob("CA_Report_*.md"))
-        return [str(f) for f in sorted(markdown_files, key=lambda f: f.stat().st_mtime, reverse=True)]
\ No newline at end of file
+        return self.store.list("ca", prefix="CA_Report_")
+    
+    def read_ca_report(self, report):
+        """
+        Decompressed markdown of a CA report
+        """
+        return self.store.read_bytes(report).decode("utf-8")
@@ -9,13 +9,30 @@ from assest_agent.router import router as asset_router
 from chatbot.router import router as chatbot_router  # 🧠 Added chatbot router
 from pathlib import Path
 from pict_route import router as pict_router
+from common.readiness import readiness, http_check
+from common.cerebras_client import cerebras_client
+from contextlib import asynccontextmanager
 import logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 
+# Shared LLM endpoints; agents register their own checks when their routers are imported
+readiness.register("cerebras_endpoint", "llm", http_check("https://api.cerebras.ai/v1/models"))
+readiness.register("gemini_endpoint", "llm", http_check("https://generativelanguage.googleapis.com/"), critical=False)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Readiness checks run in the background; probes only read the cached result
+    readiness.ensure_started()
+    # One pooled Cerebras client for the whole process
+    await cerebras_client.start()
+    yield
+    await cerebras_client.aclose()
+    await readiness.stop()
+
 # Create main FastAPI app
-app = FastAPI(title="Multi-Agent CrewAI Orchestrator", version="1.0.0")
+app = FastAPI(title="Multi-Agent CrewAI Orchestrator", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -94,14 +111,22 @@ async def root():
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint
+    Liveness probe: the process is up (dependencies are reported by /ready)
     """
     return {
-        "status": "healthy",
+        **readiness.liveness(),
         "agents": ["ca_agent", "secure_ca_agent", "itr_agent", "equity_agent", "asset_agent", "chatbot"],
         "encryption": "enabled"
     }
 
+@app.get("/ready")
+async def ready_check():
+    """
+    Readiness probe: cached results of every agent's dependency checks (503 until ready)
+    """
+    readiness.ensure_started()
+    return readiness.readiness_response()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
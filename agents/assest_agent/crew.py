@@ -8,6 +8,8 @@ OPTIMIZATIONS APPLIED:
 4. Limited agent iterations and added execution timeouts
 5. Simplified task dependencies to minimize sequential waits
 6. Reduced financial report content limit to 2000 chars
+7. Financial capacity (surplus, EMI, loan eligibility) computed in Python; the
+   Calculate_Financial_Capacity task is skipped when the report states income and expenses
 
 PERFORMANCE COMPARISON:
 - CA Agent: 1 task, sequential process, ~3000 tokens
@@ -35,6 +37,12 @@ from crewai_tools import SerperDevTool
 # from .utils.document_processor import (
 # 	process_financial_documents,
 # )
+from .utils.capacity_calculator import build_capacity_report
+from .utils.location_research import location_research_store
+from common.report_store import report_store
+
+# Name of the live web research task; its output is cached per location
+RESEARCH_TASK_NAME = "Scrape_Live_Investment_Options"
 
 ROOT = Path(__file__).resolve().parent
 
@@ -43,14 +51,13 @@ MAIN_ENV_PATH = ROOT.parent / ".env"  # Path to main agents/.env
 load_dotenv(MAIN_ENV_PATH)
 
 CONFIG_DIR = ROOT / "config"
-REPORTS_DIR = ROOT.parent / "reports"
 INPUT_DIR = ROOT / "input_files"
 
 
 # Helper functions removed - now using direct YAML loading like other agents
 
 
-def create_crew(location: str, financial_report_content: Optional[str] = None, fast_mode: bool = True, include_serper: bool = True) -> Crew:
+def create_crew(location: str, financial_report_content: Optional[str] = None, fast_mode: bool = True, include_serper: bool = True, precompute_capacity: bool = True, use_research_cache: bool = True) -> Crew:
 	"""
 	Create CrewAI crew for asset investment analysis
 	Optimized for performance to match CA agent speed and token efficiency
@@ -60,6 +67,10 @@ def create_crew(location: str, financial_report_content: Optional[str] = None, f
 		financial_report_content (str, optional): Financial report content to analyze
 		fast_mode (bool): If True, uses optimized approach for faster execution
 		include_serper (bool): If True, includes Serper-based market data even in fast mode
+		precompute_capacity (bool): If True, surplus, EMI and loan eligibility are calculated
+			in Python and the Calculate_Financial_Capacity task is skipped when possible
+		use_research_cache (bool): If True, a city profile or cached research for the location
+			replaces the live Scrape_Live_Investment_Options task
 	
 	Returns:
 		tuple: (crew, report_type) for consistency with CA agent
@@ -141,13 +152,49 @@ def create_crew(location: str, financial_report_content: Optional[str] = None, f
 		tool_count = len(agent.tools) if hasattr(agent, 'tools') and agent.tools else 0
 		print(f"  - {agent_def['name']}: {tool_count} tools, delegation: {agent.allow_delegation}, verbose: {agent.verbose}")
 	
+	# Capacity figures are calculated exactly whenever the report states income and expenses
+	capacity = build_capacity_report(financial_report_content) if precompute_capacity else None
+	capacity_block = ""
+	if capacity:
+		print("Financial capacity precomputed from the report")
+		capacity_block = f"""
+	
+	=== PRECOMPUTED FINANCIAL CAPACITY (replaces Calculate_Financial_Capacity) ===
+	These figures were calculated exactly from the user's financial statement.
+	Use them as-is and do not recompute them.
+	{capacity['markdown']}
+	=== END OF FINANCIAL CAPACITY ===
+	"""
+	
 	# Task creation - always use full mode when Serper is enabled for comprehensive analysis
 	task_instances = []
 	
 	if include_serper:
 		# FULL MODE: Execute all tasks for comprehensive analysis with live data scraping
 		print("Using FULL MODE with Serper: All tasks will be executed for comprehensive investment analysis")
+		
+		# Repeated cities reuse earlier research instead of searching the web again
+		research = location_research_store.lookup(location) if use_research_cache else None
+		research_block = ""
+		if research:
+			print(f"Using {research['source']} for {location} (age: {research['age_hours']} hours)")
+			research_block = f"""
+		
+		=== LOCATION RESEARCH ({research['source'].upper().replace('_', ' ')} - REPLACES {RESEARCH_TASK_NAME}) ===
+		No live research ran for this request. Treat the data below as the scraped investment options.
+		{research['markdown']}
+		=== END OF LOCATION RESEARCH ===
+		"""
+		
 		for task_config in tasks_yaml["tasks"]:
+			# The capacity task is replaced by the precomputed figures
+			if capacity and task_config["name"] == "Calculate_Financial_Capacity":
+				print("Skipping Calculate_Financial_Capacity: figures precomputed")
+				continue
+			if research and task_config["name"] == RESEARCH_TASK_NAME:
+				print(f"Skipping {RESEARCH_TASK_NAME}: location research cached")
+				continue
+			
 			# Find the agent for this task
 			agent_name = task_config["agent"]
 			assigned_agent = None
@@ -170,13 +217,20 @@ def create_crew(location: str, financial_report_content: Optional[str] = None, f
 			if task_config["agent"] == "Financial_Profile_Analyzer" and financial_report_content:
 				report_content = financial_report_content[:2000] if len(financial_report_content) > 2000 else financial_report_content
 				task_description += f"\n=== FINANCIAL STATEMENT TO ANALYZE ===\n{report_content}\n"
+			# The research output is cached per city and shared across clients, so it must
+			# not see this client's figures (neither the capacity block nor earlier outputs)
+			is_research = task_config["name"] == RESEARCH_TASK_NAME
+			if not is_research:
+				task_description += capacity_block + research_block
 			
 			# Create task with explicit output format
 			task = Task(
+				name=task_config["name"],
 				description=task_description + "\n\nIMPORTANT: Return your response as a single, well-formatted text string. Do not return lists, arrays, or other data structures.",
 				expected_output=task_config["expected_output"] + "\n\nFormat: Single text string with markdown formatting.",
 				agent=assigned_agent,
-				output_format="string"  # Ensure string output
+				output_format="string",  # Ensure string output
+				**({"context": []} if is_research else {})
 			)
 			task_instances.append(task)
 	
@@ -223,6 +277,11 @@ def create_crew(location: str, financial_report_content: Optional[str] = None, f
 				Replace all placeholders with real calculated amounts based on the provided information.
 				If any specific amount is not clearly stated, indicate "Amount not specified in data" and proceed with analysis.
 				"""
+				if capacity:
+					comprehensive_description += capacity_block + """
+				Present the precomputed figures above in the report and build the investment
+				capacity analysis, loan eligibility and asset allocation on them.
+				"""
 			else:
 				comprehensive_description += """
 				
@@ -263,15 +322,76 @@ def create_crew(location: str, financial_report_content: Optional[str] = None, f
 	return crew, "asset_investment_analysis"
 
 
+def create_research_crew(location: str):
+	"""
+	Crew that runs only the live investment research task for a location
+	Used by the offline refresh command to warm the location research cache.
+	"""
+	with open(CONFIG_DIR / "agents.yaml", "r") as f:
+		agents_yaml = yaml.safe_load(f)
+	with open(CONFIG_DIR / "tasks.yaml", "r") as f:
+		tasks_yaml = yaml.safe_load(f)
+	
+	api_key = os.getenv("CEREBRAS_API_KEY")
+	if not api_key:
+		raise ValueError("CEREBRAS_API_KEY environment variable not found. Please check your .env file.")
+	if not os.getenv("SERPER_API_KEY"):
+		raise ValueError("SERPER_API_KEY environment variable not found. Live research needs web search.")
+	
+	llm = LLM(
+		model="cerebras/gpt-oss-120b",
+		api_key=api_key,
+		base_url="https://api.cerebras.ai/v1",
+		temperature=0.7,
+		max_completion_tokens=10000,
+		timeout=180,
+		max_retries=1,
+	)
+	
+	task_config = next(t for t in tasks_yaml["tasks"] if t["name"] == RESEARCH_TASK_NAME)
+	agent_def = next(a for a in agents_yaml["agents"] if a["name"] == task_config["agent"])
+	agent = Agent(
+		role=agent_def["role"],
+		goal=agent_def["goal"],
+		backstory=agent_def.get("backstory", ""),
+		llm=llm,
+		verbose=False,
+		allow_delegation=False,
+		tools=[SerperDevTool()],
+		max_execution_time=900,
+		max_iter=5,
+	)
+	task = Task(
+		name=RESEARCH_TASK_NAME,
+		description=task_config["description"] + f"\n\n=== USER LOCATION ===\n{location}\n",
+		expected_output=task_config["expected_output"],
+		agent=agent,
+	)
+	crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=False, memory=False)
+	return crew, "location_research"
+
+
+def cache_research_output(location: str, result, store=None) -> bool:
+	"""
+	Store the live research task's output from a crew result in the location cache
+	Returns False when the research task did not run (e.g. it was served from the cache).
+	"""
+	for task_output in getattr(result, "tasks_output", None) or []:
+		if getattr(task_output, "name", None) == RESEARCH_TASK_NAME and getattr(task_output, "raw", None):
+			(store or location_research_store).store_research(location, str(task_output.raw))
+			return True
+	return False
+
+
 def save_report_to_md(report_content: str, report_type: str, location: str) -> str:
-	REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+	"""
+	Save a markdown report in the shared report store and return its filename
+	"""
 	safe_loc = "".join(c for c in location if c.isalnum() or c in ("-", "_")) or "unknown"
 	ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 	filename = f"{report_type}_{safe_loc}_{ts}.md"
-	out_path = REPORTS_DIR / filename
-	with open(out_path, "w", encoding="utf-8") as f:
-		f.write(report_content)
-	return str(out_path)
+	report_store.put("asset", filename, report_content)
+	return filename
 
 
 def process_financial_report(file_path: str) -> str:
@@ -282,6 +402,12 @@ def process_financial_report(file_path: str) -> str:
 			content = p.read_text(encoding="utf-8")
 			# Limit content size
 			return content[:2000] + "..." if len(content) > 2000 else content
+		elif p.suffix.lower() in {".csv", ".xlsx", ".xls"}:
+			# Tabular exports are streamed and reduced to aggregates before reaching the LLM
+			from .utils.document_processor import process_csv_file, process_excel_file
+			processed = process_csv_file(str(p)) if p.suffix.lower() == ".csv" else process_excel_file(str(p))
+			content = processed["content"]
+			return content[:2000] + "..." if len(content) > 2000 else content
 		else:
 			return f"File type {p.suffix} not supported in simplified mode"
 	except Exception as e:
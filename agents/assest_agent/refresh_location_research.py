@@ -0,0 +1,69 @@
+"""
+Refresh the asset agent's location research cache and city profiles offline
+
+Usage (from the agents/ directory):
+    python -m assest_agent.refresh_location_research --cities Pune Mumbai Bengaluru
+    python -m assest_agent.refresh_location_research --profiles city_profiles.json
+    python -m assest_agent.refresh_location_research --list
+    python -m assest_agent.refresh_location_research --prune
+
+--cities runs the live Investment_Researcher task for each city and caches the output.
+--profiles merges curated profiles into the bundled dataset; the file is a JSON list
+(or {"cities": [...]}) of objects with "city" and any of "price_bands",
+"infrastructure", "growth_indicators", "research" and "updated_at".
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from .utils.location_research import LocationResearchStore, RESEARCH_TTL_HOURS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the asset agent's location research cache")
+    parser.add_argument("--cities", nargs="+", help="Cities to research live and cache")
+    parser.add_argument("--profiles", type=Path, help="JSON file of curated city profiles to merge into the dataset")
+    parser.add_argument("--list", action="store_true", help="Show cached locations and bundled profiles")
+    parser.add_argument("--prune", action="store_true", help=f"Delete research older than {RESEARCH_TTL_HOURS:g} hours")
+    parser.add_argument("--db", type=Path, default=None, help="Research cache location (defaults to ASSET_LOCATION_RESEARCH_DB)")
+    parser.add_argument("--profiles-path", type=Path, default=None, help="Bundled dataset location (defaults to ASSET_CITY_PROFILES)")
+    args = parser.parse_args()
+
+    if not (args.cities or args.profiles or args.list or args.prune):
+        parser.error("provide --cities, --profiles, --list or --prune")
+
+    store = LocationResearchStore(args.db, args.profiles_path)
+
+    if args.profiles:
+        data = json.loads(args.profiles.read_text(encoding="utf-8"))
+        profiles = data.get("cities", []) if isinstance(data, dict) else data
+        store.save_profiles(profiles)
+        print(f"Merged {len(profiles)} city profiles into {store.profiles_path}")
+
+    if args.cities:
+        # Imported here so --list/--profiles work without the crew dependencies
+        from .crew import create_research_crew, cache_research_output
+
+        for city in args.cities:
+            print(f"Researching {city}...")
+            try:
+                crew, _ = create_research_crew(city)
+                result = crew.kickoff()
+                if not cache_research_output(city, result, store):
+                    store.store_research(city, str(result))
+            except Exception as e:
+                print(f"Research failed for {city}: {e}")
+
+    if args.prune:
+        print(f"Pruned {store.prune()} expired locations")
+
+    if args.list:
+        print(json.dumps({
+            "research_cache": store.list_research(),
+            "city_profiles": sorted(store.profiles()),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import Optional
@@ -7,7 +7,10 @@ import os
 from pathlib import Path
 import shutil
 import datetime
-from .crew import create_crew, save_report_to_md, process_financial_report
+from .crew import create_crew, save_report_to_md, process_financial_report, cache_research_output, CONFIG_DIR
+from common.report_responses import stored_report_response
+from common.report_store import report_store
+from common.readiness import readiness, config_check, env_check
 import asyncio
 import json
 
@@ -16,6 +19,11 @@ router = APIRouter(tags=["Asset Investment Agent"])
 # Setup templates
 templates = Jinja2Templates(directory="assest_agent/templates")
 
+# Dependency checks for /ready; without Serper the asset crew runs without web search
+readiness.register("config", "asset_agent", config_check(CONFIG_DIR / "agents.yaml", CONFIG_DIR / "tasks.yaml"))
+readiness.register("cerebras_api_key", "asset_agent", env_check("CEREBRAS_API_KEY"))
+readiness.register("serper_api_key", "asset_agent", env_check("SERPER_API_KEY"), critical=False)
+
 # Ensure upload directory exists
 UPLOAD_DIR = Path("./assest_agent/input_files")
 UPLOAD_DIR.mkdir(exist_ok=True)
@@ -144,6 +152,12 @@ async def analyze_asset_investment(
             else:
                 return repr(obj)
         
+        # Keep fresh live research so the next request for this city can skip it
+        try:
+            cache_research_output(location, result)
+        except Exception as e:
+            print(f"Could not cache location research: {e}")
+        
         # Check if result has tasks_output (from multiple tasks)
         if hasattr(result, 'tasks_output') and result.tasks_output:
             # Combine outputs from all tasks
@@ -174,10 +188,6 @@ async def analyze_asset_investment(
         if not result_content or result_content.strip() == "":
             result_content = f"Multi-task asset investment analysis completed for {location}. Analysis includes financial capacity, real estate research, debt fund research, and final investment strategy."
         
-        # Ensure reports directory exists
-        reports_dir = Path("reports")
-        reports_dir.mkdir(exist_ok=True)
-        
         # Format the result as proper markdown
         formatted_result = f"""# Asset Investment Analysis Report
 
@@ -238,39 +248,31 @@ async def list_reports():
     List all generated reports
     """
     try:
-        reports_dir = Path("reports")
-        if not reports_dir.exists():
-            return {"reports": []}
-        
-        reports = []
-        for file_path in reports_dir.glob("*.md"):
-            reports.append({
-                "filename": file_path.name,
-                "created": file_path.stat().st_mtime,
-                "size": file_path.stat().st_size
-            })
+        reports = [{
+            "filename": report.filename,
+            "created": report.created_at,
+            "size": report.size
+        } for report in report_store.list("asset")]
         
-        return {"reports": sorted(reports, key=lambda x: x["created"], reverse=True)}
+        return {"reports": reports}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing reports: {str(e)}")
 
 @router.get("/reports/{filename}")
-async def download_report(filename: str):
+async def download_report(filename: str, request: Request):
     """
-    Download a specific report file
+    Download a specific report file (supports ETag, Range and gzip/brotli)
     """
     try:
-        report_path = Path("reports") / filename
-        if not report_path.exists():
+        report = report_store.get("asset", filename)
+        if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         
-        return FileResponse(
-            path=str(report_path),
-            filename=filename,
-            media_type="text/markdown"
-        )
+        return stored_report_response(request, report, media_type="text/markdown", download_name=filename)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error downloading report: {str(e)}")
 
@@ -278,39 +280,20 @@ async def download_report(filename: str):
 async def health_check():
     """
     Health check endpoint for the asset investment agent
+    Served from the cached readiness checks; no crew is built per probe.
     """
-    try:
-        # Test environment variables
-        api_key = os.getenv("CEREBRAS_API_KEY")
-        api_key_status = "present" if api_key else "missing"
-        
-        # Test crew creation (without running it)
-        test_crew, test_report_type = create_crew(location="test", financial_report_content=None)
-        crew_status = "created successfully"
-        
-        return {
-            "status": "healthy",
-            "agent": "asset_investment_agent",
-            "api_key": api_key_status,
-            "crew_creation": crew_status,
-            "capabilities": [
-                "Financial capacity analysis",
-                "Real estate market research", 
-                "Investment strategy recommendations",
-                "Report generation and storage",
-                "Markdown report output"
-            ]
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "agent": "asset_investment_agent",
-            "error": str(e),
-            "capabilities": [
-                "Financial capacity analysis",
-                "Real estate market research", 
-                "Investment strategy recommendations",
-                "Report generation and storage",
-                "Markdown report output"
-            ]
-        }
+    agent_status = readiness.agent_status("asset_agent")
+    api_key_check = agent_status["checks"].get("cerebras_api_key")
+    return {
+        "status": "healthy" if agent_status["status"] == "ready" else agent_status["status"],
+        "agent": "asset_investment_agent",
+        "api_key": ("present" if api_key_check["ok"] else "missing") if api_key_check else "unknown",
+        "checks": agent_status["checks"],
+        "capabilities": [
+            "Financial capacity analysis",
+            "Real estate market research", 
+            "Investment strategy recommendations",
+            "Report generation and storage",
+            "Markdown report output"
+        ]
+    }
@@ -0,0 +1,252 @@
+"""
+Deterministic financial capacity calculation for the asset agent
+Extracts income, expenses, existing EMIs, savings and outstanding loans from the
+financial report and computes the Calculate_Financial_Capacity figures exactly:
+monthly surplus, immediate investment capacity, affordable EMI and home-loan
+eligibility. EMI and eligibility grids are vectorized over tenures x interest rates.
+"""
+
+import re
+from typing import Dict, Optional
+
+import numpy as np
+
+from .financial_scanner import AMOUNT_PATTERN, parse_amount, scan_financial_text
+
+TENURES_YEARS = np.array([10, 15, 20, 25, 30])
+ANNUAL_RATES = np.array([8.0, 8.5, 9.0, 9.5, 10.0])
+# Rate and tenure used for the headline eligibility figure
+REFERENCE_RATE = 8.5
+REFERENCE_TENURE = 20
+INCOME_MULTIPLES = (5, 6)
+# EMI-affordability band as a share of the monthly surplus
+EMI_SURPLUS_SHARES = (0.40, 0.50)
+EMERGENCY_FUND_MONTHS = 6
+LOAN_TO_VALUE = 0.80
+# Stamp duty, registration and other purchase costs on top of the down payment
+PURCHASE_COST_RATE = 0.07
+
+# Baseline split of the immediate investment capacity, before the strategist's judgement
+BASELINE_ALLOCATION = {
+    "Real Estate Down Payment Reserve": 0.40,
+    "Debt Mutual Funds": 0.20,
+    "Government Bonds / T-Bills": 0.15,
+    "Certificates of Deposit": 0.15,
+    "Sovereign Gold Bonds": 0.10,
+}
+
+_SEPARATOR = r"[\s:|*=\-]*"
+
+FIELD_PATTERNS = {
+    "monthly_income": r"(?:net\s+|gross\s+|total\s+)?monthly\s+(?:net\s+)?(?:income|salary|take[- ]home)|take[- ]home(?:\s+pay|\s+salary)?|net\s+salary|salary\s+per\s+month",
+    "annual_income": r"(?:gross\s+|net\s+|total\s+)?(?:annual|yearly)\s+(?:gross\s+|net\s+)?(?:income|salary|ctc)|ctc|income\s+per\s+annum",
+    "monthly_expenses": r"(?:total\s+|average\s+)?monthly\s+(?:household\s+|living\s+)?(?:expenses|expenditure|outgoings|spend(?:ing)?)",
+    "existing_emi": r"(?:existing|current|total|monthly)\s+(?:loan\s+)?emis?|loan\s+emis?",
+    "liquid_savings": r"(?:total\s+)?(?:savings|bank\s+balance|liquid\s+(?:assets|funds|savings)|cash\s+(?:in\s+hand|balance)|fixed\s+deposits?)",
+    "outstanding_loans": r"(?:total\s+)?(?:outstanding\s+(?:loans?|debt)(?:\s+(?:balance|amount))?|loans?\s+(?:outstanding|balance)|outstanding(?:\s+balance)?)",
+}
+
+# Labels that must start a line, list item or table cell: "savings" alone also matches
+# "Tax savings: ₹46,800" or "potential savings of ₹..." in running text
+ANCHORED_FIELDS = {"liquid_savings"}
+_LABEL_START = r"(?:^|\|)[ \t>*\-•]*"
+
+_FIELD_REGEXES = {
+    field: re.compile(
+        rf"{_LABEL_START if field in ANCHORED_FIELDS else ''}(?:{pattern}){_SEPARATOR}{AMOUNT_PATTERN}"
+        rf"(?P<period>\s*(?:/|per|a)\s*(?:month|mo|annum|year|yr))?",
+        re.IGNORECASE | re.MULTILINE,
+    )
+    for field, pattern in FIELD_PATTERNS.items()
+}
+
+
+def extract_financial_profile(text: str) -> Dict[str, Optional[float]]:
+    """
+    Pull the monthly figures the capacity calculation needs out of a report
+
+    Amounts labelled per year are converted to monthly; missing fields are None.
+    """
+    found: Dict[str, Optional[float]] = {}
+    for field, regex in _FIELD_REGEXES.items():
+        match = regex.search(text)
+        if not match:
+            found[field] = None
+            continue
+        value = parse_amount(match.group("amount"), match.group("unit"))
+        period = (match.group("period") or "").lower()
+        if field == "annual_income" and "mo" in period:
+            value *= 12
+        elif field in ("monthly_income", "monthly_expenses", "existing_emi") and ("annum" in period or "y" in period):
+            value /= 12
+        found[field] = value
+
+    monthly_income = found["monthly_income"]
+    if monthly_income is None and found["annual_income"]:
+        monthly_income = found["annual_income"] / 12
+    if monthly_income is None:
+        # Fall back to the generic scanner: the largest income figure, annual if it looks like one
+        income_values = scan_financial_text(text)["metrics"].get("income", {}).get("values", [])
+        if income_values:
+            largest = max(income_values)
+            monthly_income = largest / 12 if largest >= 500000 else largest
+
+    return {
+        "monthly_income": monthly_income,
+        "monthly_expenses": found["monthly_expenses"],
+        "existing_emi": found["existing_emi"] or 0.0,
+        "liquid_savings": found["liquid_savings"],
+        "outstanding_loans": found["outstanding_loans"] or 0.0,
+    }
+
+
+def emi(principal, annual_rate, tenure_years):
+    """
+    Monthly EMI for a loan; broadcasts over NumPy arrays of rates and tenures
+    """
+    r = np.asarray(annual_rate, dtype=float) / 12 / 100
+    n = np.asarray(tenure_years, dtype=float) * 12
+    growth = (1 + r) ** n
+    return np.asarray(principal, dtype=float) * r * growth / (growth - 1)
+
+
+def loan_for_emi(monthly_emi, annual_rate, tenure_years):
+    """
+    Principal serviceable by a monthly EMI; broadcasts over NumPy arrays of rates and tenures
+    """
+    r = np.asarray(annual_rate, dtype=float) / 12 / 100
+    n = np.asarray(tenure_years, dtype=float) * 12
+    growth = (1 + r) ** n
+    return np.asarray(monthly_emi, dtype=float) * (growth - 1) / (r * growth)
+
+
+def calculate_capacity(profile: Dict[str, Optional[float]]) -> Optional[Dict]:
+    """
+    Compute the financial capacity figures from an extracted profile
+
+    Returns None when income or expenses are unknown: the surplus, EMI and emergency
+    fund all depend on expenses, and treating a missing figure as 0 would overstate them.
+    """
+    income = profile.get("monthly_income")
+    expenses = profile.get("monthly_expenses")
+    if not income or expenses is None:
+        return None
+    existing_emi = profile.get("existing_emi") or 0.0
+    savings = profile.get("liquid_savings") or 0.0
+
+    monthly_surplus = max(income - expenses - existing_emi, 0.0)
+    emergency_fund = EMERGENCY_FUND_MONTHS * (expenses + existing_emi)
+    immediate_capacity = max(savings - emergency_fund, 0.0)
+
+    conservative_emi, stretch_emi = (monthly_surplus * share for share in EMI_SURPLUS_SHARES)
+
+    # Eligibility grid: rows are tenures, columns are rates
+    rates, tenures = np.meshgrid(ANNUAL_RATES, TENURES_YEARS)
+    eligibility_grid = loan_for_emi(conservative_emi, rates, tenures)
+    emi_per_10_lakh = emi(1_000_000, rates, tenures)
+
+    reference = loan_for_emi(conservative_emi, REFERENCE_RATE, REFERENCE_TENURE).item()
+    annual_income = income * 12
+    income_multiple = {
+        multiple: max(annual_income * multiple - (profile.get("outstanding_loans") or 0.0), 0.0)
+        for multiple in INCOME_MULTIPLES
+    }
+
+    property_value = reference / LOAN_TO_VALUE
+    down_payment = property_value - reference
+    upfront_cash = down_payment + property_value * PURCHASE_COST_RATE
+
+    return {
+        "monthly_income": income,
+        "annual_income": annual_income,
+        "monthly_expenses": expenses,
+        "existing_emi": existing_emi,
+        "liquid_savings": savings,
+        "outstanding_loans": profile.get("outstanding_loans") or 0.0,
+        "monthly_surplus": monthly_surplus,
+        "emergency_fund": emergency_fund,
+        "immediate_capacity": immediate_capacity,
+        "affordable_emi": conservative_emi,
+        "stretch_emi": stretch_emi,
+        "loan_eligibility_income_multiple": income_multiple,
+        "loan_eligibility_emi": reference,
+        "property_value": property_value,
+        "down_payment": down_payment,
+        "upfront_cash": upfront_cash,
+        "eligibility_grid": eligibility_grid,
+        "emi_per_10_lakh": emi_per_10_lakh,
+        "allocation": {name: immediate_capacity * share for name, share in BASELINE_ALLOCATION.items()},
+    }
+
+
+def _inr(value: float) -> str:
+    return f"₹{value:,.0f}"
+
+
+def format_capacity_tables(figures: Dict) -> str:
+    """
+    Markdown tables of the computed capacity figures for prompt injection
+    """
+    low, high = INCOME_MULTIPLES
+    conservative, stretch = (int(share * 100) for share in EMI_SURPLUS_SHARES)
+    lines = [
+        "## User Financial Capacity Analysis (computed)",
+        "",
+        "| Metric | Amount | Basis |",
+        "|--------|--------|-------|",
+        f"| Monthly Income | {_inr(figures['monthly_income'])} | Extracted from report |",
+        f"| Monthly Expenses | {_inr(figures['monthly_expenses'])} | Extracted from report |",
+        f"| Existing EMIs | {_inr(figures['existing_emi'])} | Extracted from report |",
+        f"| **Monthly Investable Surplus** | **{_inr(figures['monthly_surplus'])}** | Income - expenses - existing EMIs |",
+        f"| Emergency Fund Reserve | {_inr(figures['emergency_fund'])} | {EMERGENCY_FUND_MONTHS} months of expenses and EMIs |",
+        f"| **Immediate Investment Capacity** | **{_inr(figures['immediate_capacity'])}** | Liquid savings {_inr(figures['liquid_savings'])} - emergency reserve |",
+        f"| **Affordable Monthly EMI** | **{_inr(figures['affordable_emi'])}** | {conservative}% of surplus ({_inr(figures['stretch_emi'])} at {stretch}%) |",
+        f"| **Maximum Home Loan Eligibility (Income-Multiple)** | **{_inr(figures['loan_eligibility_income_multiple'][low])} - {_inr(figures['loan_eligibility_income_multiple'][high])}** | {low}-{high}x annual income less outstanding loans |",
+        f"| **Maximum Home Loan Eligibility (EMI-Affordability)** | **{_inr(figures['loan_eligibility_emi'])}** | Affordable EMI at {REFERENCE_RATE}% over {REFERENCE_TENURE} years |",
+        f"| Property Budget at {int(LOAN_TO_VALUE * 100)}% LTV | {_inr(figures['property_value'])} | EMI-affordability loan / LTV |",
+        f"| Upfront Cash Needed | {_inr(figures['upfront_cash'])} | Down payment {_inr(figures['down_payment'])} + {int(PURCHASE_COST_RATE * 100)}% purchase costs |",
+        "",
+        f"### Home Loan Eligibility at the Affordable EMI ({_inr(figures['affordable_emi'])}/month)",
+        "",
+        "| Tenure | " + " | ".join(f"{rate:.1f}%" for rate in ANNUAL_RATES) + " |",
+        "|--------|" + "|".join("---" for _ in ANNUAL_RATES) + "|",
+    ]
+    for tenure, row in zip(TENURES_YEARS, figures["eligibility_grid"]):
+        lines.append(f"| {tenure} years | " + " | ".join(_inr(v) for v in row) + " |")
+
+    lines += [
+        "",
+        "### EMI per ₹10 Lakh Borrowed",
+        "",
+        "| Tenure | " + " | ".join(f"{rate:.1f}%" for rate in ANNUAL_RATES) + " |",
+        "|--------|" + "|".join("---" for _ in ANNUAL_RATES) + "|",
+    ]
+    for tenure, row in zip(TENURES_YEARS, figures["emi_per_10_lakh"]):
+        lines.append(f"| {tenure} years | " + " | ".join(_inr(v) for v in row) + " |")
+
+    lines += [
+        "",
+        "### Baseline Allocation of Immediate Investment Capacity",
+        "",
+        "| Asset Class | Amount | Share |",
+        "|-------------|--------|-------|",
+    ]
+    for name, amount in figures["allocation"].items():
+        lines.append(f"| {name} | {_inr(amount)} | {BASELINE_ALLOCATION[name] * 100:.0f}% |")
+    return "\n".join(lines)
+
+
+def build_capacity_report(text: Optional[str]) -> Optional[Dict]:
+    """
+    Extract, calculate and format the capacity figures for a financial report
+
+    Returns {'profile', 'figures', 'markdown'}, or None when the report does not state
+    both income and expenses and the LLM has to work the figures out itself.
+    """
+    if not text or not text.strip():
+        return None
+    profile = extract_financial_profile(text)
+    figures = calculate_capacity(profile)
+    if figures is None:
+        return None
+    return {"profile": profile, "figures": figures, "markdown": format_capacity_tables(figures)}
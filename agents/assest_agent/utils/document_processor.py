@@ -3,6 +3,11 @@ from pathlib import Path
 import pandas as pd
 from typing import List, Dict, Optional
 import re
+from functools import lru_cache
+
+from .financial_scanner import scan_financial_text, scan_markdown_sections
+from .tabular_stream import summarize_csv, summarize_excel, format_table_summary
+from .location_research import location_research_store, normalize_location
 
 def process_financial_documents(file_paths: List[str]) -> List[Dict]:
     """
@@ -66,15 +71,15 @@ def process_markdown_file(file_path: str) -> Dict:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Extract financial information using regex patterns
-        financial_data = extract_financial_metrics(content)
+        # Metrics and section headers come from one pass over the document
+        scanned = scan_financial_text(content)
         
         return {
             'content': content,
             'type': 'financial_report_markdown',
             'metadata': {
-                'financial_metrics': financial_data,
-                'sections': extract_markdown_sections(content)
+                'financial_metrics': scanned['metrics'],
+                'sections': scanned['sections']
             }
         }
     except Exception as e:
@@ -108,29 +113,18 @@ def process_text_file(file_path: str) -> Dict:
         }
 
 def process_csv_file(file_path: str) -> Dict:
-    """Process CSV financial data files"""
+    """Process CSV financial data files (streamed in chunks, aggregates only)"""
     try:
-        df = pd.read_csv(file_path)
+        summary = summarize_csv(file_path)
         
-        # Convert DataFrame to readable text format
+        # Aggregates replace preview rows so large exports stay within the token budget
         content = f"CSV Financial Data Summary:\n"
-        content += f"Total Rows: {len(df)}\n"
-        content += f"Columns: {', '.join(df.columns.tolist())}\n\n"
-        content += "Data Preview:\n"
-        content += df.head(10).to_string(index=False)
-        
-        # Extract numeric columns for financial analysis
-        numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+        content += format_table_summary(summary)
         
         return {
             'content': content,
             'type': 'financial_data_csv',
-            'metadata': {
-                'total_rows': len(df),
-                'columns': df.columns.tolist(),
-                'numeric_columns': numeric_columns,
-                'data_types': df.dtypes.to_dict()
-            }
+            'metadata': summary
         }
     except Exception as e:
         return {
@@ -140,28 +134,25 @@ def process_csv_file(file_path: str) -> Dict:
         }
 
 def process_excel_file(file_path: str) -> Dict:
-    """Process Excel financial documents"""
+    """Process Excel financial documents (read-only streaming, aggregates only)"""
     try:
-        # Read all sheets
-        excel_data = pd.read_excel(file_path, sheet_name=None)
+        sheet_summaries = summarize_excel(file_path)
         
         content = f"Excel Financial Document Summary:\n"
-        content += f"Total Sheets: {len(excel_data)}\n\n"
+        content += f"Total Sheets: {len(sheet_summaries)}\n\n"
         
-        for sheet_name, df in excel_data.items():
+        for sheet_name, summary in sheet_summaries.items():
             content += f"Sheet: {sheet_name}\n"
-            content += f"Rows: {len(df)}, Columns: {len(df.columns)}\n"
-            content += f"Column Names: {', '.join(df.columns.tolist())}\n"
-            content += "Data Preview:\n"
-            content += df.head(5).to_string(index=False)
+            content += format_table_summary(summary)
             content += "\n" + "="*50 + "\n"
         
         return {
             'content': content,
             'type': 'financial_data_excel',
             'metadata': {
-                'sheets': list(excel_data.keys()),
-                'total_sheets': len(excel_data)
+                'sheets': list(sheet_summaries.keys()),
+                'total_sheets': len(sheet_summaries),
+                'sheet_summaries': sheet_summaries
             }
         }
     except Exception as e:
@@ -173,46 +164,15 @@ def process_excel_file(file_path: str) -> Dict:
 
 def extract_financial_metrics(text: str) -> Dict:
     """
-    Extract financial metrics from text using regex patterns
+    Extract financial metrics from text (amounts in ₹, Rs., lakh and crore are understood)
     """
-    metrics = {}
-    
-    # Common financial patterns
-    patterns = {
-        'income': r'(?:annual\s+income|yearly\s+income|salary|income)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        'expenses': r'(?:monthly\s+expenses|expenses|expenditure)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        'savings': r'(?:savings|saved|saving)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        'investments': r'(?:investments?|invested)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        'loans': r'(?:loan|debt|emi|outstanding)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        'assets': r'(?:assets?|property|properties)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)'
-    }
-    
-    for metric, pattern in patterns.items():
-        matches = re.findall(pattern, text.lower(), re.IGNORECASE)
-        if matches:
-            # Convert string numbers to float, removing commas
-            values = [float(match.replace(',', '')) for match in matches]
-            metrics[metric] = {
-                'values': values,
-                'total': sum(values),
-                'count': len(values)
-            }
-    
-    return metrics
+    return scan_financial_text(text)['metrics']
 
 def extract_markdown_sections(content: str) -> List[str]:
     """
     Extract section headers from markdown content
     """
-    sections = []
-    lines = content.split('\n')
-    
-    for line in lines:
-        # Check for markdown headers
-        if line.strip().startswith('#'):
-            sections.append(line.strip())
-    
-    return sections
+    return scan_markdown_sections(content)
 
 def create_financial_summary(processed_docs: List[Dict]) -> str:
     """
@@ -241,15 +201,20 @@ def analyze_location_data(location: str) -> Dict:
     """
     Analyze location-specific data for land investment
     """
-    # This could be enhanced with real data APIs
+    # Cached research or a bundled city profile means no live search is needed
+    research = location_research_store.lookup(location)
+    profile = location_research_store.get_profile(location) or {}
+    growth = profile.get('growth_indicators') or {}
     location_analysis = {
         'location': location,
+        'location_key': normalize_location(location),
         'search_terms': generate_location_search_terms(location),
+        'research_source': research['source'] if research else None,
         'market_indicators': {
-            'infrastructure_development': 'Research required',
-            'population_growth': 'Research required',
-            'economic_indicators': 'Research required',
-            'real_estate_trends': 'Research required'
+            'infrastructure_development': profile.get('infrastructure', 'Research required'),
+            'population_growth': growth.get('population_growth', 'Research required') if isinstance(growth, dict) else 'Research required',
+            'economic_indicators': profile.get('growth_indicators', 'Research required'),
+            'real_estate_trends': profile.get('price_bands', 'Research required')
         }
     }
     
@@ -259,7 +224,11 @@ def generate_location_search_terms(location: str) -> List[str]:
     """
     Generate search terms for location-based research
     """
-    base_terms = [
+    return list(_location_search_terms(location.strip()))
+
+@lru_cache(maxsize=256)
+def _location_search_terms(location: str) -> tuple:
+    base_terms = (
         f"{location} land prices",
         f"{location} real estate development",
         f"{location} infrastructure projects",
@@ -270,6 +239,6 @@ def generate_location_search_terms(location: str) -> List[str]:
         f"{location} metro connectivity",
         f"{location} IT parks",
         f"{location} industrial development"
-    ]
+    )
     
     return base_terms
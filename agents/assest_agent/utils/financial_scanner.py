@@ -0,0 +1,177 @@
+"""
+Single-pass scanner for financial metrics and markdown section headers
+One precompiled pattern walks the lower-cased document once and reports every metric hit
+(income, expenses, savings, investments, loans, assets) together with the section
+headers. Amounts understand Indian formats: ₹ / Rs. / INR prefixes, lakh-style digit
+grouping (5,00,000) and lakh / crore / thousand suffixes.
+
+Run `python -m assest_agent.utils.financial_scanner` for a benchmark against the
+previous per-pattern implementation.
+"""
+
+import re
+from typing import Dict, List
+
+METRIC_KEYWORDS = {
+    'income': r'annual\s+income|yearly\s+income|salary|income',
+    'expenses': r'monthly\s+expenses|expenses|expenditure',
+    'savings': r'savings|saved|saving',
+    'investments': r'investments?|invested',
+    'loans': r'loan|debt|emi|outstanding',
+    'assets': r'assets?|property|properties',
+}
+
+# Multipliers for Indian amount suffixes
+UNIT_MULTIPLIERS = {
+    'thousand': 1e3,
+    'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5, 'lacs': 1e5,
+    'crore': 1e7, 'crores': 1e7,
+}
+
+# Optional currency prefix, Indian/Western digit grouping and an optional unit suffix
+AMOUNT_PATTERN = (
+    r"(?:rs\.?|inr|₹)?\s*"
+    r"(?P<amount>\d+(?:,\d+)*(?:\.\d+)?)"
+    r"(?:\s*(?P<unit>thousand|lakhs?|lacs?|crores?)\b)?"
+)
+
+_SCANNER_SOURCE = (
+    # Headers are captured inside a lookahead so metrics on the header line are still scanned
+    r"^[^\S\n]*(?=(?P<header>\#[^\n]*))"
+    r"|(?P<keyword>" + "|".join(METRIC_KEYWORDS.values()) + r")"
+    r"[\s:]*" + AMOUNT_PATTERN
+)
+# The text is lower-cased once and matched case-sensitively, which is much faster than
+# IGNORECASE; the case-insensitive pattern covers text whose length changes when lowered
+SCANNER_PATTERN = re.compile(_SCANNER_SOURCE, re.MULTILINE)
+SCANNER_PATTERN_IGNORECASE = re.compile(_SCANNER_SOURCE, re.IGNORECASE | re.MULTILINE)
+
+HEADER_PATTERN = re.compile(r"^[^\S\n]*(\#[^\n]*)", re.MULTILINE)
+
+METRIC_NAMES = list(METRIC_KEYWORDS)
+
+# Last word of each keyword -> metric ("annual income" -> income)
+KEYWORD_METRICS = {
+    'income': 'income', 'salary': 'income',
+    'expenses': 'expenses', 'expenditure': 'expenses',
+    'savings': 'savings', 'saved': 'savings', 'saving': 'savings',
+    'investment': 'investments', 'investments': 'investments', 'invested': 'investments',
+    'loan': 'loans', 'debt': 'loans', 'emi': 'loans', 'outstanding': 'loans',
+    'asset': 'assets', 'assets': 'assets', 'property': 'assets', 'properties': 'assets',
+}
+
+
+def scan_financial_text(text: str) -> Dict:
+    """
+    Scan text once for metric amounts and markdown section headers
+
+    Returns {'metrics': {metric: {'values', 'total', 'count'}}, 'sections': [header, ...]}
+    with metrics in the same shape and order as extract_financial_metrics.
+    """
+    values: Dict[str, List[float]] = {}
+    sections: List[str] = []
+
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        matches = SCANNER_PATTERN.finditer(lowered)
+    else:
+        matches = SCANNER_PATTERN_IGNORECASE.finditer(text)
+
+    for match in matches:
+        if match.group('header') is not None:
+            # Slice the original text so headers keep their case
+            start, end = match.span('header')
+            sections.append(text[start:end].strip())
+            continue
+
+        metric = KEYWORD_METRICS[match.group('keyword').lower().split()[-1]]
+        values.setdefault(metric, []).append(parse_amount(match.group('amount'), match.group('unit')))
+
+    metrics = {
+        metric: {
+            'values': values[metric],
+            'total': sum(values[metric]),
+            'count': len(values[metric]),
+        }
+        for metric in METRIC_NAMES if metric in values
+    }
+    return {'metrics': metrics, 'sections': sections}
+
+
+def parse_amount(amount: str, unit: str = None) -> float:
+    """Convert a matched amount and optional lakh/crore/thousand suffix to rupees"""
+    value = float(amount.replace(',', ''))
+    if unit:
+        value *= UNIT_MULTIPLIERS[unit.lower()]
+    return value
+
+
+def scan_markdown_sections(text: str) -> List[str]:
+    """Section headers only, for callers that do not need the metrics"""
+    return [header.strip() for header in HEADER_PATTERN.findall(text)]
+
+
+def _legacy_extract_financial_metrics(text: str) -> Dict:
+    patterns = {
+        'income': r'(?:annual\s+income|yearly\s+income|salary|income)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
+        'expenses': r'(?:monthly\s+expenses|expenses|expenditure)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
+        'savings': r'(?:savings|saved|saving)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
+        'investments': r'(?:investments?|invested)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
+        'loans': r'(?:loan|debt|emi|outstanding)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
+        'assets': r'(?:assets?|property|properties)[\s:]*(?:rs\.?|₹)?\s*(\d+(?:,\d+)*(?:\.\d+)?)'
+    }
+    metrics = {}
+    for metric, pattern in patterns.items():
+        matches = re.findall(pattern, text.lower(), re.IGNORECASE)
+        if matches:
+            values = [float(match.replace(',', '')) for match in matches]
+            metrics[metric] = {'values': values, 'total': sum(values), 'count': len(values)}
+    return metrics
+
+
+def _legacy_extract_markdown_sections(content: str) -> List[str]:
+    return [line.strip() for line in content.split('\n') if line.strip().startswith('#')]
+
+
+def _benchmark(target_mb: float = 4.0):
+    import time
+
+    block = (
+        "# Financial Report\n"
+        "## Income\n"
+        "Annual income: Rs. 12,00,000 from salary 85000 per month.\n"
+        "Other notes about the client and their family situation go here.\n"
+        "## Expenses\n"
+        "Monthly expenses ₹ 45,500.75 and expenditure on travel 8000.\n"
+        "### Savings and Investments\n"
+        "Savings: 2,50,000 invested 1,00,000 in mutual funds; investments 30000.\n"
+        "Outstanding loan 15,00,000 with EMI 22,000 and credit card debt 12000.\n"
+        "Assets: property 75,00,000 and other assets 5,00,000.\n\n"
+    )
+    text = block * int(target_mb * 1024 * 1024 / len(block.encode("utf-8")))
+    size_mb = len(text.encode("utf-8")) / 1024 / 1024
+
+    def timed(fn, repeat=3):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    legacy_time, legacy = timed(lambda: (_legacy_extract_financial_metrics(text), _legacy_extract_markdown_sections(text)))
+    scan_time, scanned = timed(lambda: scan_financial_text(text))
+
+    assert scanned['metrics'] == legacy[0], "scanner metrics differ from the legacy implementation"
+    assert scanned['sections'] == legacy[1], "scanner sections differ from the legacy implementation"
+
+    print(f"Input: {size_mb:.1f} MB, {sum(m['count'] for m in legacy[0].values()):,} metric hits, {len(legacy[1]):,} headers")
+    print(f"legacy (6 patterns + lower() + split): {legacy_time * 1000:8.1f} ms")
+    print(f"single-pass scanner:                   {scan_time * 1000:8.1f} ms  ({legacy_time / scan_time:.1f}x)")
+
+    indian = scan_financial_text("Annual income Rs. 18 lakh, savings ₹2.5 crore, EMI INR 35,000")['metrics']
+    print("Indian formats:", {k: v['values'] for k, v in indian.items()})
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,242 @@
+"""
+Location research cache and city profiles for the asset agent
+The Investment_Researcher's live searches for a city are stored per normalized location
+with a TTL, so repeated cities skip web research. The research is budget-independent
+(the task never sees a client's figures), so one city's entry serves every client. Curated city profiles (infrastructure,
+price bands, growth indicators) can also be bundled as JSON and take precedence.
+Both are maintained by the refresh command (python -m assest_agent.refresh_location_research).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = Path(os.getenv("ASSET_LOCATION_RESEARCH_DB", ROOT / "location_data" / "location_research.sqlite"))
+DEFAULT_PROFILES_PATH = Path(os.getenv("ASSET_CITY_PROFILES", ROOT / "location_data" / "city_profiles.json"))
+
+# Cached live research is reused for this long
+RESEARCH_TTL_HOURS = float(os.getenv("ASSET_LOCATION_RESEARCH_TTL_HOURS", "72"))
+# Part of the research cache key; bump when the research task's prompt changes so
+# research written under the old prompt is no longer served
+RESEARCH_PROMPT_VERSION = "2"
+# Bundled city profiles older than this are ignored
+PROFILE_MAX_AGE_DAYS = float(os.getenv("ASSET_CITY_PROFILE_MAX_AGE_DAYS", "30"))
+
+# Alternate spellings that should share one cache entry
+CITY_ALIASES = {
+    "bengaluru": "bangalore",
+    "bombay": "mumbai",
+    "gurugram": "gurgaon",
+    "madras": "chennai",
+    "calcutta": "kolkata",
+    "poona": "pune",
+    "new_delhi": "delhi",
+}
+
+
+def normalize_location(location: str) -> str:
+    """
+    Cache key for a location: "Pune, Maharashtra" and "pune city" both become "pune"
+    """
+    city = (location or "").split(",")[0].lower()
+    city = re.sub(r"\b(city|district|metropolitan region)\b", " ", city)
+    slug = re.sub(r"[^a-z0-9]+", "_", city).strip("_")
+    return CITY_ALIASES.get(slug, slug)
+
+
+def research_key(location: str) -> str:
+    """Research cache key: the normalized location and the research prompt version"""
+    return f"{normalize_location(location)}@v{RESEARCH_PROMPT_VERSION}"
+
+
+def _age_hours(timestamp: str) -> float:
+    return (datetime.now() - datetime.fromisoformat(timestamp)).total_seconds() / 3600
+
+
+class LocationResearchStore:
+    """
+    SQLite cache of research per location plus the bundled city profiles
+    """
+    def __init__(self, db_path: Optional[Path] = None, profiles_path: Optional[Path] = None):
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.profiles_path = Path(profiles_path or DEFAULT_PROFILES_PATH)
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._profiles_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS research (
+                location_key TEXT PRIMARY KEY,
+                location TEXT NOT NULL,
+                research TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                source TEXT
+            )
+            """
+        )
+        return conn
+
+    # City profiles
+
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        """Bundled city profiles keyed by normalized location, reloaded when the file changes"""
+        with self._lock:
+            if not self.profiles_path.exists():
+                self._profiles, self._profiles_mtime = {}, None
+                return self._profiles
+            mtime = self.profiles_path.stat().st_mtime
+            if mtime != self._profiles_mtime:
+                data = json.loads(self.profiles_path.read_text(encoding="utf-8"))
+                records = data.get("cities", []) if isinstance(data, dict) else data
+                self._profiles = {normalize_location(p["city"]): p for p in records if p.get("city")}
+                self._profiles_mtime = mtime
+            return self._profiles
+
+    def save_profiles(self, profiles: List[Dict[str, Any]]):
+        """Merge city profiles into the bundled dataset"""
+        merged = dict(self.profiles())
+        for profile in profiles:
+            if not profile.get("city"):
+                continue
+            profile.setdefault("updated_at", datetime.now().isoformat(timespec="seconds"))
+            merged[normalize_location(profile["city"])] = profile
+        self.profiles_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.profiles_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"cities": sorted(merged.values(), key=lambda p: p["city"])}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.profiles_path)
+
+    def get_profile(self, location: str) -> Optional[Dict[str, Any]]:
+        profile = self.profiles().get(normalize_location(location))
+        if not profile:
+            return None
+        updated_at = profile.get("updated_at")
+        if updated_at and _age_hours(updated_at) > PROFILE_MAX_AGE_DAYS * 24:
+            return None
+        return profile
+
+    # Research cache
+
+    def get_research(self, location: str, max_age_hours: float = RESEARCH_TTL_HOURS) -> Optional[Dict[str, Any]]:
+        if not self.db_path.exists():
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM research WHERE location_key = ?", (research_key(location),)
+            ).fetchone()
+        if not row:
+            return None
+        age_hours = _age_hours(row["created_at"])
+        if age_hours > max_age_hours:
+            return None
+        return {**dict(row), "age_hours": round(age_hours, 2)}
+
+    def store_research(self, location: str, research: str, source: str = "live_research"):
+        if not normalize_location(location) or not research or not research.strip():
+            return
+        key = research_key(location)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO research (location_key, location, research, created_at, source) VALUES (?, ?, ?, ?, ?)",
+                (key, location, research, datetime.now().isoformat(timespec="seconds"), source),
+            )
+        print(f"Cached location research for {key}")
+
+    def list_research(self) -> List[Dict[str, Any]]:
+        if not self.db_path.exists():
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT location_key, location, created_at, source FROM research ORDER BY location_key").fetchall()
+        return [{**dict(r), "age_hours": round(_age_hours(r["created_at"]), 2)} for r in rows]
+
+    def prune(self, max_age_hours: float = RESEARCH_TTL_HOURS) -> int:
+        """Delete expired research; returns the number of rows removed"""
+        expired = [r["location_key"] for r in self.list_research() if r["age_hours"] > max_age_hours]
+        if expired:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("DELETE FROM research WHERE location_key = ?", [(k,) for k in expired])
+        return len(expired)
+
+    def lookup(self, location: str) -> Optional[Dict[str, Any]]:
+        """
+        Research that can replace the live search for a location, or None
+
+        Returns {"source": "city_profile" | "research_cache", "markdown": ..., "age_hours": ...}
+        """
+        profile = self.get_profile(location)
+        if profile:
+            return {
+                "source": "city_profile",
+                "markdown": format_city_profile(profile),
+                "age_hours": round(_age_hours(profile["updated_at"]), 2) if profile.get("updated_at") else None,
+            }
+        cached = self.get_research(location)
+        if cached:
+            return {"source": "research_cache", "markdown": cached["research"], "age_hours": cached["age_hours"]}
+        return None
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, dict):
+        return "; ".join(f"{k}: {v}" for k, v in value.items())
+    if isinstance(value, list):
+        return "; ".join(str(v) for v in value)
+    return str(value)
+
+
+def format_city_profile(profile: Dict[str, Any]) -> str:
+    """
+    Markdown for a bundled city profile; unknown keys are rendered as extra rows
+    """
+    lines = [f"## City Profile: {profile['city']}"]
+    if profile.get("updated_at"):
+        lines.append(f"*Updated: {profile['updated_at']}*")
+
+    price_bands = profile.get("price_bands") or []
+    if price_bands:
+        lines += [
+            "",
+            "### Property Price Bands",
+            "| Locality | Configuration | Price Range | Price per sq.ft |",
+            "|----------|---------------|-------------|-----------------|",
+        ]
+        for band in price_bands:
+            lines.append(
+                f"| {band.get('locality', '-')} | {band.get('configuration', '-')} | "
+                f"{band.get('price_range', '-')} | {band.get('price_per_sqft', '-')} |"
+            )
+
+    for key, title in (("infrastructure", "Infrastructure"), ("growth_indicators", "Growth Indicators")):
+        value = profile.get(key)
+        if value:
+            lines += ["", f"### {title}"]
+            items = value.items() if isinstance(value, dict) else enumerate(value if isinstance(value, list) else [value])
+            for label, item in items:
+                lines.append(f"- {label}: {_format_value(item)}" if isinstance(value, dict) else f"- {_format_value(item)}")
+
+    extra = {k: v for k, v in profile.items() if k not in ("city", "updated_at", "price_bands", "infrastructure", "growth_indicators", "research")}
+    if extra:
+        lines += ["", "### Other Indicators"]
+        lines += [f"- {k.replace('_', ' ').title()}: {_format_value(v)}" for k, v in extra.items()]
+
+    if profile.get("research"):
+        lines += ["", profile["research"]]
+    return "\n".join(lines)
+
+
+# Global store instance
+location_research_store = LocationResearchStore()
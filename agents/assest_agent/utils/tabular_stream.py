@@ -0,0 +1,255 @@
+"""
+Bounded-memory readers for CSV and Excel financial exports
+Files are read in fixed-size row chunks (pandas chunksize for CSV, openpyxl read-only
+row iteration for .xlsx) and folded into running aggregates: row count, dtypes, a
+short head, per-column sums/min/max and monthly rollups on the detected date column.
+Memory stays proportional to the chunk size, not the file size.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+HEAD_ROWS = 5
+# Monthly rollup rows kept in the LLM summary (most recent months)
+SUMMARY_MONTHS = 24
+# Share of parseable values needed to treat a text column as numbers or dates
+PARSE_THRESHOLD = 0.9
+
+DATE_COLUMN_HINT = re.compile(r"date|month|period|time|day", re.IGNORECASE)
+NUMBER_CLEANUP = re.compile(r"[₹,\s]|rs\.?|inr", re.IGNORECASE)
+# Tried on the first chunk so later chunks parse with a fixed format instead of inference
+DATE_FORMATS = ["%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%d-%b-%Y", "%d %b %Y", "%d/%m/%y", "%d-%m-%y", "%d.%m.%Y", "%m/%d/%Y"]
+
+
+class TabularAggregator:
+    """
+    Folds DataFrame chunks of one table into running aggregates
+    """
+    def __init__(self, head_rows: int = HEAD_ROWS):
+        self.head_rows = head_rows
+        self.columns: List[str] = []
+        self.rows = 0
+        self.head: Optional[pd.DataFrame] = None
+        self.dtypes: Dict[str, str] = {}
+        self.numeric_columns: List[str] = []
+        self.date_column: Optional[str] = None
+        self.date_format: Optional[str] = None
+        self.sums: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.minimums: Dict[str, float] = {}
+        self.maximums: Dict[str, float] = {}
+        self.monthly: Optional[pd.DataFrame] = None
+
+    def update(self, chunk: pd.DataFrame):
+        if self.head is None:
+            self._inspect(chunk)
+        self.rows += len(chunk)
+
+        for column in chunk.columns:
+            dtype = str(chunk[column].dtype)
+            if self.dtypes.get(column) not in (None, dtype):
+                dtype = "object"
+            self.dtypes[column] = dtype
+
+        if not self.numeric_columns:
+            return
+        numbers = pd.DataFrame({c: _to_numeric(chunk[c]) for c in self.numeric_columns})
+        sums, counts = numbers.sum(), numbers.count()
+        minimums, maximums = numbers.min(), numbers.max()
+        for column in self.numeric_columns:
+            if counts[column] == 0:
+                continue
+            self.sums[column] = self.sums.get(column, 0.0) + float(sums[column])
+            self.counts[column] = self.counts.get(column, 0) + int(counts[column])
+            self.minimums[column] = min(self.minimums.get(column, float("inf")), float(minimums[column]))
+            self.maximums[column] = max(self.maximums.get(column, float("-inf")), float(maximums[column]))
+
+        if self.date_column:
+            periods = _to_datetime(chunk[self.date_column], self.date_format).dt.to_period("M")
+            rollup = numbers.groupby(periods).sum(min_count=1)
+            self.monthly = rollup if self.monthly is None else self.monthly.add(rollup, fill_value=0)
+
+    def _inspect(self, chunk: pd.DataFrame):
+        """Pick numeric and date columns from the first chunk"""
+        self.columns = [str(c) for c in chunk.columns]
+        self.head = chunk.head(self.head_rows)
+
+        for column in chunk.columns:
+            series = chunk[column]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                self.numeric_columns.append(column)
+            elif series.dtype == object and _parse_share(_to_numeric(series), series) >= PARSE_THRESHOLD:
+                self.numeric_columns.append(column)
+
+        candidates = [c for c in chunk.columns if c not in self.numeric_columns]
+        candidates.sort(key=lambda c: not DATE_COLUMN_HINT.search(str(c)))
+        for column in candidates:
+            series = chunk[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                self.date_column = column
+                break
+            if series.dtype != object:
+                continue
+            date_format = _infer_date_format(series)
+            if date_format or _parse_share(_to_datetime(series), series) >= PARSE_THRESHOLD:
+                self.date_column, self.date_format = column, date_format
+                break
+
+    def result(self) -> Dict[str, Any]:
+        aggregates = {
+            column: {
+                "sum": round(self.sums[column], 2),
+                "mean": round(self.sums[column] / self.counts[column], 2),
+                "min": self.minimums[column],
+                "max": self.maximums[column],
+                "count": self.counts[column],
+            }
+            for column in self.numeric_columns if self.counts.get(column)
+        }
+        monthly = {}
+        if self.monthly is not None:
+            for period, row in self.monthly.sort_index().iterrows():
+                monthly[str(period)] = {c: round(float(v), 2) for c, v in row.items() if pd.notna(v)}
+        return {
+            "total_rows": self.rows,
+            "columns": self.columns,
+            "data_types": {str(k): v for k, v in self.dtypes.items()},
+            "numeric_columns": [str(c) for c in self.numeric_columns],
+            "date_column": str(self.date_column) if self.date_column is not None else None,
+            "head": self.head.astype(str).to_dict(orient="records") if self.head is not None else [],
+            "aggregates": aggregates,
+            "monthly": monthly,
+        }
+
+
+def _to_numeric(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    cleaned = series.astype(str).str.replace(NUMBER_CLEANUP, "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def _to_datetime(series: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if date_format:
+        return pd.to_datetime(series, errors="coerce", format=date_format)
+    return pd.to_datetime(series, errors="coerce", dayfirst=True, format="mixed")
+
+
+def _infer_date_format(series: pd.Series) -> Optional[str]:
+    sample = series.dropna().astype(str).str.strip().head(200)
+    if sample.empty:
+        return None
+    for date_format in DATE_FORMATS:
+        if pd.to_datetime(sample, errors="coerce", format=date_format).notna().mean() >= PARSE_THRESHOLD:
+            return date_format
+    return None
+
+
+def _parse_share(parsed: pd.Series, original: pd.Series) -> float:
+    present = original.notna() & (original.astype(str).str.strip() != "")
+    if not present.any():
+        return 0.0
+    return float(parsed[present].notna().mean())
+
+
+def summarize_csv(file_path: str, chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Aggregate a CSV file in chunks of chunk_rows
+    """
+    aggregator = TabularAggregator()
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows, low_memory=True):
+        aggregator.update(chunk)
+    return aggregator.result()
+
+
+def _iter_sheet_chunks(worksheet, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(c) if c is not None else f"column_{i + 1}" for i, c in enumerate(header)]
+    batch = []
+    for row in rows:
+        if row is None or all(v is None for v in row):
+            continue
+        batch.append(row[:len(columns)])
+        if len(batch) >= chunk_rows:
+            yield pd.DataFrame(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns)
+
+
+def summarize_excel(file_path: str, chunk_rows: int = CHUNK_ROWS) -> Dict[str, Dict[str, Any]]:
+    """
+    Aggregate every sheet of a workbook; returns {sheet name: summary}
+
+    .xlsx files stream through openpyxl in read-only mode. Legacy .xls files have no
+    streaming reader, so they are loaded one sheet at a time with pandas.
+    """
+    sheets: Dict[str, Dict[str, Any]] = {}
+    if Path(file_path).suffix.lower() == ".xls":
+        workbook = pd.ExcelFile(file_path)
+        for sheet_name in workbook.sheet_names:
+            aggregator = TabularAggregator()
+            df = workbook.parse(sheet_name)
+            for start in range(0, len(df), chunk_rows):
+                aggregator.update(df.iloc[start:start + chunk_rows])
+            sheets[sheet_name] = aggregator.result()
+        return sheets
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            aggregator = TabularAggregator()
+            for chunk in _iter_sheet_chunks(worksheet, chunk_rows):
+                aggregator.update(chunk)
+            sheets[worksheet.title] = aggregator.result()
+    finally:
+        workbook.close()
+    return sheets
+
+
+def format_table_summary(summary: Dict[str, Any], max_months: int = SUMMARY_MONTHS) -> str:
+    """
+    Markdown aggregates for the LLM: column totals first, then the monthly rollup
+    """
+    lines = [
+        f"Total Rows: {summary['total_rows']:,}",
+        f"Columns: {', '.join(summary['columns'])}",
+    ]
+    aggregates = summary["aggregates"]
+    if aggregates:
+        lines += [
+            "",
+            "Numeric Column Totals:",
+            "| Column | Sum | Mean | Min | Max | Values |",
+            "|--------|-----|------|-----|-----|--------|",
+        ]
+        for column, stats in aggregates.items():
+            lines.append(
+                f"| {column} | {stats['sum']:,.2f} | {stats['mean']:,.2f} | {stats['min']:,.2f} | "
+                f"{stats['max']:,.2f} | {stats['count']:,} |"
+            )
+
+    monthly = summary["monthly"]
+    if monthly:
+        months = list(monthly)[-max_months:]
+        columns = list(aggregates)
+        lines += [
+            "",
+            f"Monthly Rollup (by {summary['date_column']}, last {len(months)} months):",
+            "| Month | " + " | ".join(columns) + " |",
+            "|-------|" + "|".join("---" for _ in columns) + "|",
+        ]
+        for month in months:
+            lines.append(f"| {month} | " + " | ".join(f"{monthly[month].get(c, 0):,.2f}" for c in columns) + " |")
+    return "\n".join(lines)
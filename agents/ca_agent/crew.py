@@ -75,7 +75,11 @@ def create_crew(client_type: str, processed_documents=None):
         document_content = "\n\n=== DOCUMENT CONTENT TO ANALYZE ===\n"
         for doc in processed_documents:
             document_content += f"\n--- Document: {doc['filename']} ---\n"
-            document_content += doc['content'][:3000] + ("..." if len(doc['content']) > 3000 else "")
+            content = doc['content']
+            if doc.get('transaction_summary'):
+                document_content += doc['transaction_summary'] + "\n\n"
+                content = doc.get('residual_content', "")
+            document_content += content[:3000] + ("..." if len(content) > 3000 else "")
             document_content += "\n" + "="*50 + "\n"
         
         task_description += document_content
@@ -8,8 +8,12 @@ import shutil
 import re
 from datetime import datetime
 
-from .crew import create_crew
+from .crew import create_crew, CONFIG_DIR
 from .utils.document_processor import DocumentProcessor
+from common.report_responses import stored_report_response
+from common.report_store import report_store
+from common.readiness import readiness, config_check, env_check
+from pict_route import schedule_pictorial_generation
 
 router = APIRouter(prefix="/ca", tags=["CA Agent"])
 
@@ -18,6 +22,10 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 
 templates = Jinja2Templates(directory="ca_agent/templates")
 
+# Dependency checks for /ready
+readiness.register("config", "ca_agent", config_check(CONFIG_DIR / "agents.yaml", CONFIG_DIR / "tasks.yaml"))
+readiness.register("cerebras_api_key", "ca_agent", env_check("CEREBRAS_API_KEY"))
+
 @router.get("/")
 def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -134,25 +142,24 @@ async def analyze_documents(
         result_content = str(result_content).replace('***', '').replace('**', '')
         result_content = re.sub(r'\n{3,}', '\n\n', result_content)
 
-        # Save as markdown
-        markdown_dir = Path("./ca_agent/markdown_files")
-        markdown_dir.mkdir(exist_ok=True)
+        # Save as markdown in the shared report store
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"CA_Report_{client_type}_{timestamp}.md"
-        file_path = markdown_dir / filename
 
         markdown_content = f"# CA Analysis Report - {client_type.title()}\n\n"
         markdown_content += f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
         markdown_content += f"**Task:** {task_name}\n\n---\n\n{result_content}"
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        stored = report_store.put("ca", filename, markdown_content)
+        # Build the dashboard data now so the report page opens on a cache hit
+        schedule_pictorial_generation(markdown_content, task_name)
 
         return JSONResponse(content={
             "task": task_name or "CA_Analysis", 
             "result": result_content or "Analysis completed successfully",
             "markdown": markdown_content,
-            "file_saved": str(file_path)
+            "file_saved": stored.filename,
+            "content_hash": stored.digest
         })
 
     except Exception as e:
@@ -162,40 +169,28 @@ async def analyze_documents(
 async def list_ca_reports():
     """List all CA analysis reports"""
     try:
-        reports_dir = Path("./ca_agent/markdown_files")
-        if not reports_dir.exists():
-            return JSONResponse(content={"reports": []})
-        
-        reports = []
-        for file_path in reports_dir.glob("*.md"):
-            reports.append({
-                "filename": file_path.name,
-                "created": file_path.stat().st_mtime,
-                "size": file_path.stat().st_size,
-                "path": str(file_path)
-            })
+        reports = [{
+            "filename": report.filename,
+            "created": report.created_at,
+            "size": report.size,
+            "stored_size": report.stored_size,
+            "content_hash": report.digest
+        } for report in report_store.list("ca")]
         
-        return JSONResponse(content={
-            "reports": sorted(reports, key=lambda x: x["created"], reverse=True)
-        })
+        return JSONResponse(content={"reports": reports})
         
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 @router.get("/reports/{filename}")
-async def download_ca_report(filename: str):
-    """Download a specific CA report file"""  
+async def download_ca_report(filename: str, request: Request):
+    """Download a specific CA report file (supports ETag, Range and gzip/brotli)"""  
     try:
-        from fastapi.responses import FileResponse
-        report_path = Path("./ca_agent/markdown_files") / filename
-        if not report_path.exists():
+        report = report_store.get("ca", filename)
+        if not report:
             return JSONResponse(content={"error": "Report not found"}, status_code=404)
         
-        return FileResponse(
-            path=str(report_path),
-            filename=filename,
-            media_type="text/markdown"
-        )
+        return stored_report_response(request, report, media_type="text/markdown", download_name=filename)
         
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)    
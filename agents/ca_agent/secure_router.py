@@ -9,6 +9,7 @@ from pathlib import Path
 import logging
 
 from .utils.encryption_handler import create_encryption_handler
+from common.readiness import readiness
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,17 @@ SECURE_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 # Initialize encryption handler
 encryption_handler = create_encryption_handler(SECURE_UPLOAD_DIR)
 
+def _s3_reachable():
+    """S3 bucket answers; without S3 credentials documents stay in local storage"""
+    storage = encryption_handler.s3_storage
+    if not storage:
+        return True, "not configured, using local storage"
+    storage.s3_client.head_bucket(Bucket=storage.bucket_name)
+    return True, f"bucket {storage.bucket_name} reachable"
+
+# Local storage is the fallback, so S3 is not required for readiness
+readiness.register("s3", "secure_ca_agent", _s3_reachable, critical=False)
+
 @secure_router.post("/upload")
 async def secure_upload_documents(
     client_type: str = Form(...),
@@ -1,6 +1,8 @@
 from pathlib import Path
 import PyPDF2
 
+from common.statement_summarizer import summarize_statement
+
 class DocumentProcessor:
     """
     Simple PDF parser to extract text from uploaded PDFs
@@ -25,7 +27,16 @@ class DocumentProcessor:
                     if not content.strip():
                         content = f"[No text could be extracted from {Path(path).name}. The PDF might be image-based or encrypted.]"
                     
-                docs.append({"filename": Path(path).name, "content": content})
+                doc = {"filename": Path(path).name, "content": content}
+                
+                # Bank statements / ledgers reach the crew as a computed summary table
+                summary = summarize_statement(content)
+                if summary:
+                    print(f"Summarized {summary['transaction_count']} transactions from {Path(path).name}")
+                    doc["transaction_summary"] = summary["summary_markdown"]
+                    doc["residual_content"] = summary["residual_text"]
+                
+                docs.append(doc)
             except Exception as e:
                 print(f"Error processing {path}: {str(e)}")
                 docs.append({"filename": Path(path).name, "content": f"[Error processing document: {str(e)}]"})
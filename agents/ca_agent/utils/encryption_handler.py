@@ -11,6 +11,9 @@ from pathlib import Path
 from fastapi import Form, UploadFile, File
 from fastapi.responses import JSONResponse
 
+from common.report_store import report_store
+from pict_route import schedule_pictorial_generation
+
 from .encryption import DocumentEncryption
 from .s3_storage import S3DocumentStorage
 from .session_manager import SessionManager
@@ -207,7 +210,9 @@ class EncryptionHandler:
             result_content = self._clean_result_content(result_content)
 
             # Save result as markdown
-            file_path, markdown_content = self._save_markdown_report(result_content, client_type, task_name)
+            report_filename, markdown_content = self._save_markdown_report(result_content, client_type, task_name)
+            # Build the dashboard data now so the report page opens on a cache hit
+            schedule_pictorial_generation(markdown_content, task_name)
 
             # Clean up temporary files
             temp_cleanup_count = self._cleanup_temp_files(temp_files)
@@ -233,7 +238,7 @@ class EncryptionHandler:
                 "task": task_name,
                 "result": result_content,
                 "markdown": markdown_content,
-                "file_saved": str(file_path),
+                "file_saved": report_filename,
                 "processed_files": len(processed_docs),
                 "session_type": "encrypted",
                 "session_cleaned": True,
@@ -286,23 +291,19 @@ class EncryptionHandler:
         content = re.sub(r'\n{3,}', '\n\n', content)
         return content
     
-    def _save_markdown_report(self, result_content: str, client_type: str, task_name: str) -> tuple[Path, str]:
-        """Save analysis result as markdown report"""
-        markdown_dir = Path("./ca_agent/markdown_files")
-        markdown_dir.mkdir(exist_ok=True)
+    def _save_markdown_report(self, result_content: str, client_type: str, task_name: str) -> tuple[str, str]:
+        """Save analysis result as markdown report in the shared report store"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"CA_Report_Encrypted_{client_type}_{timestamp}.md"
-        file_path = markdown_dir / filename
 
         markdown_content = f"# CA Analysis Report - {client_type.title()} (Encrypted)\n\n"
         markdown_content += f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
         markdown_content += f"**Task:** {task_name}\n\n"
         markdown_content += f"**Processing Mode:** Encrypted Documents\n\n---\n\n{result_content}"
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        report_store.put("ca", filename, markdown_content)
         
-        return file_path, markdown_content
+        return filename, markdown_content
     
     def _cleanup_temp_files(self, temp_files: list[Path]) -> int:
         """Clean up temporary files"""
@@ -1,13 +1,22 @@
 from fastapi import APIRouter, Form, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 import os
+import asyncio
+import json
 import google.generativeai as genai
 from typing import Optional
-import markdown
 import logging
 
+from common.readiness import readiness, env_check
+from .utils.document_cache import document_cache, ensure_context_cache
+from .utils.retrieval import document_context, needs_full_context
+from .utils.concurrency import gemini_limiter, LimiterBusy
+from .utils.rendering import markdown_renderer
+from .utils.sessions import session_store, estimate_tokens, MAX_PROMPT_TOKENS
+from .utils.answer_cache import answer_cache
+
 router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
 
 templates = Jinja2Templates(directory="chatbot/templates")
@@ -15,60 +24,290 @@ templates = Jinja2Templates(directory="chatbot/templates")
 # Configure Gemini API
 # Make sure to set your GEMINI_API_KEY environment variable
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-2.5-flash")
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-2.5-flash')
+    model = genai.GenerativeModel(GEMINI_MODEL_NAME)
 else:
     model = None
     logging.warning("GEMINI_API_KEY not found in environment variables")
 
+# Only the chatbot needs Gemini, and it answers 500 on its own without a key
+readiness.register("gemini_api_key", "chatbot", env_check("GEMINI_API_KEY"), critical=False)
+
+# Persona used both inline and as the system instruction of a Gemini context cache
+ASSISTANT_INSTRUCTIONS = "You are a friendly and helpful AI assistant. I'm going to share some content with you, and then ask you a question about it. Please respond naturally and conversationally, like you're having a chat with a friend."
+ANSWER_INSTRUCTIONS = "Please give me a natural, conversational response. Don't format your answer in markdown or use special formatting - just talk to me like a regular conversation. If you can't find the answer in the content I shared, just let me know in a friendly way that you don't see that information in what I provided."
+
+SUMMARY_INSTRUCTIONS = "Update the summary of a conversation about a financial report. Keep every figure, decision and open question the user mentioned, drop small talk, and write at most a short paragraph of plain text."
+
+def _history_block(history: str) -> str:
+    return f"Here's what we've talked about so far:\n        {history}\n\n        " if history else ""
+
+def _inline_prompt(clean_text: str, user_question: str, history: str = "") -> str:
+    return f"""
+        {ASSISTANT_INSTRUCTIONS}
+
+        Here's the content I want you to understand and remember:
+        {clean_text}
+
+        {_history_block(history)}Now, my question is: {user_question}
+
+        {ANSWER_INSTRUCTIONS}
+        """
+
+def _excerpt_prompt(excerpts: str, user_question: str, history: str = "") -> str:
+    return f"""
+        {ASSISTANT_INSTRUCTIONS}
+
+        Here are the parts of the content that relate to my question (sections are separated by "..."):
+        {excerpts}
+
+        {_history_block(history)}Now, my question is: {user_question}
+
+        {ANSWER_INSTRUCTIONS}
+        """
+
+def _cached_prompt(user_question: str, history: str = "") -> str:
+    # The content already lives in the Gemini context cache
+    return f"""
+        {_history_block(history)}Now, my question is: {user_question}
+
+        {ANSWER_INSTRUCTIONS}
+        """
+
+def _context_cache_instruction() -> str:
+    return f"{ASSISTANT_INSTRUCTIONS}\n\nThe content I want you to understand and remember is provided in this conversation's context."
+
 @router.get("/")
 def index(request: Request):
     """Render the chatbot interface"""
     return templates.TemplateResponse("index.html", {"request": request})
 
-@router.post("/chat")
-async def chat_with_markdown(
-    markdown_input: str = Form(...),
-    user_question: str = Form(...)
+@router.post("/documents")
+async def register_document(
+    markdown_input: str = Form(...)
 ):
     """
-    Process user question based on provided markdown content using Gemini AI
+    Register a document for chat and return its doc_id (SHA-256 of the markdown)
+    
+    The cleaned text is cached server-side so /chat calls can send just doc_id and the
+    question. Documents answered from their full text are uploaded once as a Gemini context
+    cache when large enough; larger documents get their retrieval index built up front.
     """
     try:
-        if not model:
-            return JSONResponse(
-                status_code=500,
-                content={"error": "Gemini API key not configured. Please set GEMINI_API_KEY environment variable."}
-            )
+        document, created = await asyncio.to_thread(document_cache.register, markdown_input)
+        context_cache = False
+        if needs_full_context(document.text):
+            if model:
+                context_cache = await asyncio.to_thread(ensure_context_cache, document, GEMINI_MODEL_NAME, _context_cache_instruction())
+        else:
+            await asyncio.to_thread(document_context, document, "")
         
-        # Convert markdown to plain text for better understanding
-        html_content = markdown.markdown(markdown_input)
-        # Remove HTML tags to get clean text
-        import re
-        clean_text = re.sub('<[^<]+?>', '', html_content)
+        return JSONResponse(content={
+            "success": True,
+            "doc_id": document.doc_id,
+            "created": created,
+            "characters": len(document.text),
+            "retrieval": not needs_full_context(document.text),
+            "context_cache": context_cache
+        })
         
-        # Create a more natural conversational prompt for Gemini
-        prompt = f"""
-        You are a friendly and helpful AI assistant. I'm going to share some content with you, and then ask you a question about it. Please respond naturally and conversationally, like you're having a chat with a friend.
+    except Exception as e:
+        logging.error(f"Error registering document: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"An error occurred while registering the document: {str(e)}"
+            }
+        )
 
-        Here's the content I want you to understand and remember:
-        {clean_text}
+class ChatRequestError(Exception):
+    """A chat request that cannot be answered; carries the JSON error response"""
+    def __init__(self, status_code: int, content: dict):
+        super().__init__(content.get("error"))
+        self.status_code = status_code
+        self.content = content
 
-        Now, my question is: {user_question}
+async def _resolve_document(markdown_input: Optional[str], doc_id: Optional[str]):
+    """The registered document for a chat request, registering markdown_input on the fly"""
+    if not model:
+        raise ChatRequestError(500, {"error": "Gemini API key not configured. Please set GEMINI_API_KEY environment variable."})
+    
+    document = document_cache.get(doc_id) if doc_id else None
+    if document is None:
+        if not markdown_input:
+            if doc_id:
+                raise ChatRequestError(404, {
+                    "success": False,
+                    "error": "Unknown or expired doc_id. Register the document again.",
+                    "doc_id": doc_id
+                })
+            raise ChatRequestError(400, {"success": False, "error": "Either doc_id or markdown_input is required"})
+        document, _ = await asyncio.to_thread(document_cache.register, markdown_input)
+    return document
 
-        Please give me a natural, conversational response. Don't format your answer in markdown or use special formatting - just talk to me like a regular conversation. If you can't find the answer in the content I shared, just let me know in a friendly way that you don't see that information in what I provided.
-        """
+async def _plan_answer(document, user_question: str, session=None):
+    """
+    Pick the model and prompt for a question: (model, prompt, context, uses_context_cache, history)
+    
+    Large documents send only the chunks relevant to the question; full-text answers use
+    the Gemini context cache when the document has one, otherwise the text goes inline.
+    With a session, its history gets whatever is left of MAX_PROMPT_TOKENS.
+    """
+    # Follow-ups like "and under the new regime?" retrieve with the previous question too
+    query = f"{session.turns[-1].question} {user_question}" if session and session.turns else user_question
+    excerpts = await asyncio.to_thread(document_context, document, query)
+    if excerpts is not None:
+        answer_model, context, uses_context_cache = model, "excerpts", False
+        build = lambda history: _excerpt_prompt(excerpts, user_question, history)
+    elif await asyncio.to_thread(ensure_context_cache, document, GEMINI_MODEL_NAME, _context_cache_instruction()):
+        answer_model, context, uses_context_cache = genai.GenerativeModel.from_cached_content(cached_content=document.context_cache), "full", True
+        build = lambda history: _cached_prompt(user_question, history)
+    else:
+        answer_model, context, uses_context_cache = model, "full", False
+        build = lambda history: _inline_prompt(document.text, user_question, history)
+    
+    history = session.history(MAX_PROMPT_TOKENS - estimate_tokens(build(""))) if session else ""
+    return answer_model, build(history), context, uses_context_cache, history
+
+async def _summarize_turns(summary: str, turns) -> str:
+    """Fold turns that left a session's recent window into its rolling summary"""
+    conversation = "\n\n".join(turn.format() for turn in turns)
+    prompt = f"{SUMMARY_INSTRUCTIONS}\n\nCurrent summary: {summary or '(none)'}\n\nNew messages:\n{conversation}\n\nUpdated summary:"
+    async with gemini_limiter.slot():
+        response = await model.generate_content_async(prompt)
+    return response.text
+
+def _busy_response(e: LimiterBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"success": False, "error": str(e)},
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def _chunk_text(chunk) -> str:
+    # Chunks without text parts (e.g. a final safety or usage chunk) raise on .text
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+@router.post("/chat")
+async def chat_with_markdown(
+    user_question: str = Form(...),
+    markdown_input: Optional[str] = Form(None),
+    doc_id: Optional[str] = Form(None),
+    session_id: Optional[str] = Form(None)
+):
+    """
+    Process user question based on provided markdown content using Gemini AI
+    
+    Pass doc_id from /chatbot/documents to reuse a registered document; markdown_input is
+    still accepted and is registered on the fly (its doc_id is returned for follow-ups).
+    Pass session_id to answer with the conversation so far; the response carries the
+    session_id to send with the next question. Repeated questions about the same
+    document are answered from the answer cache without calling Gemini.
+    """
+    try:
+        document = await _resolve_document(markdown_input, doc_id)
+        session = session_store.get_or_create(session_id, document.doc_id)
+        
+        cached = answer_cache.lookup(document.doc_id, user_question)
+        if cached:
+            session_store.record_turn(session, user_question, cached.answer, _summarize_turns)
+            return JSONResponse(content={
+                "success": True,
+                "response": cached.answer,
+                "processed_markdown": document.html,
+                "doc_id": document.doc_id,
+                "session_id": session.session_id,
+                "context": cached.context,
+                "cached": True
+            })
         
-        # Generate response using Gemini
-        response = model.generate_content(prompt)
+        answer_model, prompt, context, uses_context_cache, history = await _plan_answer(document, user_question, session)
         
+        # Async Gemini calls, at most CHATBOT_MAX_CONCURRENT_REQUESTS at a time
+        async with gemini_limiter.slot():
+            try:
+                response = await answer_model.generate_content_async(prompt)
+            except Exception as e:
+                if not uses_context_cache:
+                    raise
+                # Expired or deleted upstream; answer inline and let the next turn recreate it
+                logging.warning(f"Gemini context cache failed, answering inline: {str(e)}")
+                document.context_cache = None
+                response = await model.generate_content_async(_inline_prompt(document.text, user_question, history))
+        
+        session_store.record_turn(session, user_question, response.text, _summarize_turns)
+        # Answers shaped by earlier turns must not be served to other conversations
+        if not history:
+            answer_cache.store(document.doc_id, user_question, response.text, context)
         return JSONResponse(content={
             "success": True,
             "response": response.text,
-            "processed_markdown": html_content
+            "processed_markdown": document.html,
+            "doc_id": document.doc_id,
+            "session_id": session.session_id,
+            "context": context,
+            "cached": False
         })
         
+    except ChatRequestError as e:
+        return JSONResponse(status_code=e.status_code, content=e.content)
+    except LimiterBusy as e:
+        return _busy_response(e)
+    except Exception as e:
+        logging.error(f"Error in chat processing: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"An error occurred while processing your request: {str(e)}"
+            }
+        )
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_with_markdown_stream(
+    request: Request,
+    user_question: str = Form(...),
+    markdown_input: Optional[str] = Form(None),
+    doc_id: Optional[str] = Form(None),
+    session_id: Optional[str] = Form(None)
+):
+    """
+    Streaming variant of /chat over Server-Sent Events
+    
+    Emits `meta` (doc_id, session_id, context), one `token` event per Gemini stream chunk, then `done`
+    with the full response, or `error`. The Gemini stream is cancelled as soon as the
+    client disconnects. Cached answers are sent as a single `token` event; otherwise
+    returns 429 up front when the Gemini queue is full.
+    """
+    try:
+        document = await _resolve_document(markdown_input, doc_id)
+        session = session_store.get_or_create(session_id, document.doc_id)
+        cached = answer_cache.lookup(document.doc_id, user_question)
+        if cached:
+            session_store.record_turn(session, user_question, cached.answer, _summarize_turns)
+            return StreamingResponse(
+                iter([
+                    _sse("meta", {"doc_id": document.doc_id, "session_id": session.session_id, "context": cached.context, "cached": True}),
+                    _sse("token", {"text": cached.answer}),
+                    _sse("done", {"success": True, "response": cached.answer, "doc_id": document.doc_id, "session_id": session.session_id}),
+                ]),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        if gemini_limiter.is_full():
+            return _busy_response(LimiterBusy("The assistant is busy right now. Please try again in a few seconds."))
+        answer_model, prompt, context, uses_context_cache, history = await _plan_answer(document, user_question, session)
+    except ChatRequestError as e:
+        return JSONResponse(status_code=e.status_code, content=e.content)
     except Exception as e:
         logging.error(f"Error in chat processing: {str(e)}")
         return JSONResponse(
@@ -78,6 +317,50 @@ async def chat_with_markdown(
                 "error": f"An error occurred while processing your request: {str(e)}"
             }
         )
+    
+    async def events():
+        yield _sse("meta", {"doc_id": document.doc_id, "session_id": session.session_id, "context": context, "cached": False})
+        parts = []
+        try:
+            # The slot is taken inside the generator so a cancelled stream always releases it
+            async with gemini_limiter.slot():
+                try:
+                    stream = await answer_model.generate_content_async(prompt, stream=True)
+                except Exception as e:
+                    if not uses_context_cache:
+                        raise
+                    logging.warning(f"Gemini context cache failed, answering inline: {str(e)}")
+                    document.context_cache = None
+                    stream = await model.generate_content_async(_inline_prompt(document.text, user_question, history), stream=True)
+                
+                async for chunk in stream:
+                    if await request.is_disconnected():
+                        logging.info("Chat stream client disconnected; cancelling Gemini stream")
+                        return
+                    text = _chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield _sse("token", {"text": text})
+            # Only completed answers become part of the conversation
+            session_store.record_turn(session, user_question, "".join(parts), _summarize_turns)
+            if not history:
+                answer_cache.store(document.doc_id, user_question, "".join(parts), context)
+            yield _sse("done", {"success": True, "response": "".join(parts), "doc_id": document.doc_id, "session_id": session.session_id})
+        except LimiterBusy as e:
+            yield _sse("error", {"success": False, "error": str(e), "retry_after": e.retry_after})
+        except asyncio.CancelledError:
+            # Raised into the generator when the server cancels the response on disconnect
+            logging.info("Chat stream cancelled")
+            raise
+        except Exception as e:
+            logging.error(f"Error in chat stream: {str(e)}")
+            yield _sse("error", {"success": False, "error": f"An error occurred while processing your request: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/process-markdown")
 async def process_markdown_only(
@@ -87,8 +370,8 @@ async def process_markdown_only(
     Process markdown content and return HTML preview
     """
     try:
-        # Convert markdown to HTML
-        html_content = markdown.markdown(markdown_input)
+        # Rendered once per distinct document; the HTML is reused by chat registration
+        html_content = markdown_renderer.render(markdown_input).html
         
         return JSONResponse(content={
             "success": True,
@@ -113,5 +396,10 @@ async def health_check():
     return {
         "status": "healthy",
         "gemini_api": gemini_status,
-        "service": "chatbot"
+        "service": "chatbot",
+        "document_cache": document_cache.metrics(),
+        "gemini_queue": gemini_limiter.metrics(),
+        "render_cache": markdown_renderer.metrics(),
+        "sessions": session_store.metrics(),
+        "answer_cache": answer_cache.metrics()
     }
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Answer cache for repeated chatbot questions
+Answers are cached per (doc_id, normalized question), so "What is my tax liability?" and
+"what's my tax liability" hit the same entry. Questions that miss exactly can still hit
+a near-duplicate: one whose terms contain (or are contained in) theirs with a Jaccard
+similarity of at least CHATBOT_ANSWER_CACHE_SIMILARITY, as long as the extra terms are
+not figures or section numbers ("80C gap" never answers "80C and 80D gap").
+Entries expire after CHATBOT_ANSWER_CACHE_TTL_MINUTES and the cache is LRU-bounded.
+Follow-ups that only make sense within a conversation ("why?", "what about that?") are
+never cached or served from the cache, and the routes only store answers generated
+without conversation history.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from .retrieval import tokenize
+
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("CHATBOT_ANSWER_CACHE_MAX_ENTRIES", "2048"))
+ANSWER_CACHE_TTL_MINUTES = float(os.getenv("CHATBOT_ANSWER_CACHE_TTL_MINUTES", "60"))
+# Term-set similarity above which two questions are treated as the same
+ANSWER_CACHE_SIMILARITY = float(os.getenv("CHATBOT_ANSWER_CACHE_SIMILARITY", "0.6"))
+MIN_QUESTION_TERMS = 2
+
+FOLLOW_UP_PATTERN = re.compile(r"\b(it|its|that|this|those|these|them|they|above|previous|earlier|again|else|more|same)\b|^(and|but|also|what about|how about)\b")
+
+
+def question_terms(question: str) -> FrozenSet[str]:
+    """Content words of a question with plurals folded, e.g. {"tax", "liability"}"""
+    terms = set()
+    for token in tokenize(question.replace("'s", "")):
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.add(token)
+    return frozenset(terms)
+
+
+def is_near_duplicate(terms: FrozenSet[str], other: FrozenSet[str], similarity: float = ANSWER_CACHE_SIMILARITY) -> Optional[float]:
+    """
+    Jaccard similarity when one question only adds words to the other, None otherwise;
+    "old regime tax" vs "new regime tax" differ in a term and never match
+    """
+    if not (terms <= other or other <= terms):
+        return None
+    if any(any(c.isdigit() for c in term) for term in terms ^ other):
+        return None
+    score = len(terms & other) / len(terms | other)
+    return score if score >= similarity else None
+
+
+def is_cacheable(question: str) -> bool:
+    """Standalone questions only; short or referential follow-ups depend on the conversation"""
+    normalized = question.lower().strip()
+    return len(question_terms(normalized)) >= MIN_QUESTION_TERMS and not FOLLOW_UP_PATTERN.search(normalized)
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    context: str
+    terms: FrozenSet[str]
+    created_at: float
+    hits: int = 0
+
+
+class AnswerCache:
+    """
+    LRU of answers per document with TTL and near-duplicate lookup
+    """
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, ttl_minutes: float = ANSWER_CACHE_TTL_MINUTES,
+                 similarity: float = ANSWER_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_minutes * 60
+        self.similarity = similarity
+        self.entries: "OrderedDict[Tuple[str, FrozenSet[str]], CachedAnswer]" = OrderedDict()
+        # doc_id -> keys of its entries, for the near-duplicate scan
+        self.by_document: Dict[str, set] = {}
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "uncacheable": 0, "stored": 0, "expired": 0, "evicted": 0}
+
+    def _remove(self, key):
+        self.entries.pop(key, None)
+        keys = self.by_document.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_document[key[0]]
+
+    def _fresh(self, key, entry: CachedAnswer) -> bool:
+        if time.time() - entry.created_at <= self.ttl_seconds:
+            return True
+        self._remove(key)
+        self.stats["expired"] += 1
+        return False
+
+    def lookup(self, doc_id: str, question: str) -> Optional[CachedAnswer]:
+        """The cached answer for this or a near-identical question about the document"""
+        if not is_cacheable(question):
+            with self.lock:
+                self.stats["uncacheable"] += 1
+            return None
+        terms = question_terms(question)
+        with self.lock:
+            key = (doc_id, terms)
+            entry = self.entries.get(key)
+            if entry is not None and self._fresh(key, entry):
+                self.stats["hits"] += 1
+            else:
+                entry = None
+                best = 0.0
+                for candidate_key in list(self.by_document.get(doc_id, ())):
+                    candidate = self.entries[candidate_key]
+                    score = is_near_duplicate(terms, candidate.terms, self.similarity)
+                    if score is not None and score > best and self._fresh(candidate_key, candidate):
+                        entry, key, best = candidate, candidate_key, score
+                if entry is None:
+                    self.stats["misses"] += 1
+                    return None
+                self.stats["near_hits"] += 1
+            entry.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+    def store(self, doc_id: str, question: str, answer: str, context: str = "full"):
+        if not answer.strip() or not is_cacheable(question):
+            return
+        terms = question_terms(question)
+        key = (doc_id, terms)
+        with self.lock:
+            self.entries[key] = CachedAnswer(question, answer, context, terms, time.time())
+            self.entries.move_to_end(key)
+            self.by_document.setdefault(doc_id, set()).add(key)
+            self.stats["stored"] += 1
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+                self.stats["evicted"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            hits = self.stats["hits"] + self.stats["near_hits"]
+            lookups = hits + self.stats["misses"] + self.stats["uncacheable"]
+            return {
+                **self.stats,
+                "entries": len(self.entries),
+                "documents": len(self.by_document),
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Global cache instance
+answer_cache = AnswerCache()
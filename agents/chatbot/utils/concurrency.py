@@ -0,0 +1,100 @@
+"""
+Concurrency limiter for Gemini calls from the chatbot
+At most CHATBOT_MAX_CONCURRENT_REQUESTS questions are sent to Gemini at once; up to
+CHATBOT_MAX_QUEUED_REQUESTS more wait for a slot, and anything beyond that (or waiting
+longer than CHATBOT_QUEUE_TIMEOUT_SECONDS) is rejected so the route can answer 429.
+Gemini calls use the async client, so waiting and generating never block the event loop
+shared with the other agents; tests/test_chatbot_concurrency.py checks that /chatbot/health
+stays responsive while 50 chats are in flight.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("CHATBOT_MAX_CONCURRENT_REQUESTS", "8"))
+MAX_QUEUED_REQUESTS = int(os.getenv("CHATBOT_MAX_QUEUED_REQUESTS", "32"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("CHATBOT_QUEUE_TIMEOUT_SECONDS", "30"))
+
+
+class LimiterBusy(Exception):
+    """Raised when the queue is full or the wait for a slot timed out"""
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Semaphore with a bounded wait queue and counters for the health endpoint
+    """
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS, max_queued: int = MAX_QUEUED_REQUESTS,
+                 queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        # Requests holding or waiting for a slot
+        self.admitted = 0
+        self.stats = {"completed": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+        self._total_wait = 0.0
+
+    def is_full(self) -> bool:
+        """True when a new request would be rejected right away"""
+        return self.admitted >= self.max_concurrent + self.max_queued
+
+    async def acquire(self):
+        if self.is_full():
+            self.stats["rejected_queue_full"] += 1
+            raise LimiterBusy("The assistant is busy right now. Please try again in a few seconds.")
+        self.admitted += 1
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.admitted -= 1
+            self.stats["rejected_timeout"] += 1
+            raise LimiterBusy("The assistant is busy right now. Please try again in a few seconds.")
+        except BaseException:
+            # Cancelled while queued (e.g. the client went away)
+            self.admitted -= 1
+            raise
+        finally:
+            self.waiting -= 1
+            self._total_wait += time.perf_counter() - started
+        self.active += 1
+
+    def release(self):
+        self.admitted -= 1
+        self.active -= 1
+        self.stats["completed"] += 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one Gemini slot for the duration of the block"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        served = self.stats["completed"] + self.active
+        return {
+            **self.stats,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "average_wait_ms": round(self._total_wait / served * 1000, 1) if served else 0.0,
+        }
+
+
+# Global limiter shared by /chat and /chat/stream
+gemini_limiter = ConcurrencyLimiter()
@@ -0,0 +1,172 @@
+"""
+Server-side document cache for the chatbot
+Markdown registered through /chatbot/documents is cleaned once and kept in a bounded LRU
+keyed by its SHA-256 (the doc_id), so chat turns only send the question. When the
+document is large enough, it is also uploaded once as a Gemini context cache and later
+turns are answered from that cache instead of resending the text.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from .rendering import markdown_renderer
+
+logger = logging.getLogger(__name__)
+
+DOC_CACHE_MAX_DOCUMENTS = int(os.getenv("CHATBOT_DOC_CACHE_MAX_DOCUMENTS", "256"))
+DOC_CACHE_MAX_BYTES = int(os.getenv("CHATBOT_DOC_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Gemini rejects context caches below a minimum token count; ~4 characters per token
+CONTEXT_CACHE_MIN_CHARS = int(os.getenv("CHATBOT_CONTEXT_CACHE_MIN_CHARS", "8000"))
+CONTEXT_CACHE_TTL_MINUTES = float(os.getenv("CHATBOT_CONTEXT_CACHE_TTL_MINUTES", "30"))
+
+def document_id(markdown_input: str) -> str:
+    """Content hash used as the doc_id"""
+    return hashlib.sha256(markdown_input.encode("utf-8")).hexdigest()
+
+
+def markdown_to_text(markdown_input: str, digest: Optional[str] = None) -> Tuple[str, str]:
+    """Render markdown and return (html, plain text), reusing earlier renders of the same content"""
+    rendered = markdown_renderer.render(markdown_input, digest)
+    return rendered.html, rendered.text
+
+
+@dataclass
+class ChatDocument:
+    doc_id: str
+    markdown: str
+    html: str
+    text: str
+    created_at: float
+    # Gemini CachedContent holding the text, when one was created
+    context_cache: Any = None
+    context_cache_expires_at: float = 0.0
+    context_cache_failed: bool = False
+    # BM25 index over the markdown chunks, built on first use for large documents
+    retrieval_index: Any = None
+    # Guards the lazily built state above
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def size(self) -> int:
+        return len(self.markdown) + len(self.html) + len(self.text)
+
+    def has_context_cache(self) -> bool:
+        # Treat caches about to expire as gone so a turn never races the TTL
+        return self.context_cache is not None and time.time() < self.context_cache_expires_at - 60
+
+
+class DocumentCache:
+    """
+    LRU of cleaned chat documents bounded by count and total size
+    """
+    def __init__(self, max_documents: int = DOC_CACHE_MAX_DOCUMENTS, max_bytes: int = DOC_CACHE_MAX_BYTES):
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.documents: "OrderedDict[str, ChatDocument]" = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {"registered": 0, "reused": 0, "evicted": 0, "misses": 0}
+
+    def register(self, markdown_input: str) -> Tuple[ChatDocument, bool]:
+        """
+        Clean and cache a document; returns (document, created)
+        """
+        doc_id = document_id(markdown_input)
+        existing = self.get(doc_id, count_miss=False)
+        if existing:
+            with self.lock:
+                self.stats["reused"] += 1
+            return existing, False
+
+        html_content, text = markdown_to_text(markdown_input, doc_id)
+        document = ChatDocument(doc_id=doc_id, markdown=markdown_input, html=html_content, text=text, created_at=time.time())
+        evicted = []
+        with self.lock:
+            if doc_id not in self.documents:
+                self.documents[doc_id] = document
+                self.size += document.size
+                self.stats["registered"] += 1
+            document = self.documents[doc_id]
+            while self.documents and (len(self.documents) > self.max_documents or self.size > self.max_bytes):
+                _, old = self.documents.popitem(last=False)
+                self.size -= old.size
+                self.stats["evicted"] += 1
+                evicted.append(old)
+        for old in evicted:
+            release_context_cache(old)
+        return document, True
+
+    def get(self, doc_id: str, count_miss: bool = True) -> Optional[ChatDocument]:
+        with self.lock:
+            document = self.documents.get(doc_id)
+            if document is not None:
+                self.documents.move_to_end(doc_id)
+            elif count_miss:
+                self.stats["misses"] += 1
+            return document
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                **self.stats,
+                "documents": len(self.documents),
+                "bytes": self.size,
+                "context_caches": sum(1 for d in self.documents.values() if d.has_context_cache()),
+            }
+
+
+def ensure_context_cache(document: ChatDocument, model_name: str, system_instruction: str) -> bool:
+    """
+    Upload the document as a Gemini context cache if it has none; returns True when one is usable
+
+    Small documents, SDKs without caching and API errors fall back to sending the text
+    inline; a failed upload is not retried for the same document.
+    """
+    if document.has_context_cache():
+        return True
+    if document.context_cache_failed or len(document.text) < CONTEXT_CACHE_MIN_CHARS:
+        return False
+    # One upload per document even when several turns arrive together
+    with document.lock:
+        if document.has_context_cache():
+            return True
+        try:
+            from google.generativeai import caching
+
+            ttl = timedelta(minutes=CONTEXT_CACHE_TTL_MINUTES)
+            document.context_cache = caching.CachedContent.create(
+                model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+                display_name=f"chatbot-{document.doc_id[:16]}",
+                system_instruction=system_instruction,
+                contents=[document.text],
+                ttl=ttl,
+            )
+            document.context_cache_expires_at = time.time() + ttl.total_seconds()
+            return True
+        except Exception as e:
+            logger.warning(f"Gemini context cache unavailable for {document.doc_id[:12]}: {e}")
+            document.context_cache = None
+            document.context_cache_failed = True
+            return False
+
+
+def release_context_cache(document: ChatDocument):
+    """Delete a document's Gemini context cache (best effort; it also expires on its own)"""
+    cache, document.context_cache = document.context_cache, None
+    if cache is None:
+        return
+    try:
+        cache.delete()
+    except Exception as e:
+        logger.info(f"Could not delete Gemini context cache for {document.doc_id[:12]}: {e}")
+
+
+# Global cache instance
+document_cache = DocumentCache()
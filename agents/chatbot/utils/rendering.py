@@ -0,0 +1,178 @@
+"""
+Markdown rendering for the chatbot
+One configured Markdown instance renders a document once into both HTML and plain text:
+the text is read from the parsed element tree rather than by stripping tags from the
+HTML. Results are kept in an LRU keyed by the content's SHA-256 and bounded by size, so
+/process-markdown and chat document registration never render the same report twice.
+
+Run `python -m chatbot.utils.rendering` for throughput numbers on 20-100 KB CA reports.
+"""
+
+import hashlib
+import html
+import re
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import markdown
+from markdown.treeprocessors import Treeprocessor
+
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv("CHATBOT_RENDER_CACHE_MAX_ENTRIES", "512"))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("CHATBOT_RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+TAG_PATTERN = re.compile(r"<[^<]+?>")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+
+@dataclass
+class RenderedMarkdown:
+    digest: str
+    html: str
+    text: str
+
+    @property
+    def size(self) -> int:
+        return len(self.html) + len(self.text)
+
+
+class _TextCapture(Treeprocessor):
+    """Keeps the final element tree so its text can be read after serialization"""
+    def run(self, root):
+        self.root = root
+
+
+class MarkdownRenderer:
+    """
+    Reusable Markdown instance with an LRU of rendered documents
+    """
+    def __init__(self, max_entries: int = RENDER_CACHE_MAX_ENTRIES, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._md = markdown.Markdown()
+        self._capture = _TextCapture(self._md)
+        # After inline patterns and unescaping, so the tree holds the final text
+        self._md.treeprocessors.register(self._capture, "chatbot_text", -10)
+        # Markdown instances are not thread-safe
+        self._render_lock = threading.Lock()
+        self.entries: "OrderedDict[str, RenderedMarkdown]" = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def _convert(self, markdown_input: str, digest: str) -> RenderedMarkdown:
+        with self._render_lock:
+            self._md.reset()
+            html_content = self._md.convert(markdown_input)
+            root = self._capture.root
+            self._capture.root = None
+            text = "".join(root.itertext()) if root is not None else ""
+            # Raw HTML is stashed out of the tree; put it back without its tags
+            for i, block in enumerate(self._md.htmlStash.rawHtmlBlocks):
+                text = text.replace(self._md.htmlStash.get_placeholder(i), TAG_PATTERN.sub("", str(block)))
+        text = BLANK_LINES_PATTERN.sub("\n\n", html.unescape(text)).strip()
+        return RenderedMarkdown(digest=digest, html=html_content, text=text)
+
+    def render(self, markdown_input: str, digest: Optional[str] = None) -> RenderedMarkdown:
+        """
+        HTML and plain text for the markdown; pass digest when the SHA-256 is already known
+        """
+        digest = digest or hashlib.sha256(markdown_input.encode("utf-8")).hexdigest()
+        with self.lock:
+            rendered = self.entries.get(digest)
+            if rendered is not None:
+                self.entries.move_to_end(digest)
+                self.stats["hits"] += 1
+                return rendered
+            self.stats["misses"] += 1
+
+        rendered = self._convert(markdown_input, digest)
+        if rendered.size > self.max_bytes:
+            return rendered
+        with self.lock:
+            if digest not in self.entries:
+                self.entries[digest] = rendered
+                self.size += rendered.size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, old = self.entries.popitem(last=False)
+                self.size -= old.size
+                self.stats["evicted"] += 1
+        return rendered
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Global renderer shared by the chatbot routes and the document cache
+markdown_renderer = MarkdownRenderer()
+
+
+def _sample_report(target_kb: int) -> str:
+    """Synthetic CA report of roughly target_kb kilobytes"""
+    section = (
+        "## {title}\n\n"
+        "The client's **{title_lower}** position was reviewed against the documents provided. "
+        "Figures are for *FY 2024-25* and compare the old & new tax regimes.\n\n"
+        "| Item | Old Regime | New Regime |\n|------|-----------|-----------|\n"
+        + "".join(f"| Line item {{n}}.{row} | ₹{{a}},{row}00 | ₹{{b}},{row}00 |\n" for row in range(8))
+        + "\n### Recommendations\n\n- Keep supporting receipts for {title_lower}.\n"
+        "- Review again before filing under section `{n}`.\n\n"
+        "> Note: figures above are estimates based on the uploaded statements.\n\n"
+    )
+    titles = ["Income", "Deductions 80C", "Health Insurance 80D", "HRA Exemption", "Capital Gains",
+              "Advance Tax", "TDS Reconciliation", "Home Loan Interest", "NPS 80CCD", "Business Expenses"]
+    parts, size, i = ["# CA Analysis Report\n\n"], 0, 0
+    while size < target_kb * 1024:
+        title = titles[i % len(titles)]
+        part = section.format(title=f"{title} {i // len(titles) + 1}", title_lower=title.lower(), n=i, a=10 + i, b=20 + i)
+        parts.append(part)
+        size += len(part.encode("utf-8"))
+        i += 1
+    return "".join(parts)
+
+
+def _benchmark(sizes_kb=(20, 50, 100), rounds: int = 20):
+    import time
+
+    renderer = MarkdownRenderer()
+    print(f"{'report':>8} {'markdown()+re.sub':>20} {'renderer cold':>15} {'renderer cached':>17}")
+    for size_kb in sizes_kb:
+        document = _sample_report(size_kb)
+        megabytes = len(document.encode("utf-8")) / 1e6
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            TAG_PATTERN.sub("", markdown.markdown(document))
+        baseline = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            renderer.clear()
+            renderer.render(document)
+        cold = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds * 50):
+            renderer.render(document)
+        warm = (time.perf_counter() - start) / (rounds * 50)
+
+        print(f"{size_kb:>6}KB {baseline * 1000:>9.1f} ms {megabytes / baseline:>5.1f} MB/s "
+              f"{cold * 1000:>6.1f} ms {megabytes / cold:>4.1f} MB/s {warm * 1e6:>8.0f} µs/hit")
+
+
+if __name__ == "__main__":
+    _benchmark()
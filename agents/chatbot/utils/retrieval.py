@@ -0,0 +1,235 @@
+"""
+Chunked BM25 retrieval for chatbot answers on large reports
+Markdown is split into heading- and table-aware chunks (tables are never cut mid-row
+and keep their header row when split), indexed once per document with BM25, and each
+question only sends the top-k chunks to Gemini. Short documents, and questions that
+need the whole report (summaries) or match no chunk, fall back to the full text.
+
+Run `python -m chatbot.utils.retrieval` for prompt-size and latency numbers on a
+synthetic CA report.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Documents up to this size are always sent whole
+FULL_CONTEXT_MAX_CHARS = int(os.getenv("CHATBOT_FULL_CONTEXT_MAX_CHARS", "16000"))
+RETRIEVAL_TOP_K = int(os.getenv("CHATBOT_RETRIEVAL_TOP_K", "6"))
+CHUNK_MAX_CHARS = int(os.getenv("CHATBOT_CHUNK_MAX_CHARS", "1200"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*\S)\s*#*\s*$")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Questions about the report as a whole are answered from the full text
+WHOLE_DOCUMENT_PATTERN = re.compile(r"\b(summar(?:y|ise|ize)|overview|overall|key (?:findings|points|takeaways)|whole report|entire report|tl;?dr)\b")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or should "
+    "so that the their there this to was what when where which who why will with you your".split()
+)
+
+
+@dataclass
+class Chunk:
+    index: int
+    # Heading trail such as "Tax Computation > Old Regime"
+    heading: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _split_block(lines: List[str], max_chars: int, is_table: bool) -> List[List[str]]:
+    """Split a paragraph or table into pieces under max_chars on line boundaries"""
+    header = lines[:2] if is_table and len(lines) > 2 and set(lines[1].replace("|", "").strip()) <= set("-: ") else []
+    body = lines[len(header):]
+    pieces, current, size = [], list(header), sum(len(l) + 1 for l in header)
+    for line in body:
+        if current[len(header):] and size + len(line) + 1 > max_chars:
+            pieces.append(current)
+            # Table pieces repeat the header row so each stays readable on its own
+            current, size = list(header), sum(len(l) + 1 for l in header)
+        current.append(line)
+        size += len(line) + 1
+    if current[len(header):] or not pieces:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_markdown(markdown_input: str, max_chars: int = CHUNK_MAX_CHARS) -> List[Chunk]:
+    """
+    Split markdown into chunks that follow its headings, keeping tables and paragraphs whole
+    where they fit in max_chars
+    """
+    chunks: List[Chunk] = []
+    trail: List[Tuple[int, str]] = []
+    blocks: List[Tuple[bool, List[str]]] = []
+
+    def flush_section():
+        heading = " > ".join(title for _, title in trail)
+        current: List[str] = []
+        for is_table, block in blocks:
+            block_chars = sum(len(l) + 1 for l in block)
+            if current and sum(len(l) + 1 for l in current) + block_chars > max_chars:
+                chunks.append(Chunk(len(chunks), heading, "\n".join(current).strip()))
+                current = []
+            if block_chars > max_chars:
+                for piece in _split_block(block, max_chars, is_table):
+                    chunks.append(Chunk(len(chunks), heading, "\n".join(piece).strip()))
+                continue
+            current.extend(block + [""])
+        if "\n".join(current).strip():
+            chunks.append(Chunk(len(chunks), heading, "\n".join(current).strip()))
+        blocks.clear()
+
+    block: List[str] = []
+    block_is_table = False
+    for line in markdown_input.splitlines():
+        stripped = line.strip()
+        heading = HEADING_PATTERN.match(stripped)
+        is_table_line = stripped.startswith("|")
+        if heading or not stripped or (block and is_table_line != block_is_table):
+            if block:
+                blocks.append((block_is_table, block))
+                block = []
+        if heading:
+            flush_section()
+            level = len(heading.group(1))
+            trail = [(l, t) for l, t in trail if l < level] + [(level, heading.group(2))]
+            continue
+        if stripped:
+            if not block:
+                block_is_table = is_table_line
+            block.append(line)
+    if block:
+        blocks.append((block_is_table, block))
+    flush_section()
+    return chunks
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a document's chunks; heading trails are indexed with the chunk text
+    """
+    def __init__(self, chunks: List[Chunk], k1: float = BM25_K1, b: float = BM25_B):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for chunk in chunks:
+            counts = Counter(tokenize(f"{chunk.heading}\n{chunk.text}"))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((chunk.index, tf))
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        n = len(chunks)
+        self.idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int = RETRIEVAL_TOP_K) -> List[Tuple[Chunk, float]]:
+        """Best chunks for the query with their scores, highest first; empty when nothing matches"""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / (self.average_length or 1))
+                scores[index] = scores.get(index, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self.chunks[index], score) for index, score in best]
+
+
+def format_chunks(chunks: List[Chunk]) -> str:
+    """Selected chunks in document order, each under its heading trail"""
+    parts = []
+    for chunk in sorted(chunks, key=lambda c: c.index):
+        parts.append(f"[{chunk.heading}]\n{chunk.text}" if chunk.heading else chunk.text)
+    return "\n\n...\n\n".join(parts)
+
+
+def needs_full_context(text: str) -> bool:
+    """Short documents are always sent whole"""
+    return len(text) <= FULL_CONTEXT_MAX_CHARS
+
+
+def select_context(index: Optional[BM25Index], question: str, top_k: int = RETRIEVAL_TOP_K) -> Optional[str]:
+    """
+    Top-k chunks relevant to the question, or None when the full text should be sent
+    (no index, a whole-document question, or no chunk matching the question)
+    """
+    if index is None or WHOLE_DOCUMENT_PATTERN.search(question.lower()):
+        return None
+    results = index.search(question, top_k)
+    if not results:
+        return None
+    return format_chunks([chunk for chunk, _ in results])
+
+
+def document_context(document, question: str, top_k: int = RETRIEVAL_TOP_K) -> Optional[str]:
+    """
+    Retrieved excerpts of a registered ChatDocument for the question, or None to send it whole
+
+    The BM25 index is built once per document and kept on it, so it lives as long as the
+    document stays in the document cache.
+    """
+    if needs_full_context(document.text):
+        return None
+    if document.retrieval_index is None:
+        with document.lock:
+            if document.retrieval_index is None:
+                document.retrieval_index = BM25Index(chunk_markdown(document.markdown))
+    return select_context(document.retrieval_index, question, top_k)
+
+
+def _benchmark(sections: int = 60):
+    import time
+
+    section = (
+        "## {title}\n\n"
+        "The client's {title_lower} position was reviewed against the documents provided. "
+        "Figures below are for FY 2024-25 and compare the old and new tax regimes.\n\n"
+        "| Item | Old Regime | New Regime |\n|------|-----------|-----------|\n"
+        + "".join(f"| Line item {{n}}.{row} | ₹{{a}},{row}00 | ₹{{b}},{row}00 |\n" for row in range(8))
+        + "\n### Notes\n\n- Keep supporting receipts for {title_lower}.\n- Review again before filing.\n\n"
+    )
+    titles = ["Income", "Deductions 80C", "Health Insurance 80D", "HRA Exemption", "Capital Gains",
+              "Advance Tax", "TDS Reconciliation", "Home Loan Interest", "NPS 80CCD", "Business Expenses"]
+    document = "# CA Analysis Report\n\n" + "".join(
+        section.format(title=f"{titles[i % len(titles)]} {i // len(titles) + 1}", title_lower=titles[i % len(titles)].lower(),
+                       n=i, a=10 + i, b=20 + i)
+        for i in range(sections)
+    )
+
+    start = time.perf_counter()
+    chunks = chunk_markdown(document)
+    index = BM25Index(chunks)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    questions = ["What is my HRA exemption?", "How much advance tax should I pay?", "What is my 80C gap?",
+                 "Compare capital gains under both regimes", "Summarize my report"]
+    start = time.perf_counter()
+    for _ in range(100):
+        contexts = [select_context(index, q) for q in questions]
+    query_us = (time.perf_counter() - start) / (100 * len(questions)) * 1e6
+
+    print(f"Document: {len(document) / 1024:.0f} KB, {len(chunks)} chunks, index built in {build_ms:.1f} ms, {query_us:.0f} µs per question")
+    for question, context in zip(questions, contexts):
+        size = len(context) if context is not None else len(document)
+        mode = "top-k" if context is not None else "full"
+        print(f"  {question:45} {mode:5} context {size / 1024:6.1f} KB ({size / len(document):.0%} of the report)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,206 @@
+"""
+Server-side conversation sessions for the chatbot
+Each session keeps its last CHATBOT_SESSION_RECENT_TURNS turns verbatim. Older turns are
+folded into a rolling summary by a background task after the answer has been sent, and
+the history put into a prompt is trimmed to CHATBOT_MAX_PROMPT_TOKENS. A long
+conversation therefore costs the same per turn as a short one.
+
+Run `python -m chatbot.utils.sessions` to see prompt size over a 40-turn conversation.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_RECENT_TURNS = int(os.getenv("CHATBOT_SESSION_RECENT_TURNS", "6"))
+SESSION_SUMMARY_MAX_CHARS = int(os.getenv("CHATBOT_SESSION_SUMMARY_MAX_CHARS", "2000"))
+SESSION_TTL_MINUTES = float(os.getenv("CHATBOT_SESSION_TTL_MINUTES", "60"))
+SESSION_MAX_SESSIONS = int(os.getenv("CHATBOT_SESSION_MAX_SESSIONS", "1000"))
+# Whole prompt, document context included; history gets whatever the rest leaves
+MAX_PROMPT_TOKENS = int(os.getenv("CHATBOT_MAX_PROMPT_TOKENS", "8000"))
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+# Folds (current summary, turns to add) into a new summary
+Summarizer = Callable[[str, List["Turn"]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting"""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class Turn:
+    question: str
+    answer: str
+
+    def format(self) -> str:
+        return f"Me: {self.question}\nYou: {self.answer}"
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    doc_id: str
+    turns: Deque[Turn] = field(default_factory=deque)
+    summary: str = ""
+    # Turns that left the recent window and are waiting to be summarized
+    pending: List[Turn] = field(default_factory=list)
+    summary_task: Optional[asyncio.Task] = field(default=None, repr=False)
+    updated_at: float = field(default_factory=time.time)
+
+    def history(self, budget_tokens: int) -> str:
+        """
+        Summary plus recent turns that fit in budget_tokens; the oldest recent turns are
+        dropped first, then the summary is shortened
+        """
+        if budget_tokens <= 0 or (not self.turns and not self.summary and not self.pending):
+            return ""
+        recent = [turn.format() for turn in self.turns]
+        # Turns not summarized yet are still sent verbatim so nothing goes missing meanwhile
+        recent = [turn.format() for turn in self.pending] + recent
+        summary = self.summary
+        while True:
+            parts = []
+            if summary:
+                parts.append(f"Summary of our earlier conversation: {summary}")
+            if recent:
+                parts.append("Our most recent messages:\n" + "\n\n".join(recent))
+            text = "\n\n".join(parts)
+            if estimate_tokens(text) <= budget_tokens:
+                return text
+            if recent:
+                recent.pop(0)
+            elif summary:
+                # Keep the latest part of the summary, leaving room for its label
+                summary = summary[-(budget_tokens * 4 - 64):] if budget_tokens * 4 > 64 else ""
+            else:
+                return ""
+
+
+def _fold_extractive(summary: str, turns: List[Turn]) -> str:
+    """Fallback when no summarizer is available: keep the latest text up to the size cap"""
+    added = " ".join(f"Asked: {t.question} Answered: {t.answer}" for t in turns)
+    folded = f"{summary} {added}".strip()
+    return folded[-SESSION_SUMMARY_MAX_CHARS:]
+
+
+class SessionStore:
+    """
+    In-memory sessions, expired after SESSION_TTL_MINUTES idle and bounded LRU-style
+    """
+    def __init__(self, max_sessions: int = SESSION_MAX_SESSIONS, ttl_minutes: float = SESSION_TTL_MINUTES,
+                 recent_turns: int = SESSION_RECENT_TURNS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_minutes * 60
+        self.recent_turns = recent_turns
+        self.sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self.stats = {"created": 0, "expired": 0, "evicted": 0, "summaries": 0, "summary_failures": 0}
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_seconds
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.updated_at >= cutoff:
+                break
+            self.sessions.popitem(last=False)
+            self.stats["expired"] += 1
+
+    def get_or_create(self, session_id: Optional[str], doc_id: str) -> ChatSession:
+        """
+        The session for session_id, starting a fresh one when it is unknown, expired or
+        was about another document
+        """
+        self._expire()
+        if not session_id or not SESSION_ID_PATTERN.match(session_id):
+            session_id = uuid.uuid4().hex
+        session = self.sessions.get(session_id)
+        if session is None or session.doc_id != doc_id:
+            session = ChatSession(session_id=session_id, doc_id=doc_id)
+            self.sessions[session_id] = session
+            self.stats["created"] += 1
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.stats["evicted"] += 1
+        session.updated_at = time.time()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def record_turn(self, session: ChatSession, question: str, answer: str, summarizer: Optional[Summarizer] = None):
+        """
+        Add a finished turn; turns pushed out of the recent window are summarized in the
+        background so the answer is never held up by it
+        """
+        session.turns.append(Turn(question, answer))
+        session.updated_at = time.time()
+        while len(session.turns) > self.recent_turns:
+            session.pending.append(session.turns.popleft())
+        if session.pending and (session.summary_task is None or session.summary_task.done()):
+            session.summary_task = asyncio.create_task(self._summarize(session, summarizer))
+
+    async def _summarize(self, session: ChatSession, summarizer: Optional[Summarizer]):
+        # Loops so turns that arrive while a summary is being written are folded in too
+        while session.pending:
+            batch = list(session.pending)
+            try:
+                if summarizer is None:
+                    raise RuntimeError("no summarizer")
+                summary = (await summarizer(session.summary, batch)).strip()
+                self.stats["summaries"] += 1
+            except Exception as e:
+                if summarizer is not None:
+                    logger.info(f"Rolling summary failed for session {session.session_id[:8]}, keeping extract: {e}")
+                    self.stats["summary_failures"] += 1
+                summary = _fold_extractive(session.summary, batch)
+            session.summary = summary[:SESSION_SUMMARY_MAX_CHARS]
+            del session.pending[:len(batch)]
+
+    def metrics(self) -> Dict[str, Any]:
+        self._expire()
+        return {
+            **self.stats,
+            "sessions": len(self.sessions),
+            "summaries_pending": sum(1 for s in self.sessions.values() if s.pending),
+        }
+
+
+# Global session store shared by /chat and /chat/stream
+session_store = SessionStore()
+
+
+def _benchmark(turns: int = 40):
+    """Prompt history size per turn with a stub summarizer"""
+
+    async def summarizer(summary: str, batch: List[Turn]) -> str:
+        await asyncio.sleep(0)
+        return f"{summary} The user asked about {', '.join(t.question for t in batch)}."[-600:]
+
+    async def run():
+        store = SessionStore()
+        session = store.get_or_create(None, "doc")
+        sizes = []
+        for i in range(turns):
+            history = session.history(MAX_PROMPT_TOKENS - 3000)
+            sizes.append(estimate_tokens(history))
+            answer = f"For question {i}, your 80C gap is ₹{i * 1000:,} and the new regime saves more. " * 4
+            store.record_turn(session, f"Question {i} about my deductions?", answer, summarizer)
+            await asyncio.sleep(0)
+        await session.summary_task
+        resent = sum(estimate_tokens(f"Me: Question {i} about my deductions?\nYou: " + "x" * 360) for i in range(turns))
+        print(f"{turns} turns: history tokens per turn at 1/10/20/40 = {sizes[0]}/{sizes[9]}/{sizes[19]}/{sizes[-1]}, "
+              f"max {max(sizes)}; resending everything would reach ~{resent}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,143 @@
+"""
+Shared async Cerebras client
+One AsyncCerebras client with a pooled, keep-alive httpx transport is opened by the app
+lifespan and reused by every request, instead of a new client (and TLS handshake) per
+call. Requests have connect/read timeouts, and connection errors, timeouts, 429s and
+5xx responses are retried with exponential backoff and full jitter (a 429 Retry-After
+is honoured). tests/test_cerebras_client.py runs the client against a local stand-in server.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+from cerebras.cloud.sdk import AsyncCerebras, APIConnectionError, APIStatusError
+
+logger = logging.getLogger(__name__)
+
+# Override to point at a proxy or a local stand-in server
+CEREBRAS_BASE_URL = os.getenv("CEREBRAS_BASE_URL") or None
+CEREBRAS_CONNECT_TIMEOUT_SECONDS = float(os.getenv("CEREBRAS_CONNECT_TIMEOUT_SECONDS", "10"))
+# Long generations (8000 tokens) stream for a while before the response completes
+CEREBRAS_READ_TIMEOUT_SECONDS = float(os.getenv("CEREBRAS_READ_TIMEOUT_SECONDS", "120"))
+CEREBRAS_MAX_RETRIES = int(os.getenv("CEREBRAS_MAX_RETRIES", "3"))
+CEREBRAS_BACKOFF_BASE_SECONDS = float(os.getenv("CEREBRAS_BACKOFF_BASE_SECONDS", "0.5"))
+CEREBRAS_BACKOFF_MAX_SECONDS = float(os.getenv("CEREBRAS_BACKOFF_MAX_SECONDS", "8"))
+CEREBRAS_MAX_CONNECTIONS = int(os.getenv("CEREBRAS_MAX_CONNECTIONS", "20"))
+CEREBRAS_KEEPALIVE_SECONDS = float(os.getenv("CEREBRAS_KEEPALIVE_SECONDS", "60"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class SharedCerebrasClient:
+    """
+    Lazily created AsyncCerebras client with pooled connections and jittered retries
+    """
+    def __init__(self, base_url: Optional[str] = CEREBRAS_BASE_URL, max_retries: int = CEREBRAS_MAX_RETRIES):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self._client: Optional[AsyncCerebras] = None
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def get(self) -> AsyncCerebras:
+        """The shared client, created on first use when the lifespan has not opened it"""
+        if self._client is None:
+            timeout = httpx.Timeout(CEREBRAS_READ_TIMEOUT_SECONDS, connect=CEREBRAS_CONNECT_TIMEOUT_SECONDS)
+            http_client = httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=CEREBRAS_MAX_CONNECTIONS,
+                    max_keepalive_connections=CEREBRAS_MAX_CONNECTIONS,
+                    keepalive_expiry=CEREBRAS_KEEPALIVE_SECONDS,
+                ),
+            )
+            self._client = AsyncCerebras(
+                api_key=os.environ.get("CEREBRAS_API_KEY"),
+                base_url=self.base_url,
+                timeout=timeout,
+                # Retries are handled below so the backoff is jittered and counted
+                max_retries=0,
+                http_client=http_client,
+            )
+        return self._client
+
+    async def start(self):
+        """Open the client at startup when an API key is configured"""
+        if os.environ.get("CEREBRAS_API_KEY"):
+            self.get()
+
+    async def aclose(self):
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None and getattr(error, "status_code", None) == 429:
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                pass
+        if retry_after is not None:
+            return min(retry_after, CEREBRAS_BACKOFF_MAX_SECONDS)
+        return random.uniform(0, min(CEREBRAS_BACKOFF_MAX_SECONDS, CEREBRAS_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def _retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the error should be raised"""
+        status = getattr(error, "status_code", None)
+        if attempt == self.max_retries or (status is not None and status not in RETRYABLE_STATUS_CODES):
+            self.stats["failures"] += 1
+            return None
+        delay = self._backoff(attempt, error)
+        self.stats["retries"] += 1
+        logger.warning(f"Cerebras request failed ({status or type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    async def create_chat_completion(self, **kwargs) -> Any:
+        """chat.completions.create on the shared client, retrying transient failures"""
+        client = self.get()
+        self.stats["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await client.chat.completions.create(**kwargs)
+            except (APIConnectionError, APIStatusError) as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def stream_chat_completion(self, **kwargs) -> AsyncIterator[str]:
+        """
+        Content deltas of a streamed completion; transient failures are retried until
+        the first delta arrives, after which a retry would repeat text and they raise
+        """
+        client = self.get()
+        self.stats["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            received = False
+            try:
+                stream = await client.chat.completions.create(stream=True, **kwargs)
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        received = True
+                        yield chunk.choices[0].delta.content
+                return
+            # A stream dropped mid-body surfaces as a raw httpx error
+            except (APIConnectionError, APIStatusError, httpx.TransportError) as e:
+                delay = None if received else self._retry_delay(attempt, e)
+                if delay is None:
+                    if received:
+                        self.stats["failures"] += 1
+                    raise
+                await asyncio.sleep(delay)
+
+    def metrics(self):
+        return {**self.stats, "open": self._client is not None}
+
+
+# Global client, opened and closed by the app lifespan
+cerebras_client = SharedCerebrasClient()
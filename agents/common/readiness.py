@@ -0,0 +1,196 @@
+"""
+Liveness and readiness probes shared by all agents
+Agents register dependency checks (config parsed, API keys present, S3 reachable,
+LLM endpoint reachable) at import time. A background loop runs them on an interval
+and caches the rendered result, so /health and /ready only return prebuilt bytes
+and never build crews or touch the network on the request path.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+READINESS_INTERVAL_SECONDS = float(os.getenv("READINESS_INTERVAL_SECONDS", "30"))
+READINESS_CHECK_TIMEOUT_SECONDS = float(os.getenv("READINESS_CHECK_TIMEOUT_SECONDS", "5"))
+
+# A check returns (ok, detail) or just ok; raising counts as a failure
+CheckResult = Union[bool, Tuple[bool, str]]
+
+
+@dataclass
+class ReadinessCheck:
+    name: str
+    agent: str
+    check: Callable[[], CheckResult]
+    critical: bool = True
+    result: Dict[str, Any] = field(default_factory=dict)
+    # Thread of a timed-out run; not restarted until it returns
+    pending: Optional[asyncio.Future] = None
+
+
+class ReadinessRegistry:
+    """
+    Registry of dependency checks with cached, pre-rendered probe responses
+    """
+    def __init__(self, interval: float = READINESS_INTERVAL_SECONDS, timeout: float = READINESS_CHECK_TIMEOUT_SECONDS):
+        self.interval = interval
+        self.timeout = timeout
+        self.checks: Dict[str, ReadinessCheck] = {}
+        self.started_at = time.time()
+        self.last_run: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = False
+        self._ready_body = self._render(self._status_payload("starting"))
+        self._agent_payloads: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, name: str, agent: str, check: Callable[[], CheckResult], critical: bool = True):
+        """
+        Add a dependency check; non-critical failures are reported but keep the service ready
+        """
+        key = f"{agent}.{name}"
+        self.checks[key] = ReadinessCheck(name=name, agent=agent, check=check, critical=critical)
+
+    # Background loop
+
+    def ensure_started(self):
+        """Start the background loop if it is not running (for servers without lifespan events)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_checks()
+            except Exception as e:
+                logger.error(f"Readiness checks failed to run: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_checks(self):
+        """Run every registered check concurrently and refresh the cached responses"""
+        await asyncio.gather(*(self._run_one(c) for c in self.checks.values()))
+        self.last_run = time.time()
+        self._refresh_cache()
+
+    async def _run_one(self, check: ReadinessCheck):
+        if check.pending and not check.pending.done():
+            check.result = {**check.result, "ok": False, "detail": "previous check still running"}
+            return
+        started = time.perf_counter()
+        future = asyncio.ensure_future(asyncio.to_thread(check.check))
+        try:
+            outcome = await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+            ok, detail = outcome if isinstance(outcome, tuple) else (bool(outcome), "")
+        except asyncio.TimeoutError:
+            check.pending = future
+            ok, detail = False, f"timed out after {self.timeout:g}s"
+        except Exception as e:
+            ok, detail = False, str(e) or type(e).__name__
+        check.result = {
+            "ok": ok,
+            "detail": detail,
+            "critical": check.critical,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        }
+
+    # Cached responses
+
+    def _status_payload(self, status: str) -> Dict[str, Any]:
+        return {
+            "status": status,
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.last_run)) if self.last_run else None,
+            "checks": {key: c.result for key, c in self.checks.items() if c.result},
+        }
+
+    def _refresh_cache(self):
+        self._ready = all(c.result.get("ok") for c in self.checks.values() if c.critical)
+        self._ready_body = self._render(self._status_payload("ready" if self._ready else "not_ready"))
+
+        agents: Dict[str, List[ReadinessCheck]] = {}
+        for c in self.checks.values():
+            agents.setdefault(c.agent, []).append(c)
+        self._agent_payloads = {
+            agent: {
+                "status": "ready" if all(c.result.get("ok") for c in checks if c.critical) else "not_ready",
+                "checks": {c.name: c.result for c in checks},
+            }
+            for agent, checks in agents.items()
+        }
+
+    @staticmethod
+    def _render(payload: Dict[str, Any]) -> bytes:
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    def liveness(self) -> Dict[str, Any]:
+        """Process is up; no dependency is consulted"""
+        return {"status": "healthy", "uptime_seconds": round(time.time() - self.started_at, 1)}
+
+    def readiness_response(self) -> Response:
+        """Cached readiness as a prebuilt JSON response (503 until critical checks pass)"""
+        return Response(
+            content=self._ready_body,
+            media_type="application/json",
+            status_code=200 if self._ready else 503,
+        )
+
+    def agent_status(self, agent: str) -> Dict[str, Any]:
+        """Cached readiness of one agent's checks"""
+        return self._agent_payloads.get(agent, {"status": "starting", "checks": {}})
+
+
+# Reusable checks
+
+def env_check(*names: str) -> Callable[[], CheckResult]:
+    """All of the environment variables are set"""
+    def check() -> CheckResult:
+        missing = [n for n in names if not os.getenv(n)]
+        return (not missing, f"missing: {', '.join(missing)}" if missing else "present")
+    return check
+
+
+def config_check(*paths: Path) -> Callable[[], CheckResult]:
+    """YAML config files exist and parse"""
+    def check() -> CheckResult:
+        import yaml
+
+        for path in paths:
+            with open(path, "r") as f:
+                yaml.safe_load(f)
+        return True, f"{len(paths)} files parsed"
+    return check
+
+
+def http_check(url: str, timeout: float = 3.0) -> Callable[[], CheckResult]:
+    """An HTTP endpoint answers; any status code (even 401/404) counts as reachable"""
+    def check() -> CheckResult:
+        request = urllib.request.Request(url, method="GET")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return True, f"HTTP {response.status}"
+        except urllib.error.HTTPError as e:
+            return True, f"HTTP {e.code}"
+    return check
+
+
+# Global registry instance
+readiness = ReadinessRegistry()
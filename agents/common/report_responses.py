@@ -0,0 +1,348 @@
+"""
+HTTP responses for report downloads
+Adds ETag/Last-Modified validators, 304 Not Modified, single byte-range reads and
+gzip/brotli content encoding to the report download routes of every agent.
+Compressed bodies are built on first read and kept in a small in-memory cache keyed
+on the file's ETag, so polling dashboards only pay for compression once per report.
+Reports held in the shared report store are served the same way, with the content hash
+as ETag; clients that accept zstd receive stored zstd blobs without recompression.
+"""
+
+import gzip
+import os
+import re
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from .report_store import StoredReport, report_store
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+CHUNK_SIZE = 64 * 1024
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+COMPRESSED_CACHE_MAX_BYTES = int(os.getenv("REPORT_COMPRESSED_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class CompressedCache:
+    """
+    LRU of compressed report bodies bounded by total size
+    """
+    def __init__(self, max_bytes: int = COMPRESSED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, str, str], body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+compressed_cache = CompressedCache()
+
+
+def resolve_report_path(directory: Path, filename: str) -> Optional[Path]:
+    """
+    Path of a report inside directory, or None if it is missing or escapes the directory
+    """
+    base = Path(directory).resolve()
+    path = (base / filename).resolve()
+    if path.parent != base or not path.is_file():
+        return None
+    return path
+
+
+def file_validators(path: Path) -> Dict[str, str]:
+    """ETag and Last-Modified headers for a file"""
+    stat = path.stat()
+    return {
+        "ETag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+    }
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x", and an encoding suffix matches its base tag
+    base = etag.strip('"')
+    for candidate in header.split(","):
+        tag = candidate.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == base or tag.rsplit("-", 1)[0] == base:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, validators: Dict[str, str], mtime: float) -> bool:
+    """
+    Evaluate If-None-Match (preferred) or If-Modified-Since against the validators
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, validators["ETag"])
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+def not_modified_response(request: Request, path: Path) -> Optional[Response]:
+    """
+    304 response when the client's cached copy of path is current, otherwise None
+    """
+    validators = file_validators(path)
+    if is_not_modified(request, validators, path.stat().st_mtime):
+        return Response(status_code=304, headers={**validators, "Cache-Control": "no-cache"})
+    return None
+
+
+def _accepted_encodings(request: Request) -> Dict[str, float]:
+    accepted = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    return accepted
+
+
+def _choose_encoding(request: Request) -> Optional[str]:
+    accepted = _accepted_encodings(request)
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compressed_body(source: str, etag: str, encoding: str, load: Callable[[], bytes]) -> bytes:
+    key = (source, etag, encoding)
+    body = compressed_cache.get(key)
+    if body is None:
+        raw = load()
+        body = brotli.compress(raw, quality=5) if encoding == "br" else gzip.compress(raw, compresslevel=6, mtime=0)
+        compressed_cache.put(key, body)
+    return body
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single bytes range; (-1, -1) when unsatisfiable.
+    Returns None for ranges we do not serve (multi-range, malformed), which means full content.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return -1, -1
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return -1, -1
+    return start, end
+
+
+def _iter_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def report_file_response(
+    request: Request,
+    path: Path,
+    media_type: str = "text/markdown",
+    download_name: Optional[str] = None,
+) -> Response:
+    """
+    Serve a report file with conditional GET, Range and content-encoding support
+
+    Range requests are answered from the identity encoding straight from disk; full
+    reads are compressed when the client accepts br or gzip.
+    """
+    stat = path.stat()
+    validators = file_validators(path)
+    headers = {
+        **validators,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if download_name:
+        headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+
+    if is_not_modified(request, validators, stat.st_mtime):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Disposition"})
+
+    size = stat.st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() in (validators["ETag"], validators["Last-Modified"])):
+        byte_range = _parse_range(range_header, size)
+        if byte_range == (-1, -1):
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            return StreamingResponse(
+                _iter_file(path, start, length),
+                status_code=206,
+                media_type=media_type,
+                headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(length)},
+            )
+
+    encoding = _choose_encoding(request) if size >= MIN_COMPRESS_BYTES else None
+    if encoding:
+        body = _compressed_body(str(path), validators["ETag"], encoding, path.read_bytes)
+        suffix = "br" if encoding == "br" else "gz"
+        return Response(
+            content=body,
+            media_type=media_type,
+            headers={**headers, "ETag": f'{validators["ETag"][:-1]}-{suffix}"', "Content-Encoding": encoding},
+        )
+
+    return StreamingResponse(
+        _iter_file(path, 0, size),
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(size)},
+    )
+
+
+def report_validators(report: StoredReport, representation: Optional[str] = None) -> Dict[str, str]:
+    """
+    ETag (content hash) and Last-Modified for a stored report. Other representations of
+    the report (e.g. the JSON wrapper) pass a name that prefixes the ETag; a prefix
+    rather than a suffix, since suffixes are read as content encodings of the base tag.
+    """
+    prefix = f"{representation}-" if representation else ""
+    return {
+        "ETag": f'"{prefix}{report.digest[:32]}"',
+        "Last-Modified": formatdate(report.created_at, usegmt=True),
+    }
+
+
+def report_not_modified_response(request: Request, report: StoredReport, representation: Optional[str] = None) -> Optional[Response]:
+    """
+    304 response when the client's cached copy of a stored report is current, otherwise None
+    """
+    validators = report_validators(report, representation)
+    if is_not_modified(request, validators, report.created_at):
+        return Response(status_code=304, headers={**validators, "Cache-Control": "no-cache"})
+    return None
+
+
+def stored_report_response(
+    request: Request,
+    report: StoredReport,
+    media_type: str = "text/markdown",
+    download_name: Optional[str] = None,
+) -> Response:
+    """
+    Serve a report from the shared store with the same semantics as report_file_response
+
+    Legacy plain files are streamed from disk; blobs are decompressed for identity and
+    Range responses, passed through as-is for zstd clients, or recompressed to br/gzip.
+    """
+    if report.is_legacy:
+        return report_file_response(request, report.path, media_type=media_type, download_name=download_name)
+
+    validators = report_validators(report)
+    headers = {
+        **validators,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if download_name:
+        headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+
+    if is_not_modified(request, validators, report.created_at):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Disposition"})
+
+    size = report.size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() in (validators["ETag"], validators["Last-Modified"])):
+        byte_range = _parse_range(range_header, size)
+        if byte_range == (-1, -1):
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            return Response(
+                content=report_store.read_bytes(report)[start:end + 1],
+                status_code=206,
+                media_type=media_type,
+                headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+            )
+
+    if size >= MIN_COMPRESS_BYTES:
+        if report.codec == "zstd" and _accepted_encodings(request).get("zstd", 0) > 0:
+            return Response(
+                content=report.path.read_bytes(),
+                media_type=media_type,
+                headers={**headers, "ETag": f'{validators["ETag"][:-1]}-zst"', "Content-Encoding": "zstd"},
+            )
+        encoding = _choose_encoding(request)
+        if encoding:
+            body = _compressed_body(report.digest, validators["ETag"], encoding, lambda: report_store.read_bytes(report))
+            suffix = "br" if encoding == "br" else "gz"
+            return Response(
+                content=body,
+                media_type=media_type,
+                headers={**headers, "ETag": f'{validators["ETag"][:-1]}-{suffix}"', "Content-Encoding": encoding},
+            )
+
+    return Response(content=report_store.read_bytes(report), media_type=media_type, headers=headers)
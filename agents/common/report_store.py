@@ -0,0 +1,465 @@
+"""
+Content-addressable report storage shared by the CA, ITR, equity and asset agents
+Report bodies are stored once per SHA-256 digest as compressed blobs (zstd when the
+zstandard package is installed, zlib otherwise) in a sharded tree, blobs/ab/cd/<digest>.
+A small SQLite index maps (namespace, filename) to a digest, so identical outputs share
+one blob and the public filenames used by the download routes stay unchanged.
+Blob and index writes are atomic; reads decompress transparently.
+
+Reports written before the store existed remain readable from each namespace's legacy
+directory and can be moved in with `python -m common.report_store --import-legacy`.
+Run `python -m common.report_store --benchmark` for disk usage and throughput numbers.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; zlib is always available
+    zstandard = None
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STORE_DIR = Path(os.getenv("REPORT_STORE_DIR", ROOT / "report_store"))
+
+ZSTD_LEVEL = int(os.getenv("REPORT_STORE_ZSTD_LEVEL", "10"))
+ZLIB_LEVEL = int(os.getenv("REPORT_STORE_ZLIB_LEVEL", "9"))
+
+# Directories each agent wrote plain .md reports to before the store
+LEGACY_DIRECTORIES = {
+    "ca": ROOT / "ca_agent" / "markdown_files",
+    "itr": ROOT / "ITR_agent" / "output_reports",
+    "equity": ROOT / "equity_agent" / "output_reports",
+    "asset": ROOT / "reports",
+}
+
+CODEC_SUFFIXES = {"zstd": ".zst", "zlib": ".zz"}
+
+
+@dataclass
+class StoredReport:
+    namespace: str
+    filename: str
+    digest: str
+    size: int
+    stored_size: int
+    created_at: float
+    # "zstd" or "zlib" for blobs, "plain" for legacy files
+    codec: str
+    path: Path
+
+    @property
+    def is_legacy(self) -> bool:
+        return self.codec == "plain"
+
+
+def _valid_filename(filename: str) -> bool:
+    return bool(filename) and Path(filename).name == filename and not filename.startswith(".")
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("report blob is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    return data
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write data to path via a temporary file in the same directory and os.replace"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class ReportStore:
+    """
+    Deduplicated, compressed report blobs with per-namespace filename references
+    """
+    def __init__(self, root: Optional[Path] = None, legacy_dirs: Optional[Dict[str, Path]] = None, codec: Optional[str] = None):
+        self.root = Path(root or DEFAULT_STORE_DIR)
+        self.blob_dir = self.root / "blobs"
+        self.index_path = self.root / "index.sqlite"
+        self.legacy_dirs = {k: Path(v) for k, v in (LEGACY_DIRECTORIES if legacy_dirs is None else legacy_dirs).items()}
+        self.codec = codec or ("zstd" if zstandard is not None else "zlib")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Index connection for the calling thread, opened once and reused"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # WAL keeps readers off the writer's lock; NORMAL sync is durable at checkpoints
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS refs (
+                namespace TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                codec TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, filename)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS refs_digest ON refs (digest)")
+        conn.commit()
+        self._local.conn = conn
+        return conn
+
+    def blob_path(self, digest: str, codec: str) -> Path:
+        """Sharded location of a blob: blobs/ab/cd/<digest>.zst"""
+        return self.blob_dir / digest[:2] / digest[2:4] / f"{digest}{CODEC_SUFFIXES[codec]}"
+
+    def _existing_blob(self, digest: str) -> Optional[Path]:
+        for codec in (self.codec, *[c for c in CODEC_SUFFIXES if c != self.codec]):
+            path = self.blob_path(digest, codec)
+            if path.exists():
+                return path
+        return None
+
+    @staticmethod
+    def _codec_of(path: Path) -> str:
+        return next(codec for codec, suffix in CODEC_SUFFIXES.items() if path.suffix == suffix)
+
+    # Writes
+
+    def put(self, namespace: str, filename: str, content: Union[str, bytes], created_at: Optional[float] = None) -> StoredReport:
+        """
+        Store a report under namespace/filename; identical content reuses the existing blob
+        """
+        if not _valid_filename(filename):
+            raise ValueError(f"Invalid report filename: {filename!r}")
+        data = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+        digest = hashlib.sha256(data).hexdigest()
+
+        # Held across the blob check and the index update so a concurrent delete cannot drop a reused blob
+        with self._lock:
+            blob = self._existing_blob(digest)
+            if blob is None:
+                blob = self.blob_path(digest, self.codec)
+                _atomic_write(blob, _compress(data, self.codec))
+
+            report = StoredReport(
+                namespace=namespace,
+                filename=filename,
+                digest=digest,
+                size=len(data),
+                stored_size=blob.stat().st_size,
+                created_at=created_at if created_at is not None else time.time(),
+                codec=self._codec_of(blob),
+                path=blob,
+            )
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO refs (namespace, filename, digest, size, stored_size, codec, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (namespace, filename, digest, report.size, report.stored_size, report.codec, report.created_at),
+                )
+        return report
+
+    def delete(self, namespace: str, filename: str) -> bool:
+        """Remove a reference and its blob once nothing else points at it"""
+        with self._lock:
+            with self._connect() as conn:
+                row = conn.execute("SELECT digest FROM refs WHERE namespace = ? AND filename = ?", (namespace, filename)).fetchone()
+                if not row:
+                    return False
+                conn.execute("DELETE FROM refs WHERE namespace = ? AND filename = ?", (namespace, filename))
+                still_used = conn.execute("SELECT 1 FROM refs WHERE digest = ? LIMIT 1", (row["digest"],)).fetchone()
+            if not still_used:
+                blob = self._existing_blob(row["digest"])
+                if blob:
+                    blob.unlink(missing_ok=True)
+        return True
+
+    def import_legacy(self, namespace: str, remove: bool = False) -> int:
+        """
+        Move a namespace's legacy .md files into the store, keeping filenames and timestamps
+        Returns the number of files imported; originals are deleted only when remove is set.
+        """
+        directory = self.legacy_dirs.get(namespace)
+        if not directory or not directory.exists():
+            return 0
+        imported = 0
+        for path in sorted(directory.glob("*.md")):
+            self.put(namespace, path.name, path.read_bytes(), created_at=path.stat().st_mtime)
+            if remove:
+                path.unlink()
+            imported += 1
+        return imported
+
+    # Reads
+
+    def _from_row(self, row: sqlite3.Row) -> StoredReport:
+        return StoredReport(
+            namespace=row["namespace"],
+            filename=row["filename"],
+            digest=row["digest"],
+            size=row["size"],
+            stored_size=row["stored_size"],
+            created_at=row["created_at"],
+            codec=row["codec"],
+            path=self.blob_path(row["digest"], row["codec"]),
+        )
+
+    def _legacy(self, namespace: str, path: Path) -> StoredReport:
+        stat = path.stat()
+        return StoredReport(
+            namespace=namespace,
+            filename=path.name,
+            # Legacy files are not hashed up front; the validator is derived from mtime and size
+            digest=f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+            size=stat.st_size,
+            stored_size=stat.st_size,
+            created_at=stat.st_mtime,
+            codec="plain",
+            path=path,
+        )
+
+    def get(self, namespace: str, filename: str) -> Optional[StoredReport]:
+        """Metadata for a report, from the store or the namespace's legacy directory"""
+        if not _valid_filename(filename):
+            return None
+        if self.index_path.exists():
+            row = self._connect().execute("SELECT * FROM refs WHERE namespace = ? AND filename = ?", (namespace, filename)).fetchone()
+            if row:
+                return self._from_row(row)
+        directory = self.legacy_dirs.get(namespace)
+        if directory:
+            path = directory / filename
+            if path.suffix == ".md" and path.is_file():
+                return self._legacy(namespace, path)
+        return None
+
+    def list(self, namespace: str, prefix: str = "") -> List[StoredReport]:
+        """Reports in a namespace, newest first; stored reports shadow legacy files of the same name"""
+        reports: Dict[str, StoredReport] = {}
+        directory = self.legacy_dirs.get(namespace)
+        if directory and directory.exists():
+            for path in directory.glob(f"{prefix}*.md"):
+                reports[path.name] = self._legacy(namespace, path)
+        if self.index_path.exists():
+            rows = self._connect().execute(
+                "SELECT * FROM refs WHERE namespace = ? AND filename LIKE ? ESCAPE '\\'",
+                (namespace, prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"),
+            ).fetchall()
+            for row in rows:
+                reports[row["filename"]] = self._from_row(row)
+        return sorted(reports.values(), key=lambda r: r.created_at, reverse=True)
+
+    def read_bytes(self, report: StoredReport) -> bytes:
+        """Decompressed content of a report"""
+        return _decompress(report.path.read_bytes(), report.codec)
+
+    def read_text(self, namespace: str, filename: str) -> Optional[str]:
+        report = self.get(namespace, filename)
+        if report is None:
+            return None
+        return self.read_bytes(report).decode("utf-8")
+
+    # Maintenance
+
+    def gc(self) -> int:
+        """Delete blobs no reference points at (e.g. left by an interrupted delete); returns the count"""
+        if not self.blob_dir.exists():
+            return 0
+        removed = 0
+        with self._lock:
+            referenced = {row["digest"] for row in self._connect().execute("SELECT DISTINCT digest FROM refs")}
+            for blob in self.blob_dir.glob("*/*/*"):
+                if blob.name.startswith(".tmp-"):
+                    # Stale temporary files from interrupted writes
+                    if time.time() - blob.stat().st_mtime > 3600:
+                        blob.unlink(missing_ok=True)
+                    continue
+                if blob.stem not in referenced:
+                    blob.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    def disk_usage(self) -> Dict[str, float]:
+        """
+        Logical vs physical size of the store
+
+        logical_bytes counts every reference at full size, unique_bytes counts each distinct
+        report once, and disk_bytes is what the blobs and index actually occupy on disk.
+        """
+        refs = blobs = logical = unique = stored = 0
+        if self.index_path.exists():
+            conn = self._connect()
+            refs, logical = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM refs").fetchone()
+            blobs, unique, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM "
+                "(SELECT digest, MAX(size) AS size, MAX(stored_size) AS stored_size FROM refs GROUP BY digest)"
+            ).fetchone()
+        disk = sum(_allocated_bytes(p) for p in self.root.rglob("*") if p.is_file()) if self.root.exists() else 0
+        return {
+            "references": refs,
+            "blobs": blobs,
+            "logical_bytes": logical,
+            "unique_bytes": unique,
+            "stored_bytes": stored,
+            "disk_bytes": disk,
+            "dedup_ratio": round(logical / unique, 2) if unique else 1.0,
+            "compression_ratio": round(unique / stored, 2) if stored else 1.0,
+        }
+
+
+def _allocated_bytes(path: Path) -> int:
+    """Bytes a file occupies on disk, including filesystem block overhead where reported"""
+    stat = path.stat()
+    blocks = getattr(stat, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+
+def _benchmark(reports: int = 2000, duplicate_share: float = 0.3):
+    """
+    Compare plain .md files with the store: write/read throughput and disk usage
+    Reports are synthetic CA-style markdown; duplicate_share of them repeat an earlier body.
+    """
+    import random
+
+    rng = random.Random(7)
+    advice = [
+        "Review advance tax instalments before the 15 March deadline.",
+        "Consider the new tax regime when deductions fall below the breakeven for this income band.",
+        "Maximise Section 80C through PPF and ELSS before adding insurance-linked products.",
+        "Claim Section 80D for health insurance premiums paid for parents.",
+        "Reconcile Form 26AS and AIS with the salary TDS certificates.",
+        "Move idle savings account balances into a liquid fund for the emergency reserve.",
+        "Keep rent receipts and the landlord's PAN for the HRA exemption claim.",
+        "Track capital gains from mutual fund redemptions for the ITR-2 schedule.",
+    ]
+    section = (
+        "## {title}\n\n"
+        "| Item | Amount | Notes |\n|------|--------|-------|\n"
+        "| Gross Income | ₹{income:,} | Salary and business receipts |\n"
+        "| Deductions 80C | ₹{ded:,} | PPF, ELSS, life insurance |\n"
+        "| Taxable Income | ₹{taxable:,} | After standard deduction |\n\n"
+        "{notes}\n\n"
+    )
+    bodies: List[bytes] = []
+    for i in range(reports):
+        if bodies and rng.random() < duplicate_share:
+            bodies.append(rng.choice(bodies))
+            continue
+        income = rng.randrange(500_000, 5_000_000, 1000)
+        text = f"# CA Analysis Report - Salaried\n\n**Generated:** 2025-01-01 10:{i % 60:02d}:00\n\n---\n\n"
+        text += "".join(
+            section.format(
+                title=title,
+                income=income,
+                ded=rng.randrange(50_000, 150_001, 500),
+                taxable=income - rng.randrange(75_000, 250_000, 500),
+                notes="\n".join(f"- {line}" for line in rng.sample(advice, 5)),
+            )
+            for title in ("Income Summary", "Deductions", "Tax Computation", "Capital Gains",
+                          "Investments", "Recommendations", "Compliance", "Next Steps")
+        )
+        bodies.append(text.encode("utf-8"))
+    total_mb = sum(len(b) for b in bodies) / 1024 / 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_dir = Path(tmp) / "plain"
+        plain_dir.mkdir()
+        store = ReportStore(Path(tmp) / "store", legacy_dirs={})
+
+        start = time.perf_counter()
+        for i, body in enumerate(bodies):
+            _atomic_write(plain_dir / f"CA_Report_{i:05d}.md", body)
+        plain_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, body in enumerate(bodies):
+            store.put("ca", f"CA_Report_{i:05d}.md", body)
+        store_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(reports):
+            (plain_dir / f"CA_Report_{i:05d}.md").read_bytes()
+        plain_read = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, body in enumerate(bodies):
+            assert store.read_bytes(store.get("ca", f"CA_Report_{i:05d}.md")) == body
+        store_read = time.perf_counter() - start
+
+        plain_disk = sum(_allocated_bytes(p) for p in plain_dir.iterdir())
+        # Fold the write-ahead log back into the index so it is not counted twice
+        store._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        usage = store.disk_usage()
+
+    print(f"{reports:,} reports, {total_mb:.1f} MB logical, {duplicate_share:.0%} duplicates, codec={store.codec}")
+    print(f"{'':14}{'write MB/s':>12}{'read MB/s':>12}{'disk':>12}")
+    print(f"{'plain .md':14}{total_mb / plain_write:12.1f}{total_mb / plain_read:12.1f}{plain_disk / 1024 / 1024:10.2f}MB")
+    print(f"{'report store':14}{total_mb / store_write:12.1f}{total_mb / store_read:12.1f}{usage['disk_bytes'] / 1024 / 1024:10.2f}MB")
+    print(f"blobs={usage['blobs']:,} dedup={usage['dedup_ratio']}x compression={usage['compression_ratio']}x "
+          f"disk saving={plain_disk / max(usage['disk_bytes'], 1):.1f}x")
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Inspect and maintain the shared report store")
+    parser.add_argument("--usage", action="store_true", help="Show disk usage, dedup and compression ratios")
+    parser.add_argument("--import-legacy", nargs="*", metavar="NAMESPACE", help="Import legacy .md reports (all namespaces when none given)")
+    parser.add_argument("--remove", action="store_true", help="Delete legacy files after importing them")
+    parser.add_argument("--gc", action="store_true", help="Delete unreferenced blobs")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark the store against plain .md files")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _benchmark()
+        return
+
+    if args.import_legacy is not None:
+        for namespace in args.import_legacy or LEGACY_DIRECTORIES:
+            print(f"{namespace}: imported {report_store.import_legacy(namespace, remove=args.remove)} reports")
+    if args.gc:
+        print(f"Removed {report_store.gc()} unreferenced blobs")
+    if args.usage or not (args.import_legacy is not None or args.gc):
+        print(json.dumps(report_store.disk_usage(), indent=2))
+
+
+# Global store instance
+report_store = ReportStore()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Bank statement and ledger summarizer
+Detects tabular transaction layouts in extracted PDF or CSV text, parses them into
+columnar arrays and computes monthly credits/debits, salary credits, interest income,
+recurring EMIs and GST-tagged payments so the crews get a compact summary table
+instead of thousands of raw transaction lines.
+"""
+
+import io
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Minimum number of parsed rows before a document is treated as a statement
+MIN_TRANSACTIONS = 5
+
+_DATE = (
+    r"(?:\d{1,2}[/\-.]\d{1,2}[/\-.]\d{2,4}"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}[ \-][A-Za-z]{3}[ \-,]+\d{2,4})"
+)
+_AMOUNT = r"-?\d[\d,]*\.\d{2}(?:\s*(?:Cr|Dr|CR|DR)\b)?"
+
+# One transaction per line: date, narration, then 1-3 amounts (amount [amount] balance)
+TRANSACTION_LINE = re.compile(
+    rf"^\s*(?P<date>{_DATE})(?P<description>.*?)(?P<amounts>(?:\s+{_AMOUNT}){{1,3}})\s*$"
+)
+AMOUNT_TOKEN = re.compile(_AMOUNT)
+LEADING_DATE = re.compile(rf"^\s*{_DATE}\s*")
+
+SALARY_PATTERN = r"\bSAL(?:ARY)?\b|PAYROLL|\bSAL[ -]?CR"
+INTEREST_PATTERN = r"\bINT(?:EREST)?\b|\bINT\.?\s?PD\b|\bSB\s?INT"
+EMI_PATTERN = r"\bEMI\b|\bLOAN\b|\bNACH\b|\bECS\b|\bACH\s?D|\bSI[- ]|STANDING INSTRUCTION"
+GST_PATTERN = r"\bGST|\bCGST\b|\bSGST\b|\bIGST\b|\bGSTIN\b|\bGSTN\b"
+CREDIT_HINT_PATTERN = r"\bCR\b|\bCREDIT|\bDEPOSIT|\bREFUND|\bBY\b|" + SALARY_PATTERN + "|" + INTEREST_PATTERN
+
+CSV_DELIMITERS = [",", "\t", ";", "|"]
+CSV_AMOUNT_HEADERS = ["debit", "credit", "withdrawal", "deposit", "amount"]
+
+
+def summarize_statement(text: str) -> Optional[Dict]:
+    """
+    Detect and summarize a bank statement or ledger embedded in extracted text
+
+    Returns None when the text does not contain a transaction table, otherwise a
+    dictionary with the aggregates, a markdown summary and the non-transaction text.
+    """
+    if not text or not text.strip():
+        return None
+
+    for parser in (_parse_csv_layout, _parse_text_layout):
+        try:
+            parsed = parser(text)
+        except Exception as e:
+            print(f"Warning: Statement parsing failed in {parser.__name__}: {e}")
+            continue
+        if not parsed:
+            continue
+        frame, residual_text = parsed
+        frame = frame.dropna(subset=["date"])
+        if len(frame) >= MIN_TRANSACTIONS:
+            break
+    else:
+        return None
+
+    summary = _analyse_transactions(frame)
+    summary["residual_text"] = residual_text
+    summary["summary_markdown"] = _format_summary(summary)
+    return summary
+
+
+def _parse_text_layout(text: str) -> Optional[Tuple[pd.DataFrame, str]]:
+    """
+    Parse statement rows from PDF-extracted text (one transaction per line)
+    """
+    lines = pd.Series(text.splitlines(), dtype="object")
+    fields = lines.str.extract(TRANSACTION_LINE)
+    matched = fields["date"].notna().to_numpy()
+    if matched.sum() < MIN_TRANSACTIONS:
+        return None
+
+    rows = fields[matched].reset_index(drop=True)
+    residual_text = "\n".join(lines[~matched].tolist())
+
+    description = rows["description"].str.replace(LEADING_DATE, "", regex=True).str.strip()
+    tokens = rows["amounts"].str.findall(AMOUNT_TOKEN)
+    token_count = tokens.str.len().to_numpy()
+
+    def token_values(position: int) -> Tuple[np.ndarray, np.ndarray]:
+        token = tokens.str[position].fillna("").astype(str)
+        values = pd.to_numeric(
+            token.str.replace(r"[,\s]|Cr|Dr|CR|DR", "", regex=True), errors="coerce"
+        ).to_numpy(dtype=float)
+        marker = token.str.extract(r"(Cr|Dr|CR|DR)")[0].str.upper().to_numpy(dtype=object)
+        return values, marker
+
+    last, last_marker = token_values(-1)
+    second, second_marker = token_values(-2)
+    third, _ = token_values(-3)
+
+    # Layouts: [amount], [amount, balance] or [withdrawal, deposit, balance]
+    balance = np.where(token_count >= 2, last, np.nan)
+    amount = np.where(token_count >= 2, second, last)
+    marker = np.where(token_count >= 2, second_marker, last_marker)
+
+    dates = _parse_dates(rows["date"])
+    direction = _infer_direction(dates, balance, marker, description)
+
+    credit = np.where(token_count == 3, second, np.where(direction > 0, amount, 0.0))
+    debit = np.where(token_count == 3, third, np.where(direction < 0, amount, 0.0))
+
+    frame = pd.DataFrame({
+        "date": dates,
+        "description": description.fillna(""),
+        "credit": np.nan_to_num(np.abs(credit)),
+        "debit": np.nan_to_num(np.abs(debit)),
+    })
+    return frame, residual_text
+
+
+def _infer_direction(dates: pd.Series, balance: np.ndarray, marker: np.ndarray, description: pd.Series) -> np.ndarray:
+    """
+    Decide credit (+1) or debit (-1) per row from Cr/Dr markers, running balance
+    movement and narration keywords, in that order of preference
+    """
+    balance_series = pd.Series(balance)
+    valid_dates = dates.dropna()
+    descending = len(valid_dates) > 1 and valid_dates.iloc[0] > valid_dates.iloc[-1]
+    delta = balance_series.diff(-1) if descending else balance_series.diff()
+    delta = delta.to_numpy(dtype=float)
+
+    keyword_credit = description.str.upper().str.contains(CREDIT_HINT_PATTERN, regex=True, na=False).to_numpy()
+    direction = np.where(keyword_credit, 1, -1)
+    direction = np.where(np.isnan(delta), direction, np.sign(delta))
+    direction = np.where(marker == "CR", 1, direction)
+    direction = np.where(marker == "DR", -1, direction)
+    return direction
+
+
+def _parse_csv_layout(text: str) -> Optional[Tuple[pd.DataFrame, str]]:
+    """
+    Parse delimited exports (CSV/TSV) that carry a header row with date and amount columns
+    """
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        lowered = line.lower()
+        if "date" not in lowered or not any(h in lowered for h in CSV_AMOUNT_HEADERS):
+            continue
+        delimiter = max(CSV_DELIMITERS, key=line.count)
+        if line.count(delimiter) < 2:
+            continue
+
+        table = pd.read_csv(
+            io.StringIO("\n".join(lines[index:])),
+            sep=delimiter,
+            engine="python",
+            on_bad_lines="skip",
+            dtype=str,
+        )
+        frame = _frame_from_columns(table)
+        if frame is None:
+            continue
+        return frame, "\n".join(lines[:index])
+    return None
+
+
+def _frame_from_columns(table: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Map a delimited table's columns onto date / description / credit / debit
+    """
+    columns = {str(c).strip().lower(): c for c in table.columns}
+
+    def find(*keywords: str, exclude: Tuple[str, ...] = ()) -> Optional[str]:
+        for lowered, original in columns.items():
+            if any(k in lowered for k in keywords) and not any(x in lowered for x in exclude):
+                return original
+        return None
+
+    date_col = find("txn date", "transaction date", "tran date") or find("date", exclude=("value",)) or find("date")
+    if date_col is None:
+        return None
+    desc_col = find("narration", "description", "particulars", "details", "remarks")
+    debit_col = find("withdrawal", "debit", exclude=("card",))
+    credit_col = find("deposit", "credit", exclude=("card",))
+    amount_col = find("amount")
+    type_col = find("cr/dr", "dr/cr", "type")
+
+    def numeric(column: Optional[str]) -> np.ndarray:
+        if column is None:
+            return np.zeros(len(table))
+        cleaned = table[column].astype(str).str.replace(r"[,\s₹]|Rs\.?", "", regex=True)
+        return np.nan_to_num(pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=float))
+
+    if debit_col is not None or credit_col is not None:
+        debit = numeric(debit_col)
+        credit = numeric(credit_col)
+    elif amount_col is not None:
+        amount = numeric(amount_col)
+        if type_col is not None:
+            is_credit = table[type_col].astype(str).str.strip().str.upper().str.startswith("C").to_numpy()
+        else:
+            is_credit = amount > 0
+        credit = np.where(is_credit, amount, 0.0)
+        debit = np.where(is_credit, 0.0, amount)
+    else:
+        return None
+
+    description = table[desc_col].astype(str) if desc_col is not None else pd.Series([""] * len(table))
+    return pd.DataFrame({
+        "date": _parse_dates(table[date_col].astype(str)),
+        "description": description.fillna("").reset_index(drop=True),
+        "credit": np.abs(credit),
+        "debit": np.abs(debit),
+    })
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse Indian statement dates (day-first) into datetimes, NaT when unparseable
+    """
+    return pd.to_datetime(values.str.strip(), dayfirst=True, errors="coerce", format="mixed").reset_index(drop=True)
+
+
+def _analyse_transactions(frame: pd.DataFrame) -> Dict:
+    """
+    Compute monthly and category aggregates over the parsed transaction arrays
+    """
+    frame = frame.sort_values("date", kind="stable").reset_index(drop=True)
+    description = frame["description"].str.upper()
+    credit = frame["credit"].to_numpy(dtype=float)
+    debit = frame["debit"].to_numpy(dtype=float)
+
+    is_salary = description.str.contains(SALARY_PATTERN, regex=True, na=False).to_numpy() & (credit > 0)
+    is_interest = description.str.contains(INTEREST_PATTERN, regex=True, na=False).to_numpy() & (credit > 0) & ~is_salary
+    is_gst = description.str.contains(GST_PATTERN, regex=True, na=False).to_numpy() & (debit > 0)
+    emi_hint = description.str.contains(EMI_PATTERN, regex=True, na=False).to_numpy() & (debit > 0)
+
+    month = frame["date"].dt.strftime("%Y-%m")
+    recurring = _recurring_emis(frame, month, debit, emi_hint)
+    recurring_keys = np.array([r["amount"] for r in recurring], dtype=float)
+    is_emi = emi_hint & np.isin(np.round(debit), recurring_keys)
+
+    columns = pd.DataFrame({
+        "month": month,
+        "credits": credit,
+        "debits": debit,
+        "salary": np.where(is_salary, credit, 0.0),
+        "interest": np.where(is_interest, credit, 0.0),
+        "emi": np.where(is_emi, debit, 0.0),
+        "gst": np.where(is_gst, debit, 0.0),
+    })
+    monthly = columns.groupby("month", sort=True).sum()
+    monthly["net"] = monthly["credits"] - monthly["debits"]
+    totals = monthly.sum().to_dict()
+
+    return {
+        "transaction_count": int(len(frame)),
+        "period_start": frame["date"].iloc[0].strftime("%d %b %Y"),
+        "period_end": frame["date"].iloc[-1].strftime("%d %b %Y"),
+        "monthly": monthly.reset_index().to_dict(orient="records"),
+        "totals": {k: round(float(v), 2) for k, v in totals.items()},
+        "recurring_emis": recurring,
+        "gst_payment_count": int(is_gst.sum()),
+        "salary_credit_count": int(is_salary.sum()),
+    }
+
+
+def _recurring_emis(frame: pd.DataFrame, month: pd.Series, debit: np.ndarray, emi_hint: np.ndarray) -> List[Dict]:
+    """
+    Debits of the same rounded amount seen in three or more months with a loan/EMI narration
+    """
+    mask = debit > 0
+    if not mask.any():
+        return []
+
+    debits = pd.DataFrame({
+        "amount": np.round(debit[mask]),
+        "month": month.to_numpy()[mask],
+        "hint": emi_hint[mask],
+        "description": frame["description"].to_numpy()[mask],
+    })
+    grouped = debits.groupby("amount").agg(
+        months=("month", "nunique"),
+        occurrences=("month", "size"),
+        hinted=("hint", "any"),
+        description=("description", "first"),
+    )
+    grouped = grouped[(grouped["months"] >= 3) & grouped["hinted"]]
+    return [
+        {
+            "amount": float(amount),
+            "months": int(row.months),
+            "occurrences": int(row.occurrences),
+            "description": str(row.description)[:60],
+        }
+        for amount, row in grouped.sort_values("months", ascending=False).iterrows()
+    ]
+
+
+def _format_summary(summary: Dict) -> str:
+    """
+    Render the aggregates as a compact markdown table for the LLM
+    """
+    def money(value: float) -> str:
+        return f"{value:,.2f}"
+
+    lines = [
+        f"BANK STATEMENT / LEDGER SUMMARY (computed from {summary['transaction_count']} transactions, "
+        f"{summary['period_start']} to {summary['period_end']})",
+        "",
+        "| Month | Credits (₹) | Debits (₹) | Net (₹) | Salary Credits (₹) | Interest (₹) | EMI (₹) | GST Paid (₹) |",
+        "|-------|-------------|------------|---------|--------------------|--------------|---------|--------------|",
+    ]
+    for row in summary["monthly"]:
+        lines.append(
+            f"| {row['month']} | {money(row['credits'])} | {money(row['debits'])} | {money(row['net'])} | "
+            f"{money(row['salary'])} | {money(row['interest'])} | {money(row['emi'])} | {money(row['gst'])} |"
+        )
+    totals = summary["totals"]
+    lines.append(
+        f"| Total | {money(totals['credits'])} | {money(totals['debits'])} | {money(totals['net'])} | "
+        f"{money(totals['salary'])} | {money(totals['interest'])} | {money(totals['emi'])} | {money(totals['gst'])} |"
+    )
+
+    if summary["recurring_emis"]:
+        lines += [
+            "",
+            "RECURRING EMIs",
+            "| Monthly Amount (₹) | Months Seen | Narration |",
+            "|--------------------|-------------|-----------|",
+        ]
+        for emi in summary["recurring_emis"]:
+            lines.append(f"| {money(emi['amount'])} | {emi['months']} | {emi['description']} |")
+
+    return "\n".join(lines)
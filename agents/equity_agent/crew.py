@@ -4,35 +4,48 @@ from crewai_tools import SerperDevTool
 from pathlib import Path
 import yaml
 
+from .utils.market_data_store import market_data_store
+from .utils.market_data_tool import MarketDataTool
+from .utils.portfolio_analytics import build_analytics_tables
+
 CONFIG_DIR = Path(__file__).parent / "config"  # Absolute path
 
-def create_crew(user_inputs: dict, ca_report_content: str = None):
+# Snapshots younger than this replace the live scrape task
+MARKET_DATA_MAX_AGE_HOURS = float(os.getenv("EQUITY_MARKET_DATA_MAX_AGE_HOURS", "24"))
+
+def plan_market_data(offline: bool = False) -> dict:
     """
-    Create CrewAI crew for equity investment analysis
+    Decide whether the equity flow runs from the local market data snapshot or the live scrape
     
-    Args:
-        user_inputs (dict): Dictionary containing user investment preferences
-            - sector (str, optional): Preferred investment sector
-            - goal (str): Investment goal
-            - style (str): Investment style (trade/invest/swing_trade)
-            - duration (str): Investment duration
-            - risk_level (str): Risk level (low/medium/high)
-        ca_report_content (str, optional): CA report markdown content
+    Returns {"source": "snapshot" | "live_scrape", "snapshot": <snapshot metadata or None>}
     """
-    # Load YAML files
+    snapshot = market_data_store.latest_snapshot()
+    if offline and not snapshot:
+        raise ValueError("Offline mode requested but no market data snapshot exists. Run: python -m equity_agent.ingest_market_data")
+    
+    fresh = bool(snapshot) and snapshot["age_hours"] <= MARKET_DATA_MAX_AGE_HOURS
+    return {
+        "source": "snapshot" if (fresh or offline) else "live_scrape",
+        "snapshot": snapshot
+    }
+
+def _load_config():
+    """Load the agent and task YAML definitions"""
     with open(CONFIG_DIR / "agents.yaml", "r") as f:
         agents_yaml = yaml.safe_load(f)
     with open(CONFIG_DIR / "tasks.yaml", "r") as f:
         tasks_yaml = yaml.safe_load(f)
+    return agents_yaml, tasks_yaml
 
-    # Setup LLM using Cerebras API key
+def _build_llm():
+    """Setup LLM using Cerebras API key"""
     cerebras_api_key = os.environ.get("CEREBRAS_API_KEY")
     if not cerebras_api_key:
         raise ValueError("CEREBRAS_API_KEY not found in environment variables. Please set your Cerebras API key.")
     
     print(f"DEBUG: Using Cerebras API key: {cerebras_api_key[:10]}...")
 
-    llm = LLM(
+    return LLM(
         model="cerebras/gpt-oss-120b",
         api_key=cerebras_api_key,
         base_url="https://api.cerebras.ai/v1",
@@ -40,85 +53,144 @@ def create_crew(user_inputs: dict, ca_report_content: str = None):
         max_completion_tokens=15000,
     )
 
-    # Initialize web search tool for agents that need it
-    serper_tool = SerperDevTool()
-
-    # Create agents
-    agent_instances = []
-    for agent_def in agents_yaml["agents"]:
-        # Add tools for agents that need web search
-        tools = []
-        if agent_def.get("use_serper", False):
-            tools = [serper_tool]
-            
-        agent_instances.append(
-            Agent(
-                role=agent_def["role"],
-                goal=agent_def["goal"],
-                backstory=agent_def.get("backstory", ""),
-                llm=llm,
-                verbose=agent_def.get("verbose", True),
-                allow_delegation=agent_def.get("allow_delegation", False),
-                tools=tools
-            )
-        )
-
-    # Create task instances - both data scraping and investment planning
-    task_instances = []
-    
-    # Task 1: Scrape Financial Data
-    scrape_task_config = next(t for t in tasks_yaml["tasks"] if t["name"] == "scrape_financial_data")
-    scraper_agent = agent_instances[0]  # Use first agent (LiveDataScraper)
+def _build_agent(agent_def: dict, llm, serper_tool=None, market_data_tool=None):
+    """Create an agent, adding web search or market data tools where it needs them"""
+    tools = []
+    if agent_def.get("use_serper", False) and serper_tool:
+        tools = [serper_tool]
+    elif market_data_tool:
+        tools = [market_data_tool]
     
-    scrape_description = scrape_task_config["description"]
-    if ca_report_content:
-        scrape_description += f"\n\n=== CA REPORT CONTENT ===\n{ca_report_content}\n==================="
-    
-    # Add user inputs to the task description
-    scrape_description += f"""
+    return Agent(
+        role=agent_def["role"],
+        goal=agent_def["goal"],
+        backstory=agent_def.get("backstory", ""),
+        llm=llm,
+        verbose=agent_def.get("verbose", True),
+        allow_delegation=agent_def.get("allow_delegation", False),
+        tools=tools
+    )
+
+def _preferences_block(user_inputs: dict) -> str:
+    return f"""
     
     === USER INVESTMENT PREFERENCES ===
-    - Preferred Sector: {user_inputs.get('sector', 'Any sector')}
+    - Preferred Sector: {user_inputs.get('sector') or 'Any sector'}
     - Investment Goal: {user_inputs.get('goal', 'Not specified')}
     - Investment Style: {user_inputs.get('style', 'invest')}
     - Investment Duration: {user_inputs.get('duration', 'Not specified')}
     - Risk Level: {user_inputs.get('risk_level', 'medium')}
     =====================================
     """
+
+def _scrape_task(tasks_yaml: dict, agent, user_inputs: dict, ca_report_content: str = None) -> Task:
+    scrape_task_config = next(t for t in tasks_yaml["tasks"] if t["name"] == "scrape_financial_data")
+    
+    scrape_description = scrape_task_config["description"]
+    if ca_report_content:
+        scrape_description += f"\n\n=== CA REPORT CONTENT ===\n{ca_report_content}\n==================="
+    
+    # Add user inputs to the task description
+    scrape_description += _preferences_block(user_inputs)
     
-    scrape_task = Task(
+    return Task(
         description=scrape_description,
         expected_output=scrape_task_config["expected_output"],
-        agent=scraper_agent
+        agent=agent
     )
-    task_instances.append(scrape_task)
 
-    # Task 2: Create Investment Plan
+def _plan_task(tasks_yaml: dict, agent, user_inputs: dict, ca_report_content: str = None,
+               market_data: dict = None, scraped_data: str = None) -> Task:
     plan_task_config = next(t for t in tasks_yaml["tasks"] if t["name"] == "create_investment_plan")
-    planner_agent = agent_instances[1]  # Use second agent (InvestmentPlanner)
     
     plan_description = plan_task_config["description"]
+    if market_data["source"] == "snapshot":
+        snapshot_tables = market_data_store.format_snapshot_tables(user_inputs.get('sector'), snapshot=market_data["snapshot"])
+        plan_description += f"""
+    
+    === MARKET DATA (LOCAL SNAPSHOT - REPLACES THE SCRAPING TASK) ===
+    No live scraping task ran. Use the stocks and mutual funds below as the scraped data,
+    and the Market Data Snapshot tool for any other sector.
+    {snapshot_tables}
+    =====================================
+    """
+    elif scraped_data:
+        plan_description += f"""
+    
+    === MARKET DATA (SCRAPED ONCE FOR THIS BATCH) ===
+    The scraping task already ran for a batch of clients. Use the stocks and mutual funds
+    below as the scraped data and pick the ones that fit this client's preferences.
+    {scraped_data}
+    =====================================
+    """
     if ca_report_content:
         plan_description += f"\n\n=== CA REPORT CONTENT ===\n{ca_report_content}\n==================="
     
-    # Add user inputs to the investment planning task description
+    # Allocation, risk/return and SIP arithmetic is computed here, not by the LLM
+    snapshot = market_data.get("snapshot")
+    snapshot_funds = market_data_store.query_funds(user_inputs.get('sector'), limit=10, snapshot_id=snapshot["snapshot_id"]) if snapshot else []
+    analytics_tables = build_analytics_tables(user_inputs, snapshot_funds)
     plan_description += f"""
     
-    === USER INVESTMENT PREFERENCES ===
-    - Preferred Sector: {user_inputs.get('sector', 'Any sector')}
-    - Investment Goal: {user_inputs.get('goal', 'Not specified')}
-    - Investment Style: {user_inputs.get('style', 'invest')}
-    - Investment Duration: {user_inputs.get('duration', 'Not specified')}
-    - Risk Level: {user_inputs.get('risk_level', 'medium')}
+    === PRECOMPUTED PORTFOLIO ANALYTICS ===
+    Use these figures as-is for allocation percentages, expected return, risk and SIP projections.
+    Do not recompute them; scale the SIP projections linearly to the user's monthly surplus and
+    write the narrative, security selection and rationale around them.
+    {analytics_tables}
     =====================================
     """
     
-    plan_task = Task(
+    # Add user inputs to the investment planning task description
+    plan_description += _preferences_block(user_inputs)
+    
+    return Task(
         description=plan_description,
         expected_output=plan_task_config["expected_output"],
-        agent=planner_agent
+        agent=agent
     )
-    task_instances.append(plan_task)
+
+def create_crew(user_inputs: dict, ca_report_content: str = None, market_data: dict = None):
+    """
+    Create CrewAI crew for equity investment analysis
+    
+    Args:
+        user_inputs (dict): Dictionary containing user investment preferences
+            - sector (str, optional): Preferred investment sector
+            - goal (str): Investment goal
+            - style (str): Investment style (trade/invest/swing_trade)
+            - duration (str): Investment duration
+            - risk_level (str): Risk level (low/medium/high)
+        ca_report_content (str, optional): CA report markdown content
+        market_data (dict, optional): Result of plan_market_data(); computed when omitted.
+            With a "snapshot" source the scrape task is skipped and the planner works
+            from the local market data store.
+    """
+    if market_data is None:
+        market_data = plan_market_data()
+    use_snapshot = market_data["source"] == "snapshot"
+
+    agents_yaml, tasks_yaml = _load_config()
+    llm = _build_llm()
+
+    # Web search is only needed when the live scrape task runs
+    serper_tool = None if use_snapshot else SerperDevTool()
+    market_data_tool = MarketDataTool() if market_data.get("snapshot") else None
+
+    # Create agents
+    agent_instances = [
+        _build_agent(agent_def, llm, serper_tool, market_data_tool)
+        for agent_def in agents_yaml["agents"]
+    ]
+
+    # Create task instances - data scraping (unless a fresh snapshot exists) and investment planning
+    task_instances = []
+    
+    # Task 1: Scrape Financial Data (first agent, LiveDataScraper)
+    if not use_snapshot:
+        task_instances.append(_scrape_task(tasks_yaml, agent_instances[0], user_inputs, ca_report_content))
+
+    # Task 2: Create Investment Plan (second agent, InvestmentPlanner)
+    task_instances.append(_plan_task(tasks_yaml, agent_instances[1], user_inputs, ca_report_content, market_data))
 
     # Create Crew
     crew = Crew(
@@ -129,3 +201,58 @@ def create_crew(user_inputs: dict, ca_report_content: str = None):
     )
 
     return crew, "equity_analysis"
+
+def create_scrape_crew(profiles: list):
+    """
+    Crew that runs the scrape_financial_data task once for a batch of profiles
+    
+    The preferences passed to the scraper cover every sector in the batch; the
+    per-client details are left to the plan crews.
+    """
+    agents_yaml, tasks_yaml = _load_config()
+    llm = _build_llm()
+
+    sectors = list(dict.fromkeys(p.get('sector') for p in profiles if p.get('sector')))
+    risk_levels = list(dict.fromkeys(p.get('risk_level') for p in profiles if p.get('risk_level')))
+    batch_inputs = {
+        "sector": ", ".join(sectors) if sectors else None,
+        "goal": f"Market data shared by {len(profiles)} client profiles",
+        "style": ", ".join(dict.fromkeys(p.get('style', 'invest') for p in profiles)),
+        "duration": "Varies by client",
+        "risk_level": ", ".join(risk_levels) if risk_levels else "medium",
+    }
+
+    scraper_agent = _build_agent(agents_yaml["agents"][0], llm, SerperDevTool())
+    crew = Crew(
+        agents=[scraper_agent],
+        tasks=[_scrape_task(tasks_yaml, scraper_agent, batch_inputs)],
+        process=Process.sequential,
+        verbose=True
+    )
+
+    return crew, "equity_market_scrape"
+
+def create_plan_crew(user_inputs: dict, ca_report_content: str = None, market_data: dict = None, scraped_data: str = None):
+    """
+    Crew that runs only create_investment_plan for one profile
+    
+    Args:
+        scraped_data (str, optional): Output of the shared scrape crew, injected in place
+            of the scrape task. Ignored when market_data comes from the local snapshot.
+    """
+    if market_data is None:
+        market_data = plan_market_data()
+
+    agents_yaml, tasks_yaml = _load_config()
+    llm = _build_llm()
+
+    market_data_tool = MarketDataTool() if market_data.get("snapshot") else None
+    planner_agent = _build_agent(agents_yaml["agents"][1], llm, None, market_data_tool)
+    crew = Crew(
+        agents=[planner_agent],
+        tasks=[_plan_task(tasks_yaml, planner_agent, user_inputs, ca_report_content, market_data, scraped_data)],
+        process=Process.sequential,
+        verbose=True
+    )
+
+    return crew, "equity_analysis"
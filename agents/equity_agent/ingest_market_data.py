@@ -0,0 +1,60 @@
+"""
+Refresh the equity agent's local market data snapshot
+
+Usage (from the agents/ directory):
+    python -m equity_agent.ingest_market_data --funds funds.csv --stocks stocks.csv
+    python -m equity_agent.ingest_market_data --snapshot snapshot.json
+
+CSV files need a header row; JSON snapshots are {"funds": [...], "stocks": [...]}.
+Column names are matched loosely (e.g. "Fund Name", "1Y Return", "AUM (Cr)").
+"""
+
+import argparse
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from .utils.market_data_store import MarketDataStore
+
+
+def load_records(path: Path) -> List[Dict]:
+    """Load a list of records from a CSV or JSON file"""
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, list) else data.get("records", [])
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a fund and stock snapshot into the equity market data store")
+    parser.add_argument("--funds", type=Path, help="CSV/JSON file with mutual fund records")
+    parser.add_argument("--stocks", type=Path, help="CSV/JSON file with stock records")
+    parser.add_argument("--snapshot", type=Path, help='JSON file with {"funds": [...], "stocks": [...]}')
+    parser.add_argument("--source", default=None, help="Label stored with the snapshot (defaults to the file names)")
+    parser.add_argument("--db", type=Path, default=None, help="Store location (defaults to EQUITY_MARKET_DATA_DB)")
+    args = parser.parse_args()
+
+    funds, stocks, sources = [], [], []
+    if args.snapshot:
+        data = json.loads(args.snapshot.read_text(encoding="utf-8"))
+        funds += data.get("funds", [])
+        stocks += data.get("stocks", [])
+        sources.append(args.snapshot.name)
+    if args.funds:
+        funds += load_records(args.funds)
+        sources.append(args.funds.name)
+    if args.stocks:
+        stocks += load_records(args.stocks)
+        sources.append(args.stocks.name)
+    if not sources:
+        parser.error("provide --snapshot or at least one of --funds/--stocks")
+
+    store = MarketDataStore(args.db)
+    store.ingest(funds, stocks, source=args.source or ", ".join(sources))
+    print(json.dumps(store.latest_snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
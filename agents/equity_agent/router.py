@@ -1,22 +1,127 @@
 from fastapi import APIRouter, Form, Request
 from fastapi.responses import JSONResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
-from pathlib import Path
 import re
 from datetime import datetime
 import os
+import asyncio
+import time
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
-from .crew import create_crew
+from .crew import create_crew, create_scrape_crew, create_plan_crew, plan_market_data, MARKET_DATA_MAX_AGE_HOURS, CONFIG_DIR
+from .utils.market_data_store import market_data_store
+from .utils.plan_cache import plan_cache, normalize_profile
+from common.report_responses import stored_report_response, report_not_modified_response, report_validators
+from common.report_store import report_store
+from common.readiness import readiness, config_check, env_check
 
 router = APIRouter(prefix="/equity", tags=["Equity Agent"])
 
 templates = Jinja2Templates(directory="equity_agent/templates")
 
+def _market_data_fresh():
+    """A fresh snapshot lets the equity flow skip the live scrape"""
+    snapshot = market_data_store.latest_snapshot()
+    if not snapshot:
+        return False, "no snapshot; live scrape will be used"
+    return snapshot["age_hours"] <= MARKET_DATA_MAX_AGE_HOURS, f"snapshot {snapshot['snapshot_id']} is {snapshot['age_hours']}h old"
+
+# Dependency checks for /ready; web search and the snapshot each have a fallback
+readiness.register("config", "equity_agent", config_check(CONFIG_DIR / "agents.yaml", CONFIG_DIR / "tasks.yaml"))
+readiness.register("cerebras_api_key", "equity_agent", env_check("CEREBRAS_API_KEY"))
+readiness.register("serper_api_key", "equity_agent", env_check("SERPER_API_KEY"), critical=False)
+readiness.register("market_data_snapshot", "equity_agent", _market_data_fresh, critical=False)
+
+# Keep references to background refresh tasks so they are not garbage collected
+_background_tasks = set()
+
+# Upper bound on concurrent plan crews in one batch request
+BATCH_MAX_PARALLEL = int(os.getenv("EQUITY_BATCH_MAX_PARALLEL", "8"))
+# Upper bound on profiles per batch request; each can queue a plan crew behind the open connection
+BATCH_MAX_PROFILES = int(os.getenv("EQUITY_BATCH_MAX_PROFILES", "50"))
+
+class EquityProfile(BaseModel):
+    client_id: Optional[str] = None
+    sector: Optional[str] = None
+    goal: str
+    style: str
+    duration: str
+    risk_level: str
+    ca_report: Optional[str] = None
+
+class EquityBatchRequest(BaseModel):
+    profiles: List[EquityProfile] = Field(..., min_length=1, max_length=BATCH_MAX_PROFILES)
+    max_parallel: int = Field(default=4, ge=1)
+    offline: bool = False
+
 @router.get("/", response_class=HTMLResponse)
 def index(request: Request):
     """Render the equity analysis form"""
     return templates.TemplateResponse("index.html", {"request": request})
 
+def _save_report(user_inputs: dict, result) -> str:
+    """Write a crew result to the shared report store and return its filename"""
+    # Generate report filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    report_filename = f"Equity_Analysis_{user_inputs['style']}_{timestamp}.md"
+    
+    # Identical plans (e.g. repeated profiles in a batch) share one stored blob
+    report_store.put("equity", report_filename, str(result))
+    
+    return report_filename
+
+def _run_equity_analysis(user_inputs: dict, ca_report: str, market_data: dict) -> dict:
+    """
+    Run the equity crew, save the report and build the response payload
+    """
+    # Create crew with user inputs and optional CA report
+    crew, task_name = create_crew(user_inputs, ca_report if ca_report else None, market_data)
+    
+    # Execute the crew
+    print("🚀 Starting equity analysis...")
+    result = crew.kickoff()
+    
+    return {
+        "status": "success",
+        "result": str(result),
+        "task_name": f"Equity Analysis - {user_inputs['style'].title()}",
+        "report_file": _save_report(user_inputs, result),
+        "user_inputs": user_inputs,
+        "market_data": market_data
+    }
+
+def _run_equity_plan(user_inputs: dict, ca_report: str, market_data: dict, scraped_data: str) -> dict:
+    """
+    Run only the investment plan task for one profile of a batch
+    """
+    crew, task_name = create_plan_crew(user_inputs, ca_report if ca_report else None, market_data, scraped_data)
+    result = crew.kickoff()
+    
+    return {
+        "status": "success",
+        "result": str(result),
+        "task_name": f"Equity Analysis - {user_inputs['style'].title()}",
+        "report_file": _save_report(user_inputs, result),
+        "user_inputs": user_inputs,
+        "market_data": market_data
+    }
+
+async def _refresh_cached_plan(cache_key: tuple, user_inputs: dict, market_data: dict):
+    """
+    Background revalidation of a stale cached plan
+    """
+    success = False
+    try:
+        payload = await asyncio.to_thread(_run_equity_analysis, user_inputs, "", market_data)
+        plan_cache.store(cache_key, payload, market_data)
+        success = True
+        print(f"♻️ Refreshed cached equity plan for profile {cache_key}")
+    except Exception as e:
+        print(f"❌ Background refresh failed for profile {cache_key}: {e}")
+    finally:
+        plan_cache.end_refresh(cache_key, success)
+
 @router.post("/analyze")
 async def analyze_equity_investment(
     request: Request,
@@ -25,10 +130,16 @@ async def analyze_equity_investment(
     style: str = Form(...),
     duration: str = Form(...),
     risk_level: str = Form(...),
-    ca_report: str = Form(default="")
+    ca_report: str = Form(default=""),
+    offline: bool = Form(default=False)
 ):
     """
     Analyze equity investment based on user inputs and optional CA report
+    
+    offline: run only from the local market data snapshot, never scraping live data
+    
+    Requests without a CA report are served from the plan cache keyed on the
+    normalized profile; stale plans are returned immediately and refreshed in the background.
     """
     try:
         # Prepare user inputs
@@ -40,31 +151,33 @@ async def analyze_equity_investment(
             "risk_level": risk_level
         }
         
-        # Create crew with user inputs and optional CA report
-        crew, task_name = create_crew(user_inputs, ca_report if ca_report else None)
-        
-        # Execute the crew
-        print("🚀 Starting equity analysis...")
-        result = crew.kickoff()
+        # Use the local market data snapshot when it is fresh (or offline is requested)
+        market_data = plan_market_data(offline)
+        print(f"📊 Market data source: {market_data['source']}")
         
-        # Generate report filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_filename = f"Equity_Analysis_{user_inputs['style']}_{timestamp}.md"
+        # Plans only depend on the profile bucket when there is no CA report
+        cache_key = None if ca_report else normalize_profile(user_inputs)
+        if cache_key:
+            entry, state = plan_cache.lookup(cache_key, market_data)
+            if entry:
+                if state == "stale" and plan_cache.begin_refresh(cache_key):
+                    task = asyncio.create_task(_refresh_cached_plan(cache_key, user_inputs, market_data))
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                print(f"⚡ Serving {state} cached equity plan for profile {cache_key}")
+                return JSONResponse(content={
+                    **entry["result"],
+                    "user_inputs": user_inputs,
+                    "cache": {"status": state, "profile": list(cache_key)}
+                })
         
-        # Save the report
-        output_dir = Path("./equity_agent/output_reports")
-        output_dir.mkdir(exist_ok=True)
-        
-        report_path = output_dir / report_filename
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(str(result))
+        payload = await asyncio.to_thread(_run_equity_analysis, user_inputs, ca_report, market_data)
+        if cache_key:
+            plan_cache.store(cache_key, payload, market_data)
         
         return JSONResponse(content={
-            "status": "success",
-            "result": str(result),
-            "task_name": f"Equity Analysis - {user_inputs['style'].title()}",
-            "report_file": report_filename,
-            "user_inputs": user_inputs
+            **payload,
+            "cache": {"status": "miss" if cache_key else "bypass", "profile": list(cache_key) if cache_key else None}
         })
         
     except Exception as e:
@@ -79,6 +192,132 @@ async def analyze_equity_investment(
             "error_type": type(e).__name__
         }, status_code=500)
 
+@router.post("/analyze/batch")
+async def analyze_equity_batch(batch: EquityBatchRequest):
+    """
+    Analyze many client profiles with one shared market data step
+    
+    The scrape task runs once (or the local snapshot is used), then the investment
+    plan task fans out per profile with at most max_parallel crews running at a time.
+    Profiles without a CA report are answered from the plan cache when it holds a fresh plan,
+    and profiles that normalize to the same cache key share one plan run.
+    """
+    started = time.perf_counter()
+    try:
+        market_data = plan_market_data(batch.offline)
+    except ValueError as e:
+        return JSONResponse(content={"status": "error", "error": str(e), "error_type": type(e).__name__}, status_code=400)
+    print(f"📊 Batch of {len(batch.profiles)} profiles, market data source: {market_data['source']}")
+    
+    profiles = [
+        {
+            "sector": p.sector if p.sector else None,
+            "goal": p.goal,
+            "style": p.style,
+            "duration": p.duration,
+            "risk_level": p.risk_level
+        }
+        for p in batch.profiles
+    ]
+    
+    # Shared market data step
+    scraped_data = None
+    scrape_seconds = 0.0
+    if market_data["source"] == "live_scrape":
+        scrape_started = time.perf_counter()
+        try:
+            crew, _ = create_scrape_crew(profiles)
+            scraped_data = str(await asyncio.to_thread(crew.kickoff))
+        except Exception as e:
+            print(f"❌ Shared scrape failed: {e}")
+            return JSONResponse(content={
+                "status": "error",
+                "error": f"Market data scrape failed: {e}",
+                "error_type": type(e).__name__
+            }, status_code=500)
+        scrape_seconds = round(time.perf_counter() - scrape_started, 2)
+    
+    semaphore = asyncio.Semaphore(min(batch.max_parallel, BATCH_MAX_PARALLEL))
+    
+    async def run_plan(index: int, profile: EquityProfile, user_inputs: dict, cache_key: Optional[tuple]) -> dict:
+        """One plan (or cached plan) with its cache status and timings"""
+        if cache_key:
+            entry, state = plan_cache.lookup(cache_key, market_data)
+            if entry and state == "fresh":
+                return {**entry["result"], "cache": {"status": state, "profile": list(cache_key)},
+                        "timings": {"queued_seconds": 0.0, "plan_seconds": 0.0}}
+        
+        queued = time.perf_counter()
+        async with semaphore:
+            plan_started = time.perf_counter()
+            try:
+                payload = await asyncio.to_thread(_run_equity_plan, user_inputs, profile.ca_report, market_data, scraped_data)
+            except Exception as e:
+                print(f"❌ Equity plan failed for profile {index}: {e}")
+                payload = {"status": "error", "error": str(e) or "Unknown error occurred during analysis", "error_type": type(e).__name__}
+            finished = time.perf_counter()
+        
+        if cache_key and payload["status"] == "success":
+            plan_cache.store(cache_key, payload, market_data)
+        return {
+            **payload,
+            "cache": {"status": "miss" if cache_key else "bypass", "profile": list(cache_key) if cache_key else None},
+            "timings": {
+                "queued_seconds": round(plan_started - queued, 2),
+                "plan_seconds": round(finished - plan_started, 2)
+            }
+        }
+    
+    # Identical profiles would all miss the cache before the first one stores its plan,
+    # so each normalized profile runs once; CA-report profiles are always planned alone
+    groups = {}
+    for index, (profile, user_inputs) in enumerate(zip(batch.profiles, profiles)):
+        group_key = ("report", index) if profile.ca_report else normalize_profile(user_inputs)
+        groups.setdefault(group_key, []).append(index)
+    
+    async def run_group(group_key, indices: List[int]) -> List[dict]:
+        first = indices[0]
+        cache_key = None if batch.profiles[first].ca_report else group_key
+        plan = await run_plan(first, batch.profiles[first], profiles[first], cache_key)
+        results = []
+        for index in indices:
+            result = {**plan, "index": index, "client_id": batch.profiles[index].client_id, "user_inputs": profiles[index]}
+            if index != first:
+                result["cache"] = {**plan["cache"], "shared_with": first}
+            results.append(result)
+        return results
+    
+    grouped = await asyncio.gather(*[run_group(key, indices) for key, indices in groups.items()])
+    results = sorted((r for group in grouped for r in group), key=lambda r: r["index"])
+    
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    return JSONResponse(content={
+        "status": "success" if succeeded == len(results) else ("partial" if succeeded else "error"),
+        "market_data": market_data,
+        "results": results,
+        "timings": {
+            "scrape_seconds": scrape_seconds,
+            "total_seconds": round(time.perf_counter() - started, 2),
+            "profiles": len(results),
+            "succeeded": succeeded
+        }
+    })
+
+@router.get("/cache/metrics")
+async def plan_cache_metrics():
+    """Hit rates and size of the equity plan cache"""
+    return JSONResponse(content=plan_cache.metrics())
+
+@router.get("/market-data")
+async def market_data_status():
+    """Report the age and size of the local market data snapshot"""
+    snapshot = market_data_store.latest_snapshot()
+    return JSONResponse(content={
+        "snapshot": snapshot,
+        "fresh": bool(snapshot) and snapshot["age_hours"] <= MARKET_DATA_MAX_AGE_HOURS,
+        "max_age_hours": MARKET_DATA_MAX_AGE_HOURS
+    })
+
 @router.get("/test")
 async def test_crew():
     """Test endpoint to debug crew creation"""
@@ -113,20 +352,12 @@ async def test_crew():
 async def list_reports():
     """List all generated equity analysis reports"""
     try:
-        output_dir = Path("./equity_agent/output_reports")
-        if not output_dir.exists():
-            return JSONResponse(content={"reports": []})
-        
-        reports = []
-        for file in output_dir.glob("*.md"):
-            reports.append({
-                "filename": file.name,
-                "created": datetime.fromtimestamp(file.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
-                "size": file.stat().st_size
-            })
-        
-        # Sort by creation time (newest first)
-        reports.sort(key=lambda x: x["created"], reverse=True)
+        # Listed newest first
+        reports = [{
+            "filename": report.filename,
+            "created": datetime.fromtimestamp(report.created_at).strftime("%Y-%m-%d %H:%M:%S"),
+            "size": report.size
+        } for report in report_store.list("equity")]
         
         return JSONResponse(content={"reports": reports})
         
@@ -137,26 +368,37 @@ async def list_reports():
         }, status_code=500)
 
 @router.get("/report/{filename}")
-async def get_report(filename: str):
-    """Get a specific report content"""
+async def get_report(filename: str, request: Request, format: str = "json"):
+    """
+    Get a specific report content
+    
+    format=json (default) wraps the markdown in JSON; format=raw serves the markdown with
+    ETag, Range and gzip/brotli support. Both honour If-None-Match / If-Modified-Since.
+    """
     try:
-        output_dir = Path("./equity_agent/output_reports")
-        report_path = output_dir / filename
+        report = report_store.get("equity", filename)
         
-        if not report_path.exists():
+        if not report:
             return JSONResponse(content={
                 "status": "error",
                 "error": "Report not found"
             }, status_code=404)
         
-        with open(report_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if format == "raw":
+            return stored_report_response(request, report, media_type="text/markdown")
+        
+        # The JSON wrapper has its own ETag so it never revalidates against the raw markdown
+        not_modified = report_not_modified_response(request, report, "json")
+        if not_modified:
+            return not_modified
+        
+        content = report_store.read_bytes(report).decode("utf-8")
         
         return JSONResponse(content={
             "status": "success",
             "filename": filename,
             "content": content
-        })
+        }, headers={**report_validators(report, "json"), "Cache-Control": "no-cache"})
         
     except Exception as e:
         return JSONResponse(content={
@@ -0,0 +1,286 @@
+"""
+Local market data store for the equity agent
+Holds fund and stock snapshots (returns, expense ratios, AUM, sector tags) in SQLite
+so the InvestmentPlanner can work from the last snapshot instead of a live scrape.
+Snapshots are written by the ingest command (python -m equity_agent.ingest_market_data).
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = Path(os.getenv("EQUITY_MARKET_DATA_DB", ROOT / "market_data" / "market_data.sqlite"))
+
+# Older snapshots beyond this count are pruned on ingest
+KEEP_SNAPSHOTS = 5
+
+FUND_COLUMNS = [
+    "name", "symbol", "category", "sector", "return_1y", "return_3y", "return_5y",
+    "expense_ratio", "aum_cr", "nav",
+]
+STOCK_COLUMNS = [
+    "name", "symbol", "sector", "price", "market_cap_cr", "pe_ratio", "return_1y",
+    "return_3y", "dividend_yield", "roe",
+]
+NUMERIC_COLUMNS = {
+    "return_1y", "return_3y", "return_5y", "expense_ratio", "aum_cr", "nav", "price",
+    "market_cap_cr", "pe_ratio", "dividend_yield", "roe",
+}
+
+# Accepted spellings of each column in ingest files
+COLUMN_ALIASES = {
+    "name": ["name", "fund_name", "scheme_name", "fund", "company", "company_name"],
+    "symbol": ["symbol", "ticker", "nse_symbol", "scheme_code", "code", "isin"],
+    "category": ["category", "fund_category", "fund_type", "type"],
+    "sector": ["sector", "sector_tag", "industry", "theme"],
+    "return_1y": ["return_1y", "returns_1y", "1y_return", "1y", "1_year_return"],
+    "return_3y": ["return_3y", "returns_3y", "3y_return", "3y", "3_year_return"],
+    "return_5y": ["return_5y", "returns_5y", "5y_return", "5y", "5_year_return"],
+    "expense_ratio": ["expense_ratio", "ter", "expense"],
+    "aum_cr": ["aum_cr", "aum", "aum_crore", "aum_(cr)"],
+    "nav": ["nav", "latest_nav"],
+    "price": ["price", "cmp", "current_price", "ltp"],
+    "market_cap_cr": ["market_cap_cr", "market_cap", "mcap", "market_cap_(cr)"],
+    "pe_ratio": ["pe_ratio", "pe", "p/e", "pe_ttm"],
+    "dividend_yield": ["dividend_yield", "div_yield", "dividend_yield_%"],
+    "roe": ["roe", "roe_%", "return_on_equity"],
+}
+
+
+class MarketDataStore:
+    """
+    SQLite-backed store of fund and stock snapshots
+    """
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        # The schema is created on the first connection only, not on every query
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            self._create_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                source TEXT
+            );
+            CREATE TABLE IF NOT EXISTS funds (
+                snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+                name TEXT NOT NULL, symbol TEXT, category TEXT, sector TEXT,
+                return_1y REAL, return_3y REAL, return_5y REAL,
+                expense_ratio REAL, aum_cr REAL, nav REAL
+            );
+            CREATE TABLE IF NOT EXISTS stocks (
+                snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+                name TEXT NOT NULL, symbol TEXT, sector TEXT,
+                price REAL, market_cap_cr REAL, pe_ratio REAL,
+                return_1y REAL, return_3y REAL, dividend_yield REAL, roe REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_funds_snapshot ON funds(snapshot_id, sector);
+            CREATE INDEX IF NOT EXISTS idx_stocks_snapshot ON stocks(snapshot_id, sector);
+            """
+        )
+
+    def ingest(self, funds: List[Dict[str, Any]], stocks: List[Dict[str, Any]], source: str = "manual") -> int:
+        """
+        Write a new snapshot and prune old ones; returns the snapshot id
+        """
+        fund_rows = [r for r in (normalize_record(f, FUND_COLUMNS) for f in funds) if r["name"]]
+        stock_rows = [r for r in (normalize_record(s, STOCK_COLUMNS) for s in stocks) if r["name"]]
+        if not fund_rows and not stock_rows:
+            raise ValueError("Snapshot contains no fund or stock records")
+
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO snapshots (created_at, source) VALUES (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), source),
+            )
+            snapshot_id = cursor.lastrowid
+            conn.executemany(
+                f"INSERT INTO funds (snapshot_id, {', '.join(FUND_COLUMNS)}) VALUES ({', '.join('?' * (len(FUND_COLUMNS) + 1))})",
+                [(snapshot_id, *[r[c] for c in FUND_COLUMNS]) for r in fund_rows],
+            )
+            conn.executemany(
+                f"INSERT INTO stocks (snapshot_id, {', '.join(STOCK_COLUMNS)}) VALUES ({', '.join('?' * (len(STOCK_COLUMNS) + 1))})",
+                [(snapshot_id, *[r[c] for c in STOCK_COLUMNS]) for r in stock_rows],
+            )
+            stale = [
+                row["id"] for row in conn.execute(
+                    "SELECT id FROM snapshots ORDER BY id DESC LIMIT -1 OFFSET ?", (KEEP_SNAPSHOTS,)
+                )
+            ]
+            for table in ("funds", "stocks"):
+                conn.executemany(f"DELETE FROM {table} WHERE snapshot_id = ?", [(i,) for i in stale])
+            conn.executemany("DELETE FROM snapshots WHERE id = ?", [(i,) for i in stale])
+
+        print(f"Ingested market data snapshot {snapshot_id}: {len(fund_rows)} funds, {len(stock_rows)} stocks")
+        return snapshot_id
+
+    def latest_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Metadata of the newest snapshot, or None when the store is empty
+        """
+        if not self.db_path.exists():
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT id, created_at, source FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+            if not row:
+                return None
+            fund_count = conn.execute("SELECT COUNT(*) FROM funds WHERE snapshot_id = ?", (row["id"],)).fetchone()[0]
+            stock_count = conn.execute("SELECT COUNT(*) FROM stocks WHERE snapshot_id = ?", (row["id"],)).fetchone()[0]
+
+        created_at = datetime.fromisoformat(row["created_at"])
+        return {
+            "snapshot_id": row["id"],
+            "created_at": row["created_at"],
+            "source": row["source"],
+            "age_hours": round((datetime.now() - created_at).total_seconds() / 3600, 2),
+            "funds": fund_count,
+            "stocks": stock_count,
+        }
+
+    def is_fresh(self, max_age_hours: float) -> bool:
+        snapshot = self.latest_snapshot()
+        return bool(snapshot) and snapshot["age_hours"] <= max_age_hours
+
+    def query_funds(self, sector: Optional[str] = None, category: Optional[str] = None, limit: int = 5,
+                    snapshot_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Top funds from the given (default: latest) snapshot, best 3-year return first
+        """
+        return self._query("funds", snapshot_id, sector, category, limit, "return_3y")
+
+    def query_stocks(self, sector: Optional[str] = None, limit: int = 5, snapshot_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Top stocks from the given (default: latest) snapshot, best 1-year return first
+        """
+        return self._query("stocks", snapshot_id, sector, None, limit, "return_1y")
+
+    def _query(self, table: str, snapshot_id: Optional[int], sector: Optional[str], category: Optional[str],
+               limit: int, order_by: str) -> List[Dict[str, Any]]:
+        if snapshot_id is None:
+            snapshot = self.latest_snapshot()
+            if not snapshot:
+                return []
+            snapshot_id = snapshot["snapshot_id"]
+        with closing(self._connect()) as conn:
+            return self._select(conn, table, snapshot_id, sector, category, limit, order_by)
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, table: str, snapshot_id: int, sector: Optional[str], category: Optional[str],
+                limit: int, order_by: str) -> List[Dict[str, Any]]:
+        clauses = ["snapshot_id = ?"]
+        params: List[Any] = [snapshot_id]
+        if sector:
+            if table == "funds":
+                clauses.append("(sector LIKE ? OR category LIKE ?)")
+                params += [f"%{sector}%", f"%{sector}%"]
+            else:
+                clauses.append("sector LIKE ?")
+                params.append(f"%{sector}%")
+        if category and table == "funds":
+            clauses.append("category LIKE ?")
+            params.append(f"%{category}%")
+        params.append(limit)
+
+        rows = conn.execute(
+            f"SELECT * FROM {table} WHERE {' AND '.join(clauses)} "
+            f"ORDER BY {order_by} IS NULL, {order_by} DESC LIMIT ?",
+            params,
+        ).fetchall()
+        return [{k: row[k] for k in row.keys() if k != "snapshot_id"} for row in rows]
+
+    def format_snapshot_tables(self, sector: Optional[str] = None, limit: int = 5,
+                               snapshot: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Markdown tables of the top funds and stocks for prompt injection; pass the
+        snapshot metadata when the caller already has it
+        """
+        snapshot = snapshot or self.latest_snapshot()
+        if not snapshot:
+            return "No market data snapshot available."
+
+        # One connection for all four lookups
+        snapshot_id = snapshot["snapshot_id"]
+        with closing(self._connect()) as conn:
+            funds = self._select(conn, "funds", snapshot_id, sector, None, limit, "return_3y") \
+                or self._select(conn, "funds", snapshot_id, None, None, limit, "return_3y")
+            stocks = self._select(conn, "stocks", snapshot_id, sector, None, limit, "return_1y") \
+                or self._select(conn, "stocks", snapshot_id, None, None, limit, "return_1y")
+
+        def fmt(value: Any, suffix: str = "") -> str:
+            if value is None:
+                return "N/A"
+            if isinstance(value, float):
+                return f"{value:,.2f}{suffix}"
+            return f"{value}{suffix}"
+
+        lines = [f"MARKET DATA SNAPSHOT (as of {snapshot['created_at']}, source: {snapshot['source']})", ""]
+        if funds:
+            lines += [
+                "| Fund | Category | Sector | 1Y Return | 3Y Return | 5Y Return | Expense Ratio | AUM (₹ Cr) |",
+                "|------|----------|--------|-----------|-----------|-----------|---------------|------------|",
+            ]
+            for f in funds:
+                lines.append(
+                    f"| {f['name']} | {fmt(f['category'])} | {fmt(f['sector'])} | {fmt(f['return_1y'], '%')} | "
+                    f"{fmt(f['return_3y'], '%')} | {fmt(f['return_5y'], '%')} | {fmt(f['expense_ratio'], '%')} | {fmt(f['aum_cr'])} |"
+                )
+            lines.append("")
+        if stocks:
+            lines += [
+                "| Stock | Symbol | Sector | Price (₹) | Market Cap (₹ Cr) | P/E | 1Y Return | Dividend Yield | ROE |",
+                "|-------|--------|--------|-----------|-------------------|-----|-----------|----------------|-----|",
+            ]
+            for s in stocks:
+                lines.append(
+                    f"| {s['name']} | {fmt(s['symbol'])} | {fmt(s['sector'])} | {fmt(s['price'])} | {fmt(s['market_cap_cr'])} | "
+                    f"{fmt(s['pe_ratio'])} | {fmt(s['return_1y'], '%')} | {fmt(s['dividend_yield'], '%')} | {fmt(s['roe'], '%')} |"
+                )
+        return "\n".join(lines)
+
+
+def normalize_record(record: Dict[str, Any], columns: List[str]) -> Dict[str, Any]:
+    """
+    Map an ingest record with arbitrary column spellings onto the store schema
+    """
+    lowered = {str(k).strip().lower().replace(" ", "_"): v for k, v in record.items()}
+    normalized = {}
+    for column in columns:
+        value = next((lowered[a] for a in COLUMN_ALIASES.get(column, [column]) if lowered.get(a) not in (None, "")), None)
+        if column in NUMERIC_COLUMNS:
+            value = _to_float(value)
+        elif value is not None:
+            value = str(value).strip()
+        normalized[column] = value
+    return normalized
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = str(value).replace(",", "").replace("%", "").replace("₹", "").strip()
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+# Global store instance
+market_data_store = MarketDataStore()
@@ -0,0 +1,41 @@
+"""
+CrewAI tool that queries the local market data store
+"""
+
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from .market_data_store import market_data_store
+
+
+class MarketDataQuery(BaseModel):
+    asset_type: str = Field(default="both", description="What to look up: 'funds', 'stocks' or 'both'")
+    sector: Optional[str] = Field(default=None, description="Sector or fund category filter, e.g. 'Technology', 'Banking', 'ELSS'")
+    limit: int = Field(default=5, description="Maximum number of funds and stocks to return")
+
+
+class MarketDataTool(BaseTool):
+    name: str = "Market Data Snapshot"
+    description: str = (
+        "Look up mutual fund and stock data (returns, expense ratios, AUM, P/E, sector) from the "
+        "latest local market data snapshot. Use this instead of web search for fund and stock figures."
+    )
+    args_schema: Type[BaseModel] = MarketDataQuery
+
+    def _run(self, asset_type: str = "both", sector: Optional[str] = None, limit: int = 5) -> str:
+        snapshot = market_data_store.latest_snapshot()
+        if not snapshot:
+            return "No market data snapshot available."
+
+        asset_type = (asset_type or "both").lower()
+        if asset_type == "both":
+            return market_data_store.format_snapshot_tables(sector, limit, snapshot=snapshot)
+
+        snapshot_id = snapshot["snapshot_id"]
+        rows = market_data_store.query_stocks(sector, limit, snapshot_id=snapshot_id) if asset_type.startswith("stock") \
+            else market_data_store.query_funds(sector, limit=limit, snapshot_id=snapshot_id)
+        if not rows:
+            return f"No {asset_type} found for sector '{sector}' in snapshot {snapshot['created_at']}."
+        return "\n".join(str(row) for row in rows)
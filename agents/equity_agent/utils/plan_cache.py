@@ -0,0 +1,188 @@
+"""
+Memoization of equity investment plans by normalized user profile
+Requests without a CA report reduce to a small set of (sector, goal, style, duration,
+risk_level) buckets, so their plans are cached and served stale-while-revalidate.
+Entries expire with the market data they were built from.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Entries built from a live scrape are fresh for this long
+PLAN_CACHE_TTL_HOURS = float(os.getenv("EQUITY_PLAN_CACHE_TTL_HOURS", "6"))
+# Stale entries older than this are not served at all
+PLAN_CACHE_MAX_STALE_HOURS = float(os.getenv("EQUITY_PLAN_CACHE_MAX_STALE_HOURS", "168"))
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("EQUITY_PLAN_CACHE_MAX_ENTRIES", "256"))
+
+GOAL_BUCKETS = {
+    "retirement": ["retire", "pension"],
+    "education": ["education", "college", "school", "study"],
+    "house": ["house", "home", "property", "real estate"],
+    "income": ["income", "dividend", "regular", "passive"],
+    "tax_saving": ["tax", "elss", "80c"],
+    "emergency": ["emergency", "safety", "contingency"],
+    "wealth": ["wealth", "growth", "grow", "long-term", "long term"],
+}
+STYLE_BUCKETS = {
+    "swing_trade": ["swing"],
+    "trade": ["trade", "trading", "intraday"],
+    "invest": ["invest", "buy and hold", "hold"],
+}
+RISK_BUCKETS = {
+    "low": ["low", "conservative", "safe"],
+    "high": ["high", "aggressive"],
+    "medium": ["medium", "moderate", "balanced"],
+}
+
+
+def _slug(value: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", (value or "").lower()).strip("_")
+
+
+def bucket_for(value: Optional[str], buckets: Dict[str, list]) -> str:
+    """The first bucket with a keyword in value, else its slug ("unspecified" when empty)"""
+    text = (value or "").lower()
+    for bucket, keywords in buckets.items():
+        if any(k in text for k in keywords):
+            return bucket
+    return _slug(value) or "unspecified"
+
+
+def duration_bounds(duration: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    (low, high) horizon in years from free text: "Less than 1 year" -> (0, 1),
+    "3-5 years" -> (3, 5), "10+ years" -> (10, inf), "6 months" -> (0.5, 0.5)
+    """
+    text = (duration or "").lower()
+    numbers = [float(n) for n in re.findall(r"\d+(?:\.\d+)?", text)]
+    if not numbers:
+        return None
+    scale = 1 / 12 if "month" in text else 0 if ("week" in text or "day" in text) else 1
+    low, high = min(numbers) * scale, max(numbers) * scale
+    if re.search(r"less than|under|below|within|up to|<", text):
+        return 0.0, high
+    if re.search(r"\+|more than|over|above|at least|>", text):
+        return low, float("inf")
+    return low, high
+
+
+def _duration_bucket(duration: Optional[str]) -> str:
+    """
+    Bucket a duration by the upper end of its range, so each of the equity form's options
+    ("Less than 1 year", "1-3 years", "3-5 years", "5-10 years", "10+ years") gets its own
+    """
+    bounds = duration_bounds(duration)
+    if bounds:
+        high = bounds[1]
+        if high <= 1:
+            return "short"
+        if high <= 3:
+            return "medium"
+        if high <= 5:
+            return "long"
+        if high <= 10:
+            return "very_long"
+        return "decade_plus"
+    text = (duration or "").lower()
+    for bucket in ("short", "medium", "long"):
+        if bucket in text:
+            return bucket
+    return _slug(duration) or "unspecified"
+
+
+def normalize_profile(user_inputs: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+    """
+    Reduce user inputs to the (sector, goal, style, duration, risk_level) cache key
+    """
+    return (
+        _slug(user_inputs.get("sector")) or "any",
+        bucket_for(user_inputs.get("goal"), GOAL_BUCKETS),
+        bucket_for(user_inputs.get("style"), STYLE_BUCKETS),
+        _duration_bucket(user_inputs.get("duration")),
+        bucket_for(user_inputs.get("risk_level"), RISK_BUCKETS),
+    )
+
+
+class PlanCache:
+    """
+    In-memory LRU of investment plans with stale-while-revalidate bookkeeping
+    """
+    def __init__(self, max_entries: int = PLAN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0}
+
+    def lookup(self, key: tuple, market_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Return (entry, state) where state is "fresh", "stale" or "miss"
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            age_hours = (time.time() - entry["created_at"]) / 3600 if entry else None
+            if entry is None or age_hours > PLAN_CACHE_MAX_STALE_HOURS:
+                self.counters["misses"] += 1
+                return None, "miss"
+
+            self.entries.move_to_end(key)
+            if self._is_fresh(entry, age_hours, market_data):
+                self.counters["hits"] += 1
+                return entry, "fresh"
+            self.counters["stale_hits"] += 1
+            return entry, "stale"
+
+    def _is_fresh(self, entry: Dict[str, Any], age_hours: float, market_data: Dict[str, Any]) -> bool:
+        snapshot = market_data.get("snapshot")
+        if market_data.get("source") == "snapshot" and snapshot:
+            # Tied to the snapshot: fresh until a newer snapshot is ingested
+            return entry.get("snapshot_id") == snapshot["snapshot_id"]
+        return entry.get("snapshot_id") is None and age_hours <= PLAN_CACHE_TTL_HOURS
+
+    def store(self, key: tuple, result: Dict[str, Any], market_data: Dict[str, Any]):
+        snapshot = market_data.get("snapshot") if market_data.get("source") == "snapshot" else None
+        with self.lock:
+            self.entries[key] = {
+                "result": result,
+                "created_at": time.time(),
+                "snapshot_id": snapshot["snapshot_id"] if snapshot else None,
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def begin_refresh(self, key: tuple) -> bool:
+        """Mark a background refresh as started; False if one is already running"""
+        with self.lock:
+            if key in self.refreshing:
+                return False
+            self.refreshing.add(key)
+            self.counters["refreshes"] += 1
+            return True
+
+    def end_refresh(self, key: tuple, success: bool = True):
+        with self.lock:
+            self.refreshing.discard(key)
+            if not success:
+                self.counters["refresh_failures"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"]
+            served = self.counters["hits"] + self.counters["stale_hits"]
+            return {
+                **self.counters,
+                "lookups": lookups,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+                "fresh_hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self.entries),
+                "refreshing": len(self.refreshing),
+            }
+
+
+# Global plan cache instance
+plan_cache = PlanCache()
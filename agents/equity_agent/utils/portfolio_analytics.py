@@ -0,0 +1,344 @@
+"""
+Deterministic portfolio analytics for the equity InvestmentPlanner
+Vectorized CAGR, volatility, Sharpe ratio, drawdown, mean-variance allocation by
+risk level and SIP future-value projections. The results are injected into the
+create_investment_plan task as precomputed tables so the LLM only writes the narrative.
+
+Run `python -m equity_agent.utils.portfolio_analytics` from agents/ for benchmarks.
+"""
+
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .plan_cache import RISK_BUCKETS, bucket_for, duration_bounds
+
+RISK_FREE_RATE = float(os.getenv("EQUITY_RISK_FREE_RATE", "0.065"))
+SIP_BASE_AMOUNT = float(os.getenv("EQUITY_SIP_BASE_AMOUNT", "10000"))
+
+# Long-run planning assumptions per asset class: (expected annual return, annual volatility)
+ASSET_CLASSES = ["large_cap", "mid_cap", "small_cap", "debt", "gold"]
+ASSET_CLASS_LABELS = {
+    "large_cap": "Large Cap Equity",
+    "mid_cap": "Mid Cap Equity",
+    "small_cap": "Small Cap Equity",
+    "debt": "Debt Funds",
+    "gold": "Gold",
+}
+EXPECTED_RETURNS = np.array([0.12, 0.135, 0.15, 0.07, 0.08])
+VOLATILITIES = np.array([0.15, 0.20, 0.25, 0.03, 0.14])
+CORRELATIONS = np.array([
+    [1.00, 0.90, 0.85, 0.10, 0.00],
+    [0.90, 1.00, 0.92, 0.08, 0.00],
+    [0.85, 0.92, 1.00, 0.05, 0.00],
+    [0.10, 0.08, 0.05, 1.00, 0.10],
+    [0.00, 0.00, 0.00, 0.10, 1.00],
+])
+
+# Per-class (min, max) weights so no risk level ends up in a corner portfolio:
+# some large cap and debt always, small cap and gold capped
+WEIGHT_BOUNDS = {
+    "large_cap": (0.15, 0.65),
+    "mid_cap": (0.0, 0.30),
+    "small_cap": (0.0, 0.20),
+    "debt": (0.05, 0.70),
+    "gold": (0.0, 0.15),
+}
+LOWER_BOUNDS = np.array([WEIGHT_BOUNDS[a][0] for a in ASSET_CLASSES])
+UPPER_BOUNDS = np.array([WEIGHT_BOUNDS[a][1] for a in ASSET_CLASSES])
+
+# Mean-variance risk aversion per risk_level (higher = more conservative)
+RISK_AVERSION = {"low": 12.0, "medium": 4.0, "high": 1.5}
+
+# Annual return scenarios for SIP projections
+RETURN_SCENARIOS = {"Conservative": -0.03, "Base": 0.0, "Optimistic": 0.03}
+
+# Volatility assumption used to rank snapshot funds by category
+CATEGORY_VOLATILITY = {
+    "small": 0.25, "mid": 0.20, "large": 0.15, "flexi": 0.17, "multi": 0.17,
+    "elss": 0.17, "index": 0.15, "sector": 0.22, "thematic": 0.22,
+    "hybrid": 0.10, "debt": 0.03, "liquid": 0.01, "gilt": 0.05, "gold": 0.14,
+}
+
+
+def cagr(start_values, end_values, years):
+    """Compound annual growth rate, elementwise over arrays"""
+    start_values = np.asarray(start_values, dtype=float)
+    end_values = np.asarray(end_values, dtype=float)
+    return (end_values / start_values) ** (1.0 / np.asarray(years, dtype=float)) - 1.0
+
+
+def periodic_returns(prices):
+    """Simple returns along the last axis of a (n_assets, n_periods) price matrix"""
+    prices = np.atleast_2d(np.asarray(prices, dtype=float))
+    return prices[:, 1:] / prices[:, :-1] - 1.0
+
+
+def cagr_from_prices(prices, periods_per_year: int = 252):
+    """CAGR of each price series in a (n_assets, n_periods) matrix"""
+    prices = np.atleast_2d(np.asarray(prices, dtype=float))
+    years = (prices.shape[1] - 1) / periods_per_year
+    return cagr(prices[:, 0], prices[:, -1], years)
+
+
+def annualized_volatility(returns, periods_per_year: int = 252):
+    """Annualized standard deviation of periodic returns along the last axis"""
+    returns = np.atleast_2d(np.asarray(returns, dtype=float))
+    return returns.std(axis=-1, ddof=1) * np.sqrt(periods_per_year)
+
+
+def sharpe_ratio(returns, risk_free_rate: float = RISK_FREE_RATE, periods_per_year: int = 252):
+    """Annualized Sharpe ratio of periodic returns along the last axis"""
+    returns = np.atleast_2d(np.asarray(returns, dtype=float))
+    excess = returns - risk_free_rate / periods_per_year
+    std = excess.std(axis=-1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, excess.mean(axis=-1) / std * np.sqrt(periods_per_year), 0.0)
+
+
+def max_drawdown(prices):
+    """Largest peak-to-trough fall (as a negative fraction) of each price series"""
+    prices = np.atleast_2d(np.asarray(prices, dtype=float))
+    peaks = np.maximum.accumulate(prices, axis=-1)
+    return (prices / peaks - 1.0).min(axis=-1)
+
+
+def covariance_matrix(volatilities=VOLATILITIES, correlations=CORRELATIONS):
+    volatilities = np.asarray(volatilities, dtype=float)
+    return np.outer(volatilities, volatilities) * np.asarray(correlations, dtype=float)
+
+
+def _project_to_simplex(v):
+    """Euclidean projection onto {w >= 0, sum(w) = 1}"""
+    u = np.sort(v)[::-1]
+    cumulative = np.cumsum(u) - 1.0
+    rho = np.nonzero(u * np.arange(1, len(v) + 1) > cumulative)[0][-1]
+    return np.maximum(v - cumulative[rho] / (rho + 1.0), 0.0)
+
+
+def _project_to_bounded_simplex(v, lower, upper, iterations: int = 100):
+    """
+    Euclidean projection onto {lower <= w <= upper, sum(w) = 1}: w = clip(v - t) with
+    the shift t found by bisection
+    """
+    v = np.asarray(v, dtype=float)
+    low, high = (v - upper).min() - 1.0, (v - lower).max() + 1.0
+    for _ in range(iterations):
+        t = (low + high) / 2
+        if np.clip(v - t, lower, upper).sum() > 1.0:
+            low = t
+        else:
+            high = t
+    return np.clip(v - (low + high) / 2, lower, upper)
+
+
+def mean_variance_weights(expected_returns, covariance, risk_aversion: float, lower=None, upper=None, iterations: int = 1000):
+    """
+    Long-only mean-variance weights maximizing w'mu - (risk_aversion / 2) w'Sigma w,
+    solved by projected gradient ascent, optionally within per-asset weight bounds
+    """
+    mu = np.asarray(expected_returns, dtype=float)
+    sigma = np.asarray(covariance, dtype=float)
+    if lower is None and upper is None:
+        project = _project_to_simplex
+    else:
+        lower = np.zeros(len(mu)) if lower is None else np.asarray(lower, dtype=float)
+        upper = np.ones(len(mu)) if upper is None else np.asarray(upper, dtype=float)
+        project = lambda w: _project_to_bounded_simplex(w, lower, upper)
+    step = 1.0 / (risk_aversion * np.linalg.eigvalsh(sigma).max())
+    weights = project(np.full(len(mu), 1.0 / len(mu)))
+    for _ in range(iterations):
+        weights = project(weights + step * (mu - risk_aversion * sigma @ weights))
+    return weights
+
+
+def normalize_risk_level(risk_level: Optional[str]) -> str:
+    """The plan cache's risk bucket ("aggressive" -> "high"), medium when unrecognized"""
+    bucket = bucket_for(risk_level, RISK_BUCKETS)
+    return bucket if bucket in RISK_AVERSION else "medium"
+
+
+@lru_cache(maxsize=None)
+def _bucket_weights(bucket: str) -> tuple:
+    # Depends only on the module assumptions, so each bucket is optimized once per process
+    weights = mean_variance_weights(EXPECTED_RETURNS, covariance_matrix(), RISK_AVERSION[bucket], LOWER_BOUNDS, UPPER_BOUNDS)
+    return tuple(float(w) for w in weights)
+
+
+def allocation_for_risk_level(risk_level: str) -> Dict[str, float]:
+    """Asset-class weights for a risk level using the planning assumptions"""
+    return dict(zip(ASSET_CLASSES, _bucket_weights(normalize_risk_level(risk_level))))
+
+
+def portfolio_statistics(weights, expected_returns=EXPECTED_RETURNS, covariance=None, risk_free_rate: float = RISK_FREE_RATE):
+    """Expected return, volatility and Sharpe ratio of a weight vector"""
+    weights = np.asarray(weights, dtype=float)
+    covariance = covariance_matrix() if covariance is None else covariance
+    expected = float(weights @ expected_returns)
+    volatility = float(np.sqrt(weights @ covariance @ weights))
+    return {
+        "expected_return": expected,
+        "volatility": volatility,
+        "sharpe": (expected - risk_free_rate) / volatility if volatility else 0.0,
+    }
+
+
+def sip_future_value(monthly_amount, annual_returns, years):
+    """
+    Future value of a monthly SIP (paid at the start of each month)
+
+    Broadcasts annual_returns against years, e.g. returns[:, None] and years[None, :]
+    give a (scenarios, horizons) matrix.
+    """
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    months = np.asarray(years, dtype=float) * 12
+    r = (1.0 + annual_returns) ** (1.0 / 12) - 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(r != 0, ((1.0 + r) ** months - 1.0) / r * (1.0 + r), months)
+    return monthly_amount * growth
+
+
+def parse_duration_years(duration: Optional[str], default: float = 5.0) -> float:
+    """
+    Investment horizon in years from free text: the upper end of a range ("3-5 years"
+    -> 5), half of a "less than" bound ("Less than 1 year" -> 0.5) and the stated
+    minimum of an open range ("10+ years" -> 10)
+    """
+    bounds = duration_bounds(duration)
+    if not bounds:
+        text = (duration or "").lower()
+        return {"short": 1.0, "medium": 3.0, "long": 7.0}.get(next((k for k in ("short", "medium", "long") if k in text), ""), default)
+    low, high = bounds
+    if high == float("inf"):
+        years = low
+    elif low == 0 and high > 0:
+        years = high / 2
+    else:
+        years = high
+    return max(years, 1 / 12)
+
+
+def rank_snapshot_funds(funds: Sequence[Dict], risk_free_rate: float = RISK_FREE_RATE) -> List[Dict]:
+    """
+    Estimated Sharpe ratio of snapshot funds from their trailing return and a
+    category volatility assumption (snapshots carry no NAV history)
+    """
+    funds = [f for f in funds if f.get("return_3y") is not None or f.get("return_1y") is not None]
+    if not funds:
+        return []
+
+    returns = np.array([(f.get("return_3y") if f.get("return_3y") is not None else f["return_1y"]) / 100 for f in funds])
+    expense = np.array([(f.get("expense_ratio") or 0.0) / 100 for f in funds])
+    volatility = np.array([_category_volatility(f) for f in funds])
+    sharpe = (returns - risk_free_rate) / volatility
+
+    order = np.argsort(-sharpe)
+    return [
+        {
+            "name": funds[i]["name"],
+            "category": funds[i].get("category") or funds[i].get("sector") or "N/A",
+            "trailing_return": float(returns[i]),
+            "net_of_expense": float(returns[i] - expense[i]),
+            "assumed_volatility": float(volatility[i]),
+            "estimated_sharpe": float(sharpe[i]),
+        }
+        for i in order
+    ]
+
+
+def _category_volatility(fund: Dict) -> float:
+    text = f"{fund.get('category') or ''} {fund.get('sector') or ''}".lower()
+    return next((v for k, v in CATEGORY_VOLATILITY.items() if k in text), 0.17)
+
+
+def build_analytics_tables(user_inputs: Dict, funds: Optional[Sequence[Dict]] = None, monthly_amount: float = SIP_BASE_AMOUNT) -> str:
+    """
+    Markdown tables of allocation, expected risk/return, SIP projections and fund
+    rankings for the user's risk level and horizon
+    """
+    risk_level = normalize_risk_level(user_inputs.get("risk_level"))
+    horizon = parse_duration_years(user_inputs.get("duration"))
+    allocation = allocation_for_risk_level(risk_level)
+    weights = np.array([allocation[a] for a in ASSET_CLASSES])
+    stats = portfolio_statistics(weights)
+
+    lines = [
+        f"ASSET ALLOCATION (mean-variance, risk level: {risk_level})",
+        "| Asset Class | Weight | Assumed Return | Assumed Volatility |",
+        "|-------------|--------|----------------|--------------------|",
+    ]
+    for i, asset in enumerate(ASSET_CLASSES):
+        if weights[i] >= 0.005:
+            lines.append(f"| {ASSET_CLASS_LABELS[asset]} | {weights[i]:.1%} | {EXPECTED_RETURNS[i]:.1%} | {VOLATILITIES[i]:.1%} |")
+    lines += [
+        "",
+        f"Portfolio expected return: {stats['expected_return']:.2%} | volatility: {stats['volatility']:.2%} | "
+        f"Sharpe ratio (rf {RISK_FREE_RATE:.1%}): {stats['sharpe']:.2f}",
+        "",
+    ]
+
+    horizons = np.unique(np.round(np.array([1.0, 3.0, 5.0, 10.0, horizon]), 2))
+    horizons = horizons[horizons <= max(horizon, 5.0)]
+    scenario_returns = stats["expected_return"] + np.array(list(RETURN_SCENARIOS.values()))
+    projections = sip_future_value(monthly_amount, scenario_returns[:, None], horizons[None, :])
+    invested = monthly_amount * 12 * horizons
+
+    lines += [
+        f"SIP PROJECTIONS (₹{monthly_amount:,.0f}/month; scale linearly for other amounts)",
+        "| Scenario | Annual Return | " + " | ".join(f"{h:g} yr" for h in horizons) + " |",
+        "|----------|---------------|" + "|".join("------" for _ in horizons) + "|",
+        "| Amount Invested | - | " + " | ".join(f"₹{v:,.0f}" for v in invested) + " |",
+    ]
+    for (name, _), rate, row in zip(RETURN_SCENARIOS.items(), scenario_returns, projections):
+        lines.append(f"| {name} | {rate:.1%} | " + " | ".join(f"₹{v:,.0f}" for v in row) + " |")
+
+    ranked = rank_snapshot_funds(funds or [])
+    if ranked:
+        lines += [
+            "",
+            "FUND RANKING (estimated Sharpe from trailing return and category volatility)",
+            "| Fund | Category | Trailing Return | Net of Expenses | Assumed Volatility | Est. Sharpe |",
+            "|------|----------|-----------------|-----------------|--------------------|-------------|",
+        ]
+        for f in ranked:
+            lines.append(
+                f"| {f['name']} | {f['category']} | {f['trailing_return']:.1%} | {f['net_of_expense']:.1%} | "
+                f"{f['assumed_volatility']:.0%} | {f['estimated_sharpe']:.2f} |"
+            )
+
+    return "\n".join(lines)
+
+
+def _benchmark():
+    """Time the vectorized metrics on a large synthetic price panel"""
+    import timeit
+
+    rng = np.random.default_rng(0)
+    n_assets, n_days = 500, 252 * 10
+    prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.012, size=(n_assets, n_days)), axis=1)
+    returns = periodic_returns(prices)
+
+    cases = {
+        "cagr_from_prices": lambda: cagr_from_prices(prices),
+        "annualized_volatility": lambda: annualized_volatility(returns),
+        "sharpe_ratio": lambda: sharpe_ratio(returns),
+        "max_drawdown": lambda: max_drawdown(prices),
+        # allocation_for_risk_level memoizes this per risk bucket
+        "mean_variance_weights": lambda: mean_variance_weights(
+            EXPECTED_RETURNS, covariance_matrix(), RISK_AVERSION["medium"], LOWER_BOUNDS, UPPER_BOUNDS
+        ),
+        "sip_future_value (100x40)": lambda: sip_future_value(
+            SIP_BASE_AMOUNT, np.linspace(0.0, 0.2, 100)[:, None], np.arange(1, 41)[None, :]
+        ),
+    }
+    print(f"Benchmark: {n_assets} assets x {n_days} daily prices")
+    for name, fn in cases.items():
+        runs = 20
+        seconds = timeit.timeit(fn, number=runs) / runs
+        print(f"  {name:<28} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -1,13 +1,43 @@
 import os
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
-from cerebras.cloud.sdk import Cerebras
+from dataclasses import dataclass
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import json
-import re
+import asyncio
+import functools
+
+from common.cerebras_client import cerebras_client
+from pict_route_data_extractor import build_pictorial_sections, figures_summary
+from pict_route_cache import PictorialCache, report_type_for_task
+from pict_route_stream import SectionStreamParser
 
 router = APIRouter()
 
+PICTORIAL_MODEL = "llama-4-scout-17b-16e-instruct"
+# Each section group is its own call; a failed or malformed one is retried on its own
+PICTORIAL_SECTION_RETRIES = int(os.getenv("PICTORIAL_SECTION_RETRIES", "1"))
+# Charts are only requested from the LLM when the extractor produced fewer than this
+PICTORIAL_MIN_EXTRACTED_CHARTS = int(os.getenv("PICTORIAL_MIN_EXTRACTED_CHARTS", "3"))
+
+EMPTY_PICTORIAL_DATA = {
+    "key_metrics": [],
+    "charts_data": [],
+    "highlights": [],
+    "risk_alerts": [],
+    "compliance_status": [],
+    "timeline_events": [],
+    "recommendations": []
+}
+# Called with (section key, value) as each dashboard section becomes available
+SectionCallback = Callable[[str, Any], None]
+BUSINESS_REPORT_TYPES = ("business", "self-employed", "self_employed", "corporate")
+
+# Bump whenever the prompts or the extractor change so cached dashboards are regenerated
+PICTORIAL_PROMPT_VERSION = "4"
+pictorial_cache = PictorialCache(prompt_version=PICTORIAL_PROMPT_VERSION)
+
 class MarkdownAnalysisRequest(BaseModel):
     markdown_content: str
     report_type: str
@@ -21,280 +51,256 @@ class PictorialData(BaseModel):
     timeline_events: List[Dict[str, Any]]
     recommendations: List[Dict[str, Any]]
 
-@router.post("/extract-pictorial-data")
-async def extract_pictorial_data(request: MarkdownAnalysisRequest):
-    try:
-        # Initialize Cerebras client
-        client = Cerebras(api_key=os.environ.get("CEREBRAS_API_KEY"))
+@dataclass(frozen=True)
+class SectionGroup:
+    """Dashboard sections requested together in one LLM call"""
+    name: str
+    task: str
+    # Section key -> JSON schema shown to the model
+    schemas: Dict[str, str]
+    max_tokens: int
+    business_only: Tuple[str, ...] = ()
+
+    def keys_for(self, report_type: str) -> List[str]:
+        if report_type.lower() in BUSINESS_REPORT_TYPES:
+            return list(self.schemas)
+        return [key for key in self.schemas if key not in self.business_only]
+
+SECTION_GROUPS = (
+    SectionGroup(
+        name="metrics",
+        task="Score the client's financial health and fill in the business KPIs, cost structure, asset breakdown and benchmarks. Use 0 where the report has no figure.",
+        schemas={
+            "financial_health_score": '{"overall_score": number (1-100), "categories": [{"category": "profitability|liquidity|solvency|efficiency", "score": number (1-100), "status": "excellent|good|average|poor", "key_indicator": "string"}]}',
+            "benchmark_analysis": '[{"metric": "string", "your_value": "string", "industry_average": "string", "performance": "above|at|below", "recommendation": "string"}]',
+            "business_kpis": '{"revenue_growth": {"value": "string", "trend": "up|down|stable", "period": "string"}, "profit_margins": {"gross": number, "ebitda": number, "net": number}, "efficiency_ratios": {"inventory_turnover": number, "receivables_turnover": number, "asset_turnover": number}, "liquidity_ratios": {"current_ratio": number, "quick_ratio": number, "cash_ratio": number}, "leverage_ratios": {"debt_to_equity": number, "interest_coverage": number, "debt_service_coverage": number}}',
+            "cost_structure": '{"total_costs": number, "cost_breakdown": [{"category": "string", "amount": number, "percentage": number, "optimization_potential": number, "priority": "high|medium|low", "recommendations": ["string"]}], "cost_efficiency_score": number, "optimization_opportunities": {"immediate": ["string"], "medium_term": ["string"], "long_term": ["string"]}, "benchmark_comparison": {"industry_average": number, "position": "better|average|needs_improvement"}}',
+            "asset_breakdown": '{"total_assets": number, "asset_categories": [{"category": "string", "current_assets": number, "non_current_assets": number, "total": number, "liquidity_score": number, "growth_potential": "string", "risk_level": "low|medium|high"}], "liquidity_analysis": {"highly_liquid": number, "moderately_liquid": number, "illiquid": number}, "asset_efficiency": {"asset_turnover": number, "roa": number, "asset_utilization": number}, "investment_recommendations": [{"category": "string", "recommendation": "string", "priority": "high|medium|low", "potential_impact": "string"}]}',
+        },
+        max_tokens=1800,
+        business_only=("business_kpis", "cost_structure", "asset_breakdown"),
+    ),
+    SectionGroup(
+        name="charts",
+        task="Add 2-4 charts for figures not already charted (trends over time, ratios, scores). Use only numbers from the report.",
+        schemas={
+            "charts_data": '[{"type": "pie|bar|line|doughnut|area|radialBar|donut|gauge", "title": "string", "data": {"labels": ["string"], "values": [number]}, "color_scheme": "blue|green|orange|purple|red", "description": "string", "insights": ["string"]}]',
+        },
+        max_tokens=1200,
+    ),
+    SectionGroup(
+        name="risks",
+        task="List up to 5 risk alerts, the compliance items the report mentions and the upcoming filing and payment dates.",
+        schemas={
+            "risk_alerts": '[{"level": "high|medium|low", "title": "string", "description": "string", "action_required": "string", "impact": "financial|compliance|operational"}]',
+            "compliance_status": '[{"item": "string", "status": "compliant|non_compliant|pending", "description": "string", "due_date": "string", "penalty_risk": "high|medium|low|none"}]',
+            "timeline_events": '[{"date": "string", "event": "string", "importance": "high|medium|low", "status": "completed|pending|upcoming", "category": "filing|payment|compliance|planning"}]',
+        },
+        max_tokens=1200,
+    ),
+    SectionGroup(
+        name="recommendations",
+        task="Give 3-5 highlights and 3-6 recommendations grounded in the report. Keep each message to one or two sentences and include ₹ amounts where the report has them.",
+        schemas={
+            "highlights": '[{"type": "success|warning|info|error", "title": "string", "message": "string", "icon": "check|alert|info|dollar"}]',
+            "recommendations": '[{"priority": "high|medium|low", "category": "tax_saving|investment|compliance|planning|operational", "title": "string", "description": "string", "potential_savings": "string", "timeline": "string", "complexity": "easy|medium|complex"}]',
+        },
+        max_tokens=1000,
+    ),
+)
+
+def _section_prompt(group: SectionGroup, keys: List[str], report_type: str, markdown_content: str, figures: str) -> str:
+    schema = ",\n".join(f'    "{key}": {group.schemas[key]}' for key in keys)
+    return f"""
+        Read this CA report and fill in part of its dashboard. The report type is: {report_type}
         
-        if not os.environ.get("CEREBRAS_API_KEY"):
-            raise HTTPException(status_code=500, detail="CEREBRAS_API_KEY not found")
+        Markdown Content:
+        {markdown_content}
         
-        # Create a detailed prompt for extracting pictorial data
-        extraction_prompt = f"""
-        Analyze this CA report markdown content and extract comprehensive structured data for visual representation. 
-        The report type is: {request.report_type}
+        Figures already extracted from the report (use them, do not recompute them):
+        {figures or "None"}
         
-        Markdown Content:
-        {request.markdown_content}
+        {group.task}
         
-        Extract and return ONLY a valid JSON object with the following structure (no additional text):
+        Return ONLY a valid JSON object with exactly these keys (no additional text):
         {{
-            "key_metrics": [
-                {{
-                    "title": "string",
-                    "value": "string", 
-                    "unit": "string",
-                    "trend": "up|down|stable",
-                    "color": "green|red|blue|orange|purple",
-                    "icon": "dollar|percent|calendar|user|building|chart",
-                    "description": "string"
-                }}
-            ],
-            "tax_regime_comparison": {{
-                "old_regime": {{
-                    "taxable_income": "string",
-                    "tax_liability": "string",
-                    "effective_rate": "string",
-                    "deductions_used": ["string"],
-                    "final_amount": "string"
-                }},
-                "new_regime": {{
-                    "taxable_income": "string", 
-                    "tax_liability": "string",
-                    "effective_rate": "string",
-                    "deductions_used": ["string"],
-                    "final_amount": "string"
-                }},
-                "recommendation": "old|new",
-                "savings_amount": "string",
-                "savings_percentage": "string"
-            }},
-            "financial_health_score": {{
-                "overall_score": "number (1-100)",
-                "categories": [
-                    {{
-                        "category": "profitability|liquidity|solvency|efficiency",
-                        "score": "number (1-100)", 
-                        "status": "excellent|good|average|poor",
-                        "key_indicator": "string"
-                    }}
-                ]
-            }},
-            "charts_data": [
-                {{
-                    "type": "pie|bar|line|doughnut|area|radialBar|donut|gauge",
-                    "title": "string",
-                    "data": {{"labels": ["string"], "values": [number]}},
-                    "color_scheme": "blue|green|orange|purple|red",
-                    "description": "string",
-                    "insights": ["string"]
-                }}
-            ],
-            "expense_breakdown": [
-                {{
-                    "category": "string",
-                    "amount": "string",
-                    "percentage": "number",
-                    "trend": "up|down|stable"
-                }}
-            ],
-            "income_sources": [
-                {{
-                    "source": "string",
-                    "amount": "string", 
-                    "percentage": "number",
-                    "tax_treatment": "string"
-                }}
-            ],
-            "highlights": [
-                {{
-                    "type": "success|warning|info|error",
-                    "title": "string",
-                    "message": "string",
-                    "icon": "check|alert|info|dollar"
-                }}
-            ],
-            "risk_alerts": [
-                {{
-                    "level": "high|medium|low",
-                    "title": "string",
-                    "description": "string",
-                    "action_required": "string",
-                    "impact": "financial|compliance|operational"
-                }}
-            ],
-            "compliance_status": [
-                {{
-                    "item": "string",
-                    "status": "compliant|non_compliant|pending",
-                    "description": "string",
-                    "due_date": "string",
-                    "penalty_risk": "high|medium|low|none"
-                }}
-            ],
-            "timeline_events": [
-                {{
-                    "date": "string",
-                    "event": "string",
-                    "importance": "high|medium|low",
-                    "status": "completed|pending|upcoming",
-                    "category": "filing|payment|compliance|planning"
-                }}
-            ],
-            "recommendations": [
-                {{
-                    "priority": "high|medium|low",
-                    "category": "tax_saving|investment|compliance|planning|operational",
-                    "title": "string",
-                    "description": "string",
-                    "potential_savings": "string",
-                    "timeline": "string",
-                    "complexity": "easy|medium|complex"
-                }}
-            ],
-            "benchmark_analysis": [
-                {{
-                    "metric": "string",
-                    "your_value": "string",
-                    "industry_average": "string", 
-                    "performance": "above|at|below",
-                    "recommendation": "string"
-                }}
-            ],
-            "business_kpis": {{
-                "revenue_growth": {{"value": "string", "trend": "up|down|stable", "period": "string"}},
-                "profit_margins": {{"gross": "number", "ebitda": "number", "net": "number"}},
-                "efficiency_ratios": {{"inventory_turnover": "number", "receivables_turnover": "number", "asset_turnover": "number"}},
-                "liquidity_ratios": {{"current_ratio": "number", "quick_ratio": "number", "cash_ratio": "number"}},
-                "leverage_ratios": {{"debt_to_equity": "number", "interest_coverage": "number", "debt_service_coverage": "number"}}
-            }},
-            "quarterly_performance": [
-                {{
-                    "quarter": "Q1|Q2|Q3|Q4",
-                    "revenue": "number",
-                    "expenses": "number", 
-                    "profit": "number",
-                    "gst_liability": "number",
-                    "working_capital": "number"
-                }}
-            ],
-            "cost_structure": [
-                {{
-                    "category": "COGS|Employee Benefits|Finance Costs|Marketing|Rent|Utilities|Professional Fees|Travel|Depreciation|Others",
-                    "amount": "string",
-                    "percentage": "number",
-                    "trend": "up|down|stable",
-                    "optimization_potential": "high|medium|low"
-                }}
-            ],
-            "asset_breakdown": [
-                {{
-                    "category": "Current Assets|Fixed Assets|Investments",
-                    "subcategory": "string",
-                    "amount": "string",
-                    "percentage": "number",
-                    "liquidity": "high|medium|low"
-                }}
-            ]
+{schema}
         }}
-        
-        Based on the report type, focus on extracting and CREATE MULTIPLE CHARTS:
-        
-        FOR SALARIED INDIVIDUALS - Generate these specific charts:
-        1. DOUGHNUT CHART: Salary Components Breakdown (Basic, HRA, Special Allowance, LTA, Medical, etc.)
-        2. BAR CHART: Monthly Tax Deductions vs Take-home (show 12 months if data available) 
-        3. PIE CHART: Section-wise Tax Deductions (80C, 80D, Standard Deduction, Professional Tax)
-        4. LINE CHART: Tax Liability Trend - Old vs New Regime Over Time
-        5. AREA CHART: Annual Cash Flow Distribution (Cumulative monthly flow)
-        6. RADIALBAR CHART: Investment Portfolio Distribution for Tax Saving (EPF, PPF, ELSS, Insurance, etc.)
-        7. GAUGE CHART: Tax Efficiency Score (how well tax is optimized vs potential savings)
-        
-        FOR SELF-EMPLOYED - Generate these specific charts:
-        1. DONUT CHART: Revenue Sources by Client (show top 5-7 clients)
-        2. LINE CHART: Monthly Revenue Trend (12 months with growth indicators)
-        3. PIE CHART: Business Expense Categories (Office Rent, Travel, Marketing, Professional Fees, etc.)
-        4. BAR CHART: Quarterly GST Analysis (GST Collected vs GST Paid vs ITC)
-        5. DOUGHNUT CHART: Tax Components (Income Tax, GST, Advance Tax)
-        6. AREA CHART: Profitability Analysis (Revenue vs Expenses vs Net Profit over time)
-        7. RADIALBAR CHART: Client Concentration Risk Score (diversification level)
-        
-        FOR BUSINESS/CORPORATE - Generate these specific charts:
-        1. DOUGHNUT CHART: Revenue Breakdown by Components (Gross Sales, Other Operating Income, Sales Returns)
-        2. LINE CHART: Profitability Trend Analysis (Gross Profit %, EBITDA %, Net Profit % over quarters)
-        3. PIE CHART: Expense Distribution (COGS, Employee Benefits, Finance Costs, Marketing, Rent, Others)
-        4. BAR CHART: Financial Ratios Comparison (ROE, ROA, Current Ratio, Debt-to-Equity vs Industry Standards)
-        5. DONUT CHART: Asset Allocation Structure (Current Assets, Fixed Assets, Investments breakdown)
-        6. AREA CHART: Working Capital Components Analysis (Cash, Receivables, Inventory, Payables over time)
-        7. PIE CHART: Tax Liability Structure (Income Tax, CGST, SGST, Net GST Payable)
-        8. BAR CHART: Quarterly GST Analysis (Outward Supplies, Tax Payable, ITC, Net Payable by quarter)
-        9. GAUGE CHART: Overall Financial Health Score (based on profitability, liquidity, solvency metrics)
-        10. RADIALBAR CHART: Efficiency Metrics (Inventory Turnover, Receivables Turnover, Asset Turnover scores)
-        11. LINE CHART: Cash Flow Indicators (Working Capital Cycle Days, Interest Coverage Ratio trends)
-        
-        CHART GENERATION RULES:
-        - Always create 5-9 charts per report type using diverse visualization types
-        - Use actual numerical data from the markdown content
-        - PIE/DOUGHNUT/DONUT charts: Show percentage distributions (minimum 3 segments)
-        - BAR charts: Show comparisons, categories, or discrete values
-        - LINE charts: Show trends over time periods (monthly/quarterly/yearly)
-        - AREA charts: Show cumulative trends or stacked categories over time
-        - RADIALBAR charts: Show performance metrics, scores, or efficiency ratios
-        - GAUGE charts: Show single KPI performance against targets (0-100 scale)
-        - Include detailed insights for each chart explaining key findings and actionable recommendations
-        - Color schemes should be meaningful and consistent with chart library capabilities
-        - Extract precise values from tables and calculations in the markdown
-        
-        Extract actual numerical values from tables and calculations. For trends, analyze year-over-year changes or compare against benchmarks. Ensure all financial amounts include currency symbols and are properly formatted.
         """
-        
-        # Call Cerebras LLM
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert financial data analyst. Extract structured data from CA reports for visual representation. Return only valid JSON without any additional text or formatting."
-                },
-                {
-                    "role": "user",
-                    "content": extraction_prompt
-                }
-            ],
-            model="llama-4-scout-17b-16e-instruct",
-            temperature=0.1,
-            max_tokens=8000
-        )
-        
-        # Extract the response content
-        response_content = chat_completion.choices[0].message.content.strip()
-        
-        # Clean the response to ensure it's valid JSON
-        # Remove any markdown formatting or extra text
-        json_match = re.search(r'\{.*\}', response_content, re.DOTALL)
-        if json_match:
-            json_content = json_match.group(0)
-        else:
-            json_content = response_content
-        
-        # Parse the JSON response
+
+def _valid_section(group: SectionGroup, key: str, value: Any) -> bool:
+    # Lists stay lists and objects stay objects, so the dashboard never gets a wrong shape
+    return key in group.schemas and isinstance(value, list) == group.schemas[key].startswith("[")
+
+async def _generate_group(group: SectionGroup, keys: List[str], report_type: str, markdown_content: str, figures: str,
+                          on_section: Optional[SectionCallback] = None):
+    """
+    (sections, ok) for one group. The completion is streamed and each section is handed
+    to on_section as soon as its JSON closes. Until every key has arrived the group is
+    retried up to PICTORIAL_SECTION_RETRIES times, asking only for the sections still
+    missing; after the last attempt the sections received so far come back with ok False.
+    """
+    sections: Dict[str, Any] = {}
+    for attempt in range(PICTORIAL_SECTION_RETRIES + 1):
+        missing = [key for key in keys if key not in sections]
+        parser = SectionStreamParser()
         try:
-            pictorial_data = json.loads(json_content)
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
-            print(f"Raw response: {response_content}")
-            # Fallback with basic structure
-            pictorial_data = {
-                "key_metrics": [],
-                "charts_data": [],
-                "highlights": [{"type": "info", "title": "Analysis Complete", "message": "Report generated successfully", "icon": "check"}],
-                "risk_alerts": [],
-                "compliance_status": [],
-                "timeline_events": [],
-                "recommendations": []
-            }
+            # Shared async client (pooled connections, transport retries)
+            deltas = cerebras_client.stream_chat_completion(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert financial analyst. Turn CA reports into dashboard data. Return only valid JSON without any additional text or formatting."
+                    },
+                    {
+                        "role": "user",
+                        "content": _section_prompt(group, missing, report_type, markdown_content, figures)
+                    }
+                ],
+                model=PICTORIAL_MODEL,
+                temperature=0.1,
+                max_tokens=group.max_tokens
+            )
+            async for delta in deltas:
+                for key, value in parser.feed(delta):
+                    if key in missing and key not in sections and _valid_section(group, key, value):
+                        sections[key] = value
+                        if on_section is not None:
+                            on_section(key, value)
+            missing = [key for key in keys if key not in sections]
+            if not missing:
+                return sections, True
+            error = f"{', '.join(missing)} " + ("cut off" if not parser.closed else "missing from the answer")
+        except Exception as e:
+            error = str(e)
+        print(f"Pictorial section group '{group.name}' failed (attempt {attempt + 1}/{PICTORIAL_SECTION_RETRIES + 1}): {error}")
+    return sections, False
+
+def _merge_charts(extracted: List[Dict[str, Any]], generated: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    titles = {chart.get("title", "").lower() for chart in extracted}
+    return extracted + [chart for chart in generated if isinstance(chart, dict) and chart.get("title", "").lower() not in titles]
+
+async def generate_pictorial_data(markdown_content: str, report_type: str, on_section: Optional[SectionCallback] = None):
+    """
+    Dashboard data for a report: (data, complete). Figures (key metrics, income and
+    expense breakdowns, charts, regime comparison) are parsed straight from the markdown.
+    The rest comes from one LLM call per section group, all made concurrently, so the
+    latency is that of the slowest group. complete is False when a group still failed
+    after its retries; the other groups are returned as usual. on_section(key, value)
+    is called for every section as soon as it is ready, a section may be sent again
+    with a fuller value (charts_data).
+    """
+    # Numbers that already sit in tables and "Label: ₹amount" lines need no LLM
+    sections = await asyncio.to_thread(build_pictorial_sections, markdown_content)
+    figures = figures_summary(sections)
+    pictorial_data = {**EMPTY_PICTORIAL_DATA, **sections}
+    
+    def publish(key: str, value: Any):
+        if key == "charts_data":
+            value = _merge_charts(sections["charts_data"], value)
+        elif key in sections:
+            return
+        pictorial_data[key] = value
+        if on_section is not None:
+            on_section(key, value)
+    
+    if on_section is not None:
+        for key, value in sections.items():
+            on_section(key, value)
+    
+    groups = []
+    for group in SECTION_GROUPS:
+        if group.name == "charts" and len(sections["charts_data"]) >= PICTORIAL_MIN_EXTRACTED_CHARTS:
+            continue
+        groups.append((group, group.keys_for(report_type)))
+    results = await asyncio.gather(*(
+        _generate_group(group, keys, report_type, markdown_content, figures, publish) for group, keys in groups
+    ))
+    
+    complete = all(ok for _, ok in results)
+    if not pictorial_data["highlights"]:
+        # The extracted figures are still shown
+        publish("highlights", [{"type": "info", "title": "Analysis Complete", "message": "Report generated successfully", "icon": "check"}])
+    
+    return pictorial_data, complete
+
+def schedule_pictorial_generation(markdown_content: str, task_name: str) -> bool:
+    """
+    Start building a saved CA report's dashboard in the background so its first view
+    is a cache hit; uses the report type the CA report page derives from the task
+    """
+    if not os.environ.get("CEREBRAS_API_KEY"):
+        return False
+    return pictorial_cache.schedule(markdown_content, report_type_for_task(task_name), generate_pictorial_data)
+
+@router.post("/extract-pictorial-data")
+async def extract_pictorial_data(request: MarkdownAnalysisRequest):
+    """
+    Dashboard data for a report, served from the pictorial cache when this markdown and
+    report type were seen before (X-Cache: HIT)
+    """
+    try:
+        if not os.environ.get("CEREBRAS_API_KEY"):
+            raise HTTPException(status_code=500, detail="CEREBRAS_API_KEY not found")
         
-        return pictorial_data
+        pictorial_data, cached = await pictorial_cache.get_or_generate(
+            request.markdown_content, request.report_type, generate_pictorial_data
+        )
+        return JSONResponse(content=pictorial_data, headers={"X-Cache": "HIT" if cached else "MISS"})
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in pictorial data extraction: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error extracting pictorial data: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error extracting pictorial data: {str(e)}")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/extract-pictorial-data/stream")
+async def extract_pictorial_data_stream(request: MarkdownAnalysisRequest):
+    """
+    The same dashboard data as Server-Sent Events: a "section" event ({key, value}) for
+    each section as soon as it is ready, then "done". The extracted figures arrive first
+    and each LLM section follows the moment its JSON closes. Cache hits send everything
+    at once.
+    """
+    if not os.environ.get("CEREBRAS_API_KEY"):
+        raise HTTPException(status_code=500, detail="CEREBRAS_API_KEY not found")
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    generate = functools.partial(generate_pictorial_data, on_section=lambda key, value: queue.put_nowait((key, value)))
+    task = asyncio.create_task(pictorial_cache.get_or_generate(request.markdown_content, request.report_type, generate))
+    # None marks the end; sections are always queued before the task completes
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    
+    async def events():
+        sent = {}
+        try:
+            while (item := await queue.get()) is not None:
+                key, value = item
+                sent[key] = value
+                yield _sse("section", {"key": key, "value": value})
+            pictorial_data, cached = task.result()
+            # Cache hits and joined generations, whose sections were not streamed to us
+            for key, value in pictorial_data.items():
+                if sent.get(key) != value:
+                    yield _sse("section", {"key": key, "value": value})
+            yield _sse("done", {"success": True, "cached": cached})
+        except Exception as e:
+            print(f"Error in pictorial data extraction: {str(e)}")
+            yield _sse("error", {"success": False, "error": f"Error extracting pictorial data: {str(e)}"})
+        finally:
+            # The shared generation is shielded and still finishes (and is cached) if the client leaves
+            task.cancel()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/pictorial-cache/metrics")
+async def pictorial_cache_metrics():
+    """Pictorial data cache hit rate and background generations"""
+    return await asyncio.to_thread(pictorial_cache.metrics)
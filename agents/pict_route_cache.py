@@ -0,0 +1,165 @@
+"""
+Disk cache for pictorial dashboard data
+Results of /api/extract-pictorial-data are stored as JSON files keyed by the markdown's
+SHA-256, the report type and the prompt version, so viewing the same report again never
+re-runs the LLM and a prompt change invalidates old entries. Concurrent requests for the
+same key share one generation, and a generation can be started eagerly in the background
+as soon as a report is saved, so the first dashboard view is already a hit.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PICTORIAL_CACHE_DIR = Path(os.getenv("PICTORIAL_CACHE_DIR", Path(__file__).parent / "pictorial_cache"))
+PICTORIAL_CACHE_MAX_ENTRIES = int(os.getenv("PICTORIAL_CACHE_MAX_ENTRIES", "1000"))
+
+# Returns (pictorial data, complete); incomplete results (LLM fallbacks) are not cached
+Generator = Callable[[str, str], Awaitable[Tuple[Dict[str, Any], bool]]]
+
+
+def report_type_for_task(task_name: str) -> str:
+    """The report type the CA report page sends for a crew task (see ca-report/page.tsx)"""
+    task = (task_name or "").lower()
+    if "salaried" in task:
+        return "salaried"
+    if "business" in task:
+        return "business"
+    return "self-employed"
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write data to path via a temporary file in the same directory and os.replace"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class PictorialCache:
+    """
+    JSON files under root named <markdown sha256>-<report type>-v<prompt version>.json
+    """
+    def __init__(self, prompt_version: str, root: Path = PICTORIAL_CACHE_DIR, max_entries: int = PICTORIAL_CACHE_MAX_ENTRIES):
+        self.prompt_version = prompt_version
+        self.root = Path(root)
+        self.max_entries = max_entries
+        # Key -> generation in progress, shared by every request waiting for it
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "joined": 0, "eager": 0, "stored": 0, "failed": 0, "write_failed": 0}
+
+    def key(self, markdown_content: str, report_type: str) -> str:
+        digest = hashlib.sha256(markdown_content.encode("utf-8")).hexdigest()
+        report_type = re.sub(r"[^a-z0-9_-]+", "_", (report_type or "").lower()) or "default"
+        return f"{digest}-{report_type}-v{self.prompt_version}"
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, data: Dict[str, Any]):
+        _atomic_write(self._path(key), json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        self.stats["stored"] += 1
+        self._prune()
+
+    def _store(self, key: str, data: Dict[str, Any]):
+        """_write that only logs OSError: an unwritable or full cache dir must not fail the request"""
+        try:
+            self._write(key, data)
+        except OSError as e:
+            self.stats["write_failed"] += 1
+            logger.warning(f"Could not cache pictorial data under {self.root}: {e}")
+
+    def _prune(self):
+        """Drop the least recently written entries beyond max_entries"""
+        files = list(self.root.glob("*/*.json"))
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:len(files) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    async def _generate(self, key: str, markdown_content: str, report_type: str, generate: Generator) -> Dict[str, Any]:
+        try:
+            data, complete = await generate(markdown_content, report_type)
+            if complete:
+                await asyncio.to_thread(self._store, key, data)
+            return data
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_or_generate(self, markdown_content: str, report_type: str, generate: Generator) -> Tuple[Dict[str, Any], bool]:
+        """(pictorial data, served from cache); joins a generation already in progress"""
+        key = self.key(markdown_content, report_type)
+        cached = await asyncio.to_thread(self._read, key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached, True
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["joined"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = self._inflight[key] = asyncio.create_task(self._generate(key, markdown_content, report_type, generate))
+        # Shielded so a client disconnecting does not cancel the shared generation
+        return await asyncio.shield(task), False
+
+    def schedule(self, markdown_content: str, report_type: str, generate: Generator) -> bool:
+        """
+        Start generating in the background unless cached or already running; returns
+        True when a generation was started. Must be called from the event loop.
+        """
+        key = self.key(markdown_content, report_type)
+        if key in self._inflight or self._path(key).exists():
+            return False
+        try:
+            task = asyncio.get_running_loop().create_task(self._generate(key, markdown_content, report_type, generate))
+        except RuntimeError:
+            logger.info("No running event loop; pictorial data will be generated on first view")
+            return False
+        self._inflight[key] = task
+        self.stats["eager"] += 1
+        task.add_done_callback(self._log_failure)
+        return True
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background pictorial generation failed: {task.exception()}")
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["joined"]
+        return {
+            **self.stats,
+            "in_progress": len(self._inflight),
+            "entries": sum(1 for _ in self.root.glob("*/*.json")) if self.root.exists() else 0,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "prompt_version": self.prompt_version,
+        }
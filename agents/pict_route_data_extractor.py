@@ -0,0 +1,458 @@
+"""
+Deterministic figure extraction for the pictorial dashboard
+Parses every markdown table, "Label: value" line and ₹ amount in a report into typed
+structures and builds the numeric dashboard sections from them (key_metrics,
+expense_breakdown, income_sources, charts_data, plus tax_regime_comparison and
+quarterly_performance when the report has those tables). The LLM is then only asked
+for the qualitative sections.
+
+Run `python pict_route_data_extractor.py report.md` to print the sections built for a
+report and how long extraction took.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+SEPARATOR_PATTERN = re.compile(r"^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$")
+KEY_VALUE_PATTERN = re.compile(r"^(?:[-*+]|\d+\.)?\s*(?:\*\*|__)?([^:|]{2,80}?)(?:\*\*|__)?\s*:\s*(?:\*\*|__)?\s*(.+?)\s*$")
+CURRENCY_PATTERN = re.compile(r"(₹|\brs\.?|\binr\b)\s*(\(?-?[\d,]+(?:\.\d+)?\)?)(?:\s*(lakhs?|lacs?|crores?|cr|l|k)\b)?", re.I)
+NUMBER_PATTERN = re.compile(r"^(?:₹|rs\.?|inr)?\s*(\(?-?[\d,]+(?:\.\d+)?\)?)\s*(lakhs?|lacs?|crores?|cr|l|k)?\s*(?:/-)?$", re.I)
+MARKUP_PATTERN = re.compile(r"[*_`]")
+PERCENT_PATTERN = re.compile(r"^(-?\d+(?:\.\d+)?)\s*%$")
+CURRENCY_HINT_PATTERN = re.compile(r"₹|\brs\b|\binr\b|amount|value|income|tax|salary|expense|cost|revenue|profit|total|regime", re.I)
+LARGE_UNITS = {"lakh", "lakhs", "lac", "lacs", "crore", "crores"}
+MULTIPLIERS = {"l": 1e5, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "cr": 1e7, "crore": 1e7, "crores": 1e7, "k": 1e3}
+
+INCOME_PATTERN = re.compile(r"income|salary|revenue|earning|receipt|sources?\b", re.I)
+EXPENSE_PATTERN = re.compile(r"expense|expenditure|cost|spend|outgo", re.I)
+TOTAL_PATTERN = re.compile(r"\b(total|net|gross|taxable|sum|grand)\b", re.I)
+QUARTER_PATTERN = re.compile(r"^q([1-4])\b", re.I)
+
+# (label pattern, title, color, icon); the first line or row matching a rule fills it
+METRIC_RULES = [
+    (re.compile(r"gross (total )?income|total (gross )?income", re.I), "Gross Total Income", "blue", "dollar"),
+    (re.compile(r"taxable income", re.I), "Taxable Income", "purple", "dollar"),
+    (re.compile(r"tax (liability|payable)|total tax\b|net tax", re.I), "Tax Liability", "red", "dollar"),
+    (re.compile(r"(total )?deductions?\b", re.I), "Total Deductions", "green", "dollar"),
+    # Bank or liquid "savings" are not tax savings; only tax or regime-difference labels count
+    (re.compile(r"tax sav(ed|ings?)|sav(ed|ings?) (under|with|by|from)\b.*regime|regime (difference|benefit)|difference between (the )?regimes", re.I),
+     "Tax Savings", "green", "dollar"),
+    (re.compile(r"refund", re.I), "Refund", "green", "dollar"),
+    (re.compile(r"revenue|turnover|gross sales", re.I), "Revenue", "blue", "building"),
+    (re.compile(r"net profit(?! margin)|profit after tax", re.I), "Net Profit", "green", "chart"),
+]
+PERCENT_METRIC_RULES = [
+    (re.compile(r"profit margin", re.I), "Net Profit Margin", "green", "percent"),
+    (re.compile(r"effective (tax )?rate", re.I), "Effective Tax Rate", "orange", "percent"),
+]
+MAX_KEY_METRICS = 8
+MAX_CHARTS = 6
+
+
+@dataclass
+class MarkdownTable:
+    heading: str
+    headers: List[str]
+    rows: List[List[str]]
+
+    def amount_column(self) -> Optional[int]:
+        """First column after the label whose cells are mostly amounts"""
+        for column in range(1, len(self.headers)):
+            assume = bool(CURRENCY_HINT_PATTERN.search(self.headers[column]))
+            cells = [row[column] for row in self.rows if column < len(row) and row[column].strip()]
+            parsed = [parse_amount(cell, assume_currency=assume) for cell in cells]
+            if cells and sum(value is not None for value in parsed) >= max(1, len(cells) * 0.6):
+                return column
+        return None
+
+    @cached_property
+    def items(self) -> List[Tuple[str, float]]:
+        """(label, amount) pairs from the label column and the first amount column"""
+        column = self.amount_column()
+        if column is None:
+            return []
+        assume = bool(CURRENCY_HINT_PATTERN.search(self.headers[column]))
+        pairs = []
+        for row in self.rows:
+            if column < len(row):
+                amount = parse_amount(row[column], assume_currency=assume)
+                if amount is not None and _clean(row[0]):
+                    pairs.append((_clean(row[0]), amount))
+        return pairs
+
+
+@dataclass
+class KeyValue:
+    heading: str
+    key: str
+    value: str
+    amount: Optional[float] = None
+    percent: Optional[float] = None
+
+
+@dataclass
+class ExtractedFigures:
+    tables: List[MarkdownTable] = field(default_factory=list)
+    key_values: List[KeyValue] = field(default_factory=list)
+    # Every ₹ amount in the document with the line it appeared on
+    amounts: List[Tuple[str, float]] = field(default_factory=list)
+
+    @cached_property
+    def itemised_groups(self) -> List[Tuple[str, str, List[Tuple[str, float]]]]:
+        """(heading, header text, items) for each table and each heading's amount lines"""
+        groups = [(t.heading, " ".join(t.headers), t.items) for t in self.tables]
+        by_heading: Dict[str, List[Tuple[str, float]]] = {}
+        for kv in self.key_values:
+            if kv.amount is not None:
+                by_heading.setdefault(kv.heading, []).append((kv.key, kv.amount))
+        groups.extend((heading, "", items) for heading, items in by_heading.items())
+        return [group for group in groups if group[2]]
+
+
+def _clean(text: str) -> str:
+    return MARKUP_PATTERN.sub("", text).strip()
+
+
+def parse_amount(text: str, assume_currency: bool = False) -> Optional[float]:
+    """
+    Rupee amount in text ("₹1,50,000", "Rs. 2.5 lakh", "1.2 Cr", "(5,000)"), or None;
+    bare numbers only count when assume_currency is set (e.g. an "Amount (₹)" column)
+    """
+    text = _clean(text)
+    match = NUMBER_PATTERN.match(text)
+    # "1.5 lakh" and "2 crore" are amounts even without a currency sign
+    if match and not assume_currency and (match.group(2) or "").lower() not in LARGE_UNITS:
+        match = None
+    if match is None:
+        match = CURRENCY_PATTERN.search(text)
+        if match is None:
+            return None
+        number, unit = match.group(2), match.group(3)
+    else:
+        number, unit = match.group(1), match.group(2)
+    negative = number.startswith("(") or number.startswith("-")
+    digits = number.strip("()-").replace(",", "")
+    if not digits or digits == ".":
+        return None
+    try:
+        value = float(digits)
+    except ValueError:
+        return None
+    value *= MULTIPLIERS.get((unit or "").lower(), 1)
+    return -value if negative else value
+
+
+def parse_percent(text: str) -> Optional[float]:
+    match = PERCENT_PATTERN.match(_clean(text))
+    return float(match.group(1)) if match else None
+
+
+def format_inr(amount: float) -> str:
+    """Indian digit grouping, e.g. 1500000 -> ₹15,00,000"""
+    sign = "-" if amount < 0 else ""
+    whole = str(int(round(abs(amount))))
+    if len(whole) > 3:
+        head, tail = whole[:-3], whole[-3:]
+        head = ",".join(re.findall(r"\d{1,2}", head[::-1]))[::-1]
+        whole = f"{head},{tail}"
+    return f"{sign}₹{whole}"
+
+
+def _split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def extract_figures(markdown_content: str) -> ExtractedFigures:
+    """Tables, key-value lines and ₹ amounts of a markdown report, each under its nearest heading"""
+    figures = ExtractedFigures()
+    heading = ""
+    lines = markdown_content.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        heading_match = HEADING_PATTERN.match(line)
+        if heading_match:
+            heading = _clean(heading_match.group(2))
+            i += 1
+            continue
+        if line.startswith("|") and i + 1 < len(lines) and SEPARATOR_PATTERN.match(lines[i + 1].strip()):
+            headers = [_clean(cell) for cell in _split_row(line)]
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(_split_row(lines[i]))
+                i += 1
+            figures.tables.append(MarkdownTable(heading, headers, rows))
+            for row in rows:
+                for cell in row:
+                    amount = parse_amount(cell)
+                    if amount is not None:
+                        figures.amounts.append((" | ".join(row), amount))
+            continue
+        if line:
+            for match in CURRENCY_PATTERN.finditer(line):
+                amount = parse_amount(match.group(0))
+                if amount is not None:
+                    figures.amounts.append((line, amount))
+            kv_match = KEY_VALUE_PATTERN.match(line)
+            if kv_match and not line.startswith("|"):
+                key, value = _clean(kv_match.group(1)), _clean(kv_match.group(2))
+                if key and value:
+                    figures.key_values.append(KeyValue(heading, key, value, parse_amount(value), parse_percent(value.split()[0])))
+        i += 1
+    return figures
+
+
+def build_key_metrics(figures: ExtractedFigures) -> List[Dict[str, Any]]:
+    candidates = [(kv.key, kv.amount, kv.percent, kv.heading) for kv in figures.key_values]
+    for table in figures.tables:
+        candidates.extend((label, amount, None, table.heading) for label, amount in table.items)
+
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for label, amount, percent, heading in candidates:
+        rules = METRIC_RULES if amount is not None else PERCENT_METRIC_RULES if percent is not None else []
+        for pattern, title, color, icon in rules:
+            if title in metrics or not pattern.search(label):
+                continue
+            metrics[title] = {
+                "title": title,
+                "value": format_inr(amount) if amount is not None else f"{percent:g}",
+                "unit": "" if amount is not None else "%",
+                "trend": "stable",
+                "color": color,
+                "icon": icon,
+                "description": f"{label} ({heading})" if heading else label,
+            }
+            break
+    return list(metrics.values())[:MAX_KEY_METRICS]
+
+
+def _breakdown(figures: ExtractedFigures, pattern: re.Pattern) -> Tuple[str, List[Tuple[str, float]]]:
+    """
+    Items of the table or list whose heading (preferred) or headers match pattern, with
+    totals excluded; quarterly tables are periods, not categories, and are skipped
+    """
+    best: Tuple[Tuple[bool, int], str, List[Tuple[str, float]]] = ((False, 0), "", [])
+    for heading, header_text, items in figures.itemised_groups:
+        heading_match = bool(pattern.search(heading))
+        if not heading_match and not pattern.search(header_text):
+            continue
+        if all(QUARTER_PATTERN.match(label) for label, _ in items):
+            continue
+        items = [(label, amount) for label, amount in items if amount > 0 and not TOTAL_PATTERN.search(label)]
+        rank = (heading_match, len(items))
+        if len(items) >= 2 and rank > best[0]:
+            best = (rank, heading, items)
+    return best[1], best[2]
+
+
+def _with_percentages(items: List[Tuple[str, float]]) -> List[Tuple[str, float, float]]:
+    total = sum(amount for _, amount in items) or 1
+    return [(label, amount, round(amount / total * 100, 1)) for label, amount in items]
+
+
+def _tax_treatments(figures: ExtractedFigures) -> Dict[str, str]:
+    """Row label -> cell of any "Tax Treatment"/"Taxability" column"""
+    treatments = {}
+    for table in figures.tables:
+        column = next((i for i, h in enumerate(table.headers) if re.search(r"treatment|taxab", h, re.I)), None)
+        if column is None:
+            continue
+        for row in table.rows:
+            if column < len(row) and _clean(row[column]):
+                treatments[_clean(row[0])] = _clean(row[column])
+    return treatments
+
+
+def build_income_sources(figures: ExtractedFigures) -> List[Dict[str, Any]]:
+    _, items = _breakdown(figures, INCOME_PATTERN)
+    treatments = _tax_treatments(figures) if items else {}
+    return [
+        {"source": label, "amount": format_inr(amount), "percentage": share, "tax_treatment": treatments.get(label, "As per report")}
+        for label, amount, share in _with_percentages(items)
+    ]
+
+
+def build_expense_breakdown(figures: ExtractedFigures) -> List[Dict[str, Any]]:
+    _, items = _breakdown(figures, EXPENSE_PATTERN)
+    return [
+        {"category": label, "amount": format_inr(amount), "percentage": share, "trend": "stable"}
+        for label, amount, share in _with_percentages(items)
+    ]
+
+
+def _regime_table(figures: ExtractedFigures) -> Optional[Tuple[MarkdownTable, int, int]]:
+    for table in figures.tables:
+        lowered = [h.lower() for h in table.headers]
+        old = next((i for i, h in enumerate(lowered) if "old" in h), None)
+        new = next((i for i, h in enumerate(lowered) if "new" in h), None)
+        if old is not None and new is not None:
+            return table, old, new
+    return None
+
+
+def build_tax_regime_comparison(figures: ExtractedFigures) -> Optional[Dict[str, Any]]:
+    """Old vs new regime from a table with Old and New columns, when the report has one"""
+    found = _regime_table(figures)
+    if found is None:
+        return None
+    table, old, new = found
+    sides = {"old_regime": {}, "new_regime": {}}
+    for row in table.rows:
+        label = _clean(row[0]).lower() if row else ""
+        for side, column in (("old_regime", old), ("new_regime", new)):
+            cell = row[column] if column < len(row) else ""
+            if "taxable income" in label:
+                sides[side]["taxable_income"] = cell
+            elif re.search(r"tax (liability|payable)|total tax|net tax", label):
+                sides[side]["tax_liability"] = cell
+                sides[side]["final_amount"] = cell
+            elif "rate" in label:
+                sides[side]["effective_rate"] = cell
+            elif "deduction" in label and cell.strip() not in ("", "-", "0", "NA", "N/A"):
+                sides[side].setdefault("deductions_used", []).append(_clean(row[0]))
+    old_tax = parse_amount(sides["old_regime"].get("tax_liability", ""), assume_currency=True)
+    new_tax = parse_amount(sides["new_regime"].get("tax_liability", ""), assume_currency=True)
+    if old_tax is None or new_tax is None:
+        return None
+    for side in sides.values():
+        side.setdefault("taxable_income", "")
+        side.setdefault("effective_rate", "")
+        side.setdefault("deductions_used", [])
+        side["tax_liability"] = format_inr(parse_amount(side["tax_liability"], assume_currency=True))
+        side["final_amount"] = side["tax_liability"]
+    savings = abs(old_tax - new_tax)
+    higher = max(old_tax, new_tax) or 1
+    return {
+        **sides,
+        "recommendation": "old" if old_tax < new_tax else "new",
+        "savings_amount": format_inr(savings),
+        "savings_percentage": f"{savings / higher * 100:.1f}%",
+    }
+
+
+def build_quarterly_performance(figures: ExtractedFigures) -> List[Dict[str, Any]]:
+    """Rows of a table whose first column is Q1..Q4"""
+    fields = {"revenue": r"revenue|sales|turnover", "expenses": r"expense|cost", "profit": r"profit",
+              "gst_liability": r"gst", "working_capital": r"working capital"}
+    for table in figures.tables:
+        if not table.rows or not all(QUARTER_PATTERN.match(_clean(row[0])) for row in table.rows if row):
+            continue
+        columns = {name: next((i for i, h in enumerate(table.headers) if re.search(p, h, re.I)), None) for name, p in fields.items()}
+        quarters = []
+        for row in table.rows:
+            entry = {"quarter": f"Q{QUARTER_PATTERN.match(_clean(row[0])).group(1)}"}
+            for name, column in columns.items():
+                value = parse_amount(row[column], assume_currency=True) if column is not None and column < len(row) else None
+                entry[name] = value or 0
+            quarters.append(entry)
+        return quarters
+    return []
+
+
+def build_charts_data(figures: ExtractedFigures, income_sources: List[Dict[str, Any]],
+                      expense_breakdown: List[Dict[str, Any]], regime: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    charts = []
+
+    def share_chart(chart_type: str, title: str, color: str, labels: List[str], values: List[float], shares: List[float]):
+        top = max(range(len(values)), key=lambda i: values[i])
+        charts.append({
+            "type": chart_type,
+            "title": title,
+            "data": {"labels": labels, "values": values},
+            "color_scheme": color,
+            "description": f"{title} from the report's figures",
+            "insights": [f"{labels[top]} is the largest share at {shares[top]:g}%"],
+        })
+
+    if len(income_sources) >= 2:
+        share_chart("doughnut", "Income Sources", "blue", [i["source"] for i in income_sources],
+                    [parse_amount(i["amount"]) for i in income_sources], [i["percentage"] for i in income_sources])
+    if len(expense_breakdown) >= 2:
+        share_chart("pie", "Expense Breakdown", "orange", [e["category"] for e in expense_breakdown],
+                    [parse_amount(e["amount"]) for e in expense_breakdown], [e["percentage"] for e in expense_breakdown])
+    if regime:
+        old_tax = parse_amount(regime["old_regime"]["tax_liability"])
+        new_tax = parse_amount(regime["new_regime"]["tax_liability"])
+        charts.append({
+            "type": "bar",
+            "title": "Tax Liability: Old vs New Regime",
+            "data": {"labels": ["Old Regime", "New Regime"], "values": [old_tax, new_tax]},
+            "color_scheme": "purple",
+            "description": "Tax payable under each regime",
+            "insights": [f"The {regime['recommendation']} regime saves {regime['savings_amount']} ({regime['savings_percentage']})"],
+        })
+
+    # Remaining tables with several amounts become bar charts; ones already charted above are skipped
+    covered = {i["source"] for i in income_sources} | {e["category"] for e in expense_breakdown}
+    regime_table = _regime_table(figures) if regime else None
+    used = set()
+    for heading, header_text, items in figures.itemised_groups:
+        if len(charts) >= MAX_CHARTS:
+            break
+        if (regime_table and heading == regime_table[0].heading) or sum(label in covered for label, _ in items) * 2 >= len(items):
+            continue
+        # "2. TAX COMPUTATION" -> "Tax Computation"
+        title = re.sub(r"^\d+(\.\d+)*\.?\s*", "", heading) or header_text
+        if len(items) < 3 or not title or title in used:
+            continue
+        used.add(title)
+        top = max(items, key=lambda item: item[1])
+        charts.append({
+            "type": "bar",
+            "title": title.title() if title.isupper() else title,
+            "data": {"labels": [label for label, _ in items], "values": [amount for _, amount in items]},
+            "color_scheme": "green",
+            "description": f"Amounts listed under {heading or 'the report'}",
+            "insights": [f"{top[0]} is the largest at {format_inr(top[1])}"],
+        })
+    return charts[:MAX_CHARTS]
+
+
+def build_pictorial_sections(markdown_content: str) -> Dict[str, Any]:
+    """The dashboard sections that can be read straight from the report's figures"""
+    figures = extract_figures(markdown_content)
+    income_sources = build_income_sources(figures)
+    expense_breakdown = build_expense_breakdown(figures)
+    regime = build_tax_regime_comparison(figures)
+    sections: Dict[str, Any] = {
+        "key_metrics": build_key_metrics(figures),
+        "income_sources": income_sources,
+        "expense_breakdown": expense_breakdown,
+        "charts_data": build_charts_data(figures, income_sources, expense_breakdown, regime),
+    }
+    if regime:
+        sections["tax_regime_comparison"] = regime
+    quarterly = build_quarterly_performance(figures)
+    if quarterly:
+        sections["quarterly_performance"] = quarterly
+    return sections
+
+
+def figures_summary(sections: Dict[str, Any]) -> str:
+    """Compact text of the extracted figures, for prompts that need them as context"""
+    lines = [f"{m['title']}: {m['value']}{m['unit']}" for m in sections.get("key_metrics", [])]
+    lines += [f"Income - {i['source']}: {i['amount']} ({i['percentage']}%)" for i in sections.get("income_sources", [])]
+    lines += [f"Expense - {e['category']}: {e['amount']} ({e['percentage']}%)" for e in sections.get("expense_breakdown", [])]
+    regime = sections.get("tax_regime_comparison")
+    if regime:
+        lines.append(f"Tax: old regime {regime['old_regime']['tax_liability']}, new regime {regime['new_regime']['tax_liability']}, "
+                     f"{regime['recommendation']} regime saves {regime['savings_amount']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import time
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        content = f.read()
+    start = time.perf_counter()
+    result = build_pictorial_sections(content)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"{len(content) / 1024:.1f} KB extracted in {elapsed:.2f} ms", file=sys.stderr)
@@ -0,0 +1,116 @@
+"""
+Incremental parser for streamed pictorial JSON
+The LLM answers with one JSON object whose top-level members are dashboard sections
+({"risk_alerts": [...], "compliance_status": [...], ...}). The parser is fed the
+completion as it streams and returns each member as soon as its value closes, so a
+section can be sent to the dashboard while the next one is still being generated.
+Text around the object (```json fences, preambles) is ignored, and a malformed member
+only loses that member.
+
+Run `python pict_route_stream.py` to time the parser on a large answer fed in small chunks.
+"""
+
+import json
+from typing import Any, List, Tuple
+
+OPENERS = "{["
+CLOSERS = "}]"
+
+
+class SectionStreamParser:
+    """
+    Feed text chunks with feed(); each call returns the (key, value) members of the
+    outermost object that were completed by that chunk
+    """
+    def __init__(self):
+        self.started = False
+        self.closed = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        # Text of the top-level member being read, between its "," (or "{") and the next
+        self._member: List[str] = []
+        self.errors = 0
+
+    def _finish_member(self, sections: List[Tuple[str, Any]]):
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return
+        try:
+            member = json.loads("{" + text + "}")
+        except ValueError:
+            self.errors += 1
+            return
+        sections.extend(member.items())
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        sections: List[Tuple[str, Any]] = []
+        if self.closed:
+            return sections
+        start = 0
+        for i, char in enumerate(chunk):
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                    start = i + 1
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+            if char == '"':
+                self.in_string = True
+            elif char in OPENERS:
+                self.depth += 1
+            elif char in CLOSERS:
+                self.depth -= 1
+                if self.depth == 0:
+                    self._member.append(chunk[start:i])
+                    self._finish_member(sections)
+                    self.closed = True
+                    return sections
+            elif char == "," and self.depth == 1:
+                self._member.append(chunk[start:i])
+                self._finish_member(sections)
+                start = i + 1
+        if self.started:
+            self._member.append(chunk[start:])
+        return sections
+
+
+def parse_sections(text: str) -> Tuple[List[Tuple[str, Any]], bool]:
+    """All members of a complete answer, and whether its object was closed"""
+    parser = SectionStreamParser()
+    sections = parser.feed(text)
+    return sections, parser.closed
+
+
+def _benchmark(sections: int = 15, chunk_size: int = 8):
+    import time
+
+    answer = json.dumps({
+        f"section_{n}": [
+            {"title": f"Item {i} with \"quotes\", commas and {{braces}}", "value": i * 1000, "tags": ["a", "b"]}
+            for i in range(20)
+        ]
+        for n in range(sections)
+    })
+    text = f"```json\n{answer}\n```"
+    parser = SectionStreamParser()
+    found = []
+    start = time.perf_counter()
+    for i in range(0, len(text), chunk_size):
+        found.extend(parser.feed(text[i:i + chunk_size]))
+    elapsed = (time.perf_counter() - start) * 1000
+    assert parser.closed and dict(found) == json.loads(answer)
+    print(f"{len(text) / 1024:.1f} KB answer in {chunk_size}-char chunks: {len(found)} sections in {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from assest_agent.utils.capacity_calculator import (
+    build_capacity_report,
+    calculate_capacity,
+    emi,
+    extract_financial_profile,
+    loan_for_emi,
+)
+
+REPORT = """
+## Financial Profile
+- Monthly income: ₹1,20,000
+- Monthly expenses: ₹50,000
+- Existing EMI: ₹10,000 per month
+- Tax savings: ₹46,800 under the new regime
+
+| Item | Amount |
+|------|--------|
+| Savings | ₹10,00,000 |
+| Outstanding loans | ₹5,00,000 |
+"""
+
+
+def test_extracts_the_profile():
+    profile = extract_financial_profile(REPORT)
+    assert profile == {
+        "monthly_income": 120000.0,
+        "monthly_expenses": 50000.0,
+        "existing_emi": 10000.0,
+        "liquid_savings": 1000000.0,
+        "outstanding_loans": 500000.0,
+    }
+
+
+def test_tax_savings_are_not_liquid_savings():
+    assert extract_financial_profile("Tax savings: ₹46,800\nThe plan has potential savings of ₹20,000")["liquid_savings"] is None
+    assert extract_financial_profile("Tax savings: ₹46,800\n- **Savings:** ₹3,00,000")["liquid_savings"] == 300000.0
+
+
+def test_annual_figures_are_converted_to_monthly():
+    profile = extract_financial_profile("Annual income: ₹18,00,000\nMonthly expenses: ₹6,00,000 per annum")
+    assert profile["monthly_income"] == pytest.approx(150000)
+    assert profile["monthly_expenses"] == pytest.approx(50000)
+
+
+def test_emi_matches_the_standard_formula():
+    # ₹10 lakh at 8.5% for 20 years
+    r, n = 0.085 / 12, 240
+    expected = 1_000_000 * r * (1 + r) ** n / ((1 + r) ** n - 1)
+    assert emi(1_000_000, 8.5, 20) == pytest.approx(expected)
+    assert emi(1_000_000, 8.5, 20) == pytest.approx(8678.23, abs=0.01)
+
+
+def test_loan_for_emi_inverts_emi_over_a_grid():
+    rates, tenures = np.meshgrid([8.0, 9.0, 10.0], [10, 20, 30])
+    payments = emi(2_500_000, rates, tenures)
+    np.testing.assert_allclose(loan_for_emi(payments, rates, tenures), 2_500_000)
+    # Longer tenures and lower rates service a larger loan for the same EMI
+    grid = loan_for_emi(30000, rates, tenures)
+    assert (np.diff(grid, axis=0) > 0).all() and (np.diff(grid, axis=1) < 0).all()
+
+
+def test_capacity_figures():
+    figures = calculate_capacity(extract_financial_profile(REPORT))
+    assert figures["monthly_surplus"] == 60000
+    assert figures["emergency_fund"] == 6 * 60000
+    assert figures["immediate_capacity"] == 1000000 - 360000
+    assert figures["affordable_emi"] == pytest.approx(24000)
+    assert figures["loan_eligibility_emi"] == pytest.approx(loan_for_emi(24000, 8.5, 20).item())
+    assert figures["loan_eligibility_income_multiple"][5] == 120000 * 12 * 5 - 500000
+
+
+def test_capacity_needs_income_and_expenses():
+    assert calculate_capacity({"monthly_income": 125000, "monthly_expenses": None}) is None
+    assert calculate_capacity({"monthly_income": None, "monthly_expenses": 50000}) is None
+    # Gross income only, as in ca-frontend/sample-report.md: the LLM task has to run
+    assert build_capacity_report("- Total Gross Income: ₹1,500,000\n| Gross Income | 1,500,000 |") is None
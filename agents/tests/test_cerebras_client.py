@@ -0,0 +1,158 @@
+import asyncio
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+pytest.importorskip("cerebras.cloud.sdk")
+
+import common.cerebras_client as cerebras_module
+from common.cerebras_client import SharedCerebrasClient
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+def _delta(text: str) -> bytes:
+    chunk = {
+        "id": "stand-in", "object": "chat.completion.chunk", "created": 0, "model": "stand-in",
+        "system_fingerprint": "stand-in",
+        "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n".encode()
+
+
+COMPLETION = json.dumps({
+    "id": "stand-in", "object": "chat.completion", "created": 0, "model": "stand-in", "system_fingerprint": "stand-in",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "{}"}}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}).encode()
+
+
+class StandIn:
+    """
+    Local /v1/chat/completions that answers each request with the next scripted action
+    ("fail", "drop_before_delta", "drop_after_delta"), then "ok"; counts TCP connections
+    """
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.requests = 0
+        self.connections = set()
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with stand_in.lock:
+                    stand_in.requests += 1
+                    stand_in.connections.add(self.client_address)
+                    action = stand_in.script.pop(0) if stand_in.script else "ok"
+                if action == "fail":
+                    self._send(503, "application/json", b'{"error": {"message": "overloaded"}}')
+                elif action.startswith("drop"):
+                    body = _delta("Hel") if action == "drop_after_delta" else b""
+                    # Promise more body than is sent, then hang up
+                    self._send(200, "text/event-stream", body, length=len(body) + 100)
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                elif payload.get("stream"):
+                    self._send(200, "text/event-stream", _delta("Hel") + _delta("lo") + b"data: [DONE]\n\n")
+                else:
+                    self._send(200, "application/json", COMPLETION)
+
+            def _send(self, status, content_type, body, length=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body) if length is None else length))
+                self.end_headers()
+                self.wfile.write(body)
+                self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    monkeypatch.setenv("CEREBRAS_API_KEY", "stand-in")
+    monkeypatch.setattr(cerebras_module, "CEREBRAS_BACKOFF_BASE_SECONDS", 0.01)
+    servers = []
+
+    def start(script=()):
+        server = StandIn(script)
+        threading.Thread(target=server.server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.server.shutdown()
+        server.server.server_close()
+
+
+async def _stream(client: SharedCerebrasClient):
+    received = []
+    try:
+        async for delta in client.stream_chat_completion(messages=MESSAGES, model="stand-in"):
+            received.append(delta)
+    finally:
+        await client.aclose()
+    return "".join(received)
+
+
+def test_stream_retries_before_first_delta(stand_in):
+    server = stand_in(["fail", "drop_before_delta"])
+    client = SharedCerebrasClient(base_url=server.url)
+
+    assert asyncio.run(_stream(client)) == "Hello"
+    assert server.requests == 3
+    assert client.stats == {"requests": 1, "retries": 2, "failures": 0}
+
+
+def test_stream_does_not_retry_after_first_delta(stand_in):
+    server = stand_in(["drop_after_delta"])
+    client = SharedCerebrasClient(base_url=server.url)
+    received = []
+
+    async def run():
+        try:
+            async for delta in client.stream_chat_completion(messages=MESSAGES, model="stand-in"):
+                received.append(delta)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(httpx.TransportError):
+        asyncio.run(run())
+    assert received == ["Hel"]
+    assert server.requests == 1
+    assert client.stats == {"requests": 1, "retries": 0, "failures": 1}
+
+
+def test_shared_client_reuses_connections(stand_in):
+    server = stand_in(["fail", "fail"])
+    client = SharedCerebrasClient(base_url=server.url)
+    completions = 20
+
+    async def run():
+        shared = client.get()
+        for _ in range(completions // 2):
+            await client.create_chat_completion(messages=MESSAGES, model="stand-in")
+        await asyncio.gather(*(
+            client.create_chat_completion(messages=MESSAGES, model="stand-in") for _ in range(completions // 2)
+        ))
+        assert client.get() is shared
+        await client.aclose()
+
+    asyncio.run(run())
+    assert client.stats == {"requests": completions, "retries": 2, "failures": 0}
+    assert server.requests == completions + 2
+    # One keep-alive connection for the sequential calls, at most one more per concurrent call
+    assert len(server.connections) <= completions // 2 + 1
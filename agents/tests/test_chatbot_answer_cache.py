@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+pytest.importorskip("jinja2")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import chatbot.router as chatbot_router
+from chatbot.utils.answer_cache import AnswerCache
+from chatbot.utils.sessions import SessionStore
+
+MARKDOWN = "# Tax summary\n\nGross income is 12,00,000 and tax payable is 1,10,000."
+
+
+class StubModel:
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(0)
+        return SimpleNamespace(text=f"answer {len(prompt)}")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(chatbot_router, "model", StubModel())
+    monkeypatch.setattr(chatbot_router, "answer_cache", AnswerCache())
+    monkeypatch.setattr(chatbot_router, "session_store", SessionStore())
+    app = FastAPI()
+    app.include_router(chatbot_router.router)
+    return TestClient(app)
+
+
+def _ask(client, question, session_id=None):
+    data = {"user_question": question, "markdown_input": MARKDOWN}
+    if session_id:
+        data["session_id"] = session_id
+    return client.post("/chatbot/chat", data=data).json()
+
+
+def test_answers_with_history_are_not_cached(client):
+    first = _ask(client, "Assume I invest 1.5 lakh under 80C")
+    assert chatbot_router.answer_cache.stats["stored"] == 1
+
+    # Standalone question, but answered with the earlier turn in the prompt
+    _ask(client, "What is my tax liability?", first["session_id"])
+    assert chatbot_router.answer_cache.stats["stored"] == 1
+
+    fresh = _ask(client, "What is my tax liability?")
+    assert fresh["cached"] is False
+    assert chatbot_router.answer_cache.stats["stored"] == 2
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+pytest.importorskip("jinja2")
+httpx = pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+
+import chatbot.router as chatbot_router
+from chatbot.utils.answer_cache import AnswerCache
+from chatbot.utils.concurrency import ConcurrencyLimiter
+
+CHATS = 50
+MODEL_SECONDS = 0.2
+MARKDOWN = "# Tax summary\n\nGross income is 12,00,000 and tax payable is 1,10,000."
+
+
+class StubModel:
+    """Async stand-in for the Gemini model that takes MODEL_SECONDS per answer"""
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(MODEL_SECONDS)
+        return SimpleNamespace(text="stub answer")
+
+
+@pytest.fixture
+def app(monkeypatch):
+    stub = StubModel()
+    monkeypatch.setattr(chatbot_router, "model", stub)
+    monkeypatch.setattr(chatbot_router, "gemini_limiter", ConcurrencyLimiter(max_concurrent=8, max_queued=32, queue_timeout=30))
+    monkeypatch.setattr(chatbot_router, "answer_cache", AnswerCache())
+    app = FastAPI()
+    app.include_router(chatbot_router.router)
+    app.state.stub = stub
+    return app
+
+
+async def _chat_while_polling_health(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        latencies = []
+        done = asyncio.Event()
+
+        async def poll_health():
+            while not done.is_set():
+                started = time.perf_counter()
+                assert (await client.get("/chatbot/health")).status_code == 200
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        poller = asyncio.create_task(poll_health())
+        responses = await asyncio.gather(*(
+            client.post("/chatbot/chat", data={"user_question": f"What is item {i} worth?", "markdown_input": MARKDOWN})
+            for i in range(CHATS)
+        ))
+        done.set()
+        await poller
+    return [r.status_code for r in responses], latencies
+
+
+def test_chat_does_not_block_other_endpoints(app):
+    statuses, latencies = asyncio.run(_chat_while_polling_health(app))
+    limiter = chatbot_router.gemini_limiter
+    admitted = limiter.max_concurrent + limiter.max_queued
+
+    assert statuses.count(200) == admitted
+    assert statuses.count(429) == CHATS - admitted
+    assert app.state.stub.calls == admitted
+    # Answering 40 chats takes five model rounds; health kept answering throughout
+    assert len(latencies) >= 10
+    assert max(latencies) < 0.1, "event loop was blocked while chats were in flight"
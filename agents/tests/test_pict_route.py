@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("cerebras.cloud.sdk")
+
+import pict_route
+from pict_route import SectionGroup, _generate_group
+
+GROUP = SectionGroup(
+    name="risks",
+    task="List the risks and compliance items.",
+    schemas={"risk_alerts": '[{"title": "string"}]', "compliance_status": '[{"item": "string"}]'},
+    max_tokens=100,
+)
+KEYS = list(GROUP.schemas)
+RISKS = [{"title": "Advance tax shortfall"}]
+COMPLIANCE = [{"item": "ITR filed"}]
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    """Scripted answers for the streamed completions; records each prompt"""
+    answers, prompts = [], []
+
+    async def stream_chat_completion(**kwargs):
+        prompts.append(kwargs["messages"][-1]["content"])
+        answer = answers.pop(0)
+        for i in range(0, len(answer), 7):
+            yield answer[i:i + 7]
+
+    monkeypatch.setattr(pict_route.cerebras_client, "stream_chat_completion", stream_chat_completion)
+    monkeypatch.setattr(pict_route, "PICTORIAL_SECTION_RETRIES", 1)
+    return answers, prompts
+
+
+def _generate():
+    published = []
+    sections, ok = asyncio.run(_generate_group(
+        GROUP, KEYS, "individual", "# Report", "", lambda key, value: published.append(key)
+    ))
+    return sections, ok, published
+
+
+def test_closed_answer_missing_a_section_is_retried(completions):
+    answers, prompts = completions
+    answers.extend([json.dumps({"risk_alerts": RISKS}), json.dumps({"compliance_status": COMPLIANCE})])
+
+    sections, ok, published = _generate()
+
+    assert ok
+    assert sections == {"risk_alerts": RISKS, "compliance_status": COMPLIANCE}
+    assert published == ["risk_alerts", "compliance_status"]
+    # The retry asks only for the missing section
+    assert '"risk_alerts"' in prompts[0] and '"risk_alerts"' not in prompts[1]
+    assert '"compliance_status"' in prompts[1]
+
+
+def test_partial_result_is_returned_after_the_last_attempt(completions):
+    answers, prompts = completions
+    answers.extend([json.dumps({"risk_alerts": RISKS}), json.dumps({"risk_alerts": []})])
+
+    sections, ok, published = _generate()
+
+    assert not ok
+    assert sections == {"risk_alerts": RISKS}
+    assert published == ["risk_alerts"]
+    assert len(prompts) == 2
+
+
+def test_truncated_answer_is_retried(completions):
+    answers, _ = completions
+    complete = json.dumps({"risk_alerts": RISKS, "compliance_status": COMPLIANCE})
+    answers.extend([complete[:-20], complete])
+
+    sections, ok, _ = _generate()
+
+    assert ok
+    assert sections == {"risk_alerts": RISKS, "compliance_status": COMPLIANCE}
@@ -0,0 +1,32 @@
+import asyncio
+
+from pict_route_cache import PictorialCache
+
+DATA = {"key_metrics": [{"title": "Tax Liability", "value": "₹1,10,000"}]}
+
+
+def _generator(calls):
+    async def generate(markdown_content, report_type):
+        calls.append((markdown_content, report_type))
+        return DATA, True
+    return generate
+
+
+def test_generated_data_is_cached(tmp_path):
+    cache, calls = PictorialCache("1", root=tmp_path), []
+
+    assert asyncio.run(cache.get_or_generate("# Report", "salaried", _generator(calls))) == (DATA, False)
+    assert asyncio.run(cache.get_or_generate("# Report", "salaried", _generator(calls))) == (DATA, True)
+    assert len(calls) == 1
+    assert cache.stats["stored"] == 1
+
+
+def test_unwritable_cache_dir_still_returns_the_data(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache, calls = PictorialCache("1", root=blocker / "cache"), []
+
+    assert asyncio.run(cache.get_or_generate("# Report", "salaried", _generator(calls))) == (DATA, False)
+    assert cache.stats["write_failed"] == 1
+    assert cache.stats["failed"] == 0
+    assert not cache._inflight
@@ -0,0 +1,28 @@
+import pytest
+
+from pict_route_data_extractor import build_key_metrics, extract_figures
+
+
+def _titles(markdown: str):
+    return {metric["title"]: metric["description"] for metric in build_key_metrics(extract_figures(markdown))}
+
+
+@pytest.mark.parametrize("label", [
+    "Tax Savings", "Tax saved", "Savings under the New Regime", "Savings by opting for the old regime",
+    "Regime difference", "Difference between the regimes",
+])
+def test_tax_savings_labels(label):
+    assert _titles(f"## Summary\n\n- {label}: ₹25,000\n")["Tax Savings"].startswith(label)
+
+
+@pytest.mark.parametrize("label", ["Savings account balance", "Liquid savings", "Bank savings", "Monthly savings"])
+def test_bank_savings_are_not_tax_savings(label):
+    assert "Tax Savings" not in _titles(f"## Assets\n\n- {label}: ₹2,50,000\n")
+
+
+def test_savings_table_row_is_not_tax_savings():
+    markdown = (
+        "## Assets\n\n| Item | Amount (₹) |\n|------|-----------|\n"
+        "| Savings account | 2,50,000 |\n| Tax saved via 80C | 46,800 |\n"
+    )
+    assert _titles(markdown)["Tax Savings"].startswith("Tax saved via 80C")
@@ -0,0 +1,26 @@
+import pytest
+
+from equity_agent.utils.plan_cache import RISK_BUCKETS, bucket_for, normalize_profile
+
+
+def test_normalize_profile():
+    profile = {"sector": "Information Technology", "goal": "Long-term wealth creation", "style": "invest",
+               "duration": "3-5 years", "risk_level": "Aggressive"}
+    assert normalize_profile(profile) == ("information_technology", "wealth", "invest", "long", "high")
+
+
+@pytest.mark.parametrize("duration, bucket", [
+    ("Less than 1 year", "short"),
+    ("1-3 years", "medium"),
+    ("3-5 years", "long"),
+    ("5-10 years", "very_long"),
+    ("10+ years", "decade_plus"),
+])
+def test_duration_buckets(duration, bucket):
+    assert normalize_profile({"goal": "", "style": "", "duration": duration, "risk_level": ""})[3] == bucket
+
+
+def test_bucket_for_falls_back_to_the_slug():
+    assert bucket_for("Conservative", RISK_BUCKETS) == "low"
+    assert bucket_for("Very Bold!", RISK_BUCKETS) == "very_bold"
+    assert bucket_for(None, RISK_BUCKETS) == "unspecified"
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from equity_agent.utils.portfolio_analytics import (
+    ASSET_CLASSES,
+    LOWER_BOUNDS,
+    UPPER_BOUNDS,
+    _project_to_bounded_simplex,
+    _bucket_weights,
+    _project_to_simplex,
+    allocation_for_risk_level,
+    cagr,
+    max_drawdown,
+    parse_duration_years,
+    portfolio_statistics,
+    sharpe_ratio,
+    sip_future_value,
+)
+
+
+def test_cagr_known_values():
+    assert cagr(100, 200, 1) == pytest.approx(1.0)
+    assert cagr(100, 121, 2) == pytest.approx(0.10)
+    np.testing.assert_allclose(cagr([100, 100], [110, 121], [1, 2]), [0.10, 0.10])
+
+
+def test_sharpe_ratio_matches_formula():
+    returns = np.array([0.01, -0.005, 0.02, 0.0, 0.015])
+    excess = returns - 0.06 / 252
+    expected = excess.mean() / excess.std(ddof=1) * np.sqrt(252)
+    assert sharpe_ratio(returns, risk_free_rate=0.06)[0] == pytest.approx(expected)
+
+
+def test_sharpe_ratio_is_zero_without_volatility():
+    assert sharpe_ratio(np.full(10, 0.001))[0] == 0.0
+
+
+def test_max_drawdown():
+    np.testing.assert_allclose(max_drawdown([[100, 120, 90, 130, 65], [1, 2, 3, 4, 5]]), [-0.5, 0.0])
+
+
+def test_sip_future_value_without_return_is_the_amount_invested():
+    assert sip_future_value(10000, 0.0, 5) == pytest.approx(10000 * 60)
+
+
+def test_sip_future_value_matches_month_by_month():
+    monthly_rate = 1.12 ** (1 / 12) - 1
+    value = 0.0
+    for _ in range(36):
+        value = (value + 5000) * (1 + monthly_rate)
+    assert sip_future_value(5000, 0.12, 3) == pytest.approx(value)
+
+
+def test_sip_future_value_broadcasts_scenarios_by_horizon():
+    result = sip_future_value(1000, np.array([0.05, 0.1])[:, None], np.array([1, 5, 10])[None, :])
+    assert result.shape == (2, 3)
+    assert (np.diff(result, axis=0) > 0).all() and (np.diff(result, axis=1) > 0).all()
+
+
+@pytest.mark.parametrize("v, expected", [
+    ([2.0, 0.0, 0.0], [1.0, 0.0, 0.0]),
+    ([0.5, 0.5, 0.5], [1 / 3, 1 / 3, 1 / 3]),
+    ([0.2, 0.3, 0.5], [0.2, 0.3, 0.5]),
+    ([-1.0, 0.5, 1.0], [0.0, 0.25, 0.75]),
+])
+def test_project_to_simplex(v, expected):
+    np.testing.assert_allclose(_project_to_simplex(np.array(v)), expected, atol=1e-12)
+
+
+def test_project_to_bounded_simplex_respects_bounds():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        w = _project_to_bounded_simplex(rng.normal(0, 1, len(ASSET_CLASSES)), LOWER_BOUNDS, UPPER_BOUNDS)
+        assert w.sum() == pytest.approx(1.0)
+        assert (w >= LOWER_BOUNDS - 1e-9).all() and (w <= UPPER_BOUNDS + 1e-9).all()
+
+
+def _weights(risk_level):
+    allocation = allocation_for_risk_level(risk_level)
+    return np.array([allocation[a] for a in ASSET_CLASSES])
+
+
+def test_allocation_risk_is_monotonic_in_risk_level():
+    stats = [portfolio_statistics(_weights(level)) for level in ("low", "medium", "high")]
+    volatilities = [s["volatility"] for s in stats]
+    returns = [s["expected_return"] for s in stats]
+    assert volatilities == sorted(volatilities) and len(set(volatilities)) == 3
+    assert returns == sorted(returns) and len(set(returns)) == 3
+    equity = [_weights(level)[:3].sum() for level in ("low", "medium", "high")]
+    assert equity == sorted(equity)
+
+
+@pytest.mark.parametrize("risk_level", ["low", "medium", "high"])
+def test_allocation_is_bounded_and_not_small_cap_heavy(risk_level):
+    allocation = allocation_for_risk_level(risk_level)
+    assert sum(allocation.values()) == pytest.approx(1.0)
+    for asset, (low, high) in zip(ASSET_CLASSES, zip(LOWER_BOUNDS, UPPER_BOUNDS)):
+        assert low - 1e-6 <= allocation[asset] <= high + 1e-6
+    assert allocation["large_cap"] >= allocation["small_cap"]
+
+
+def test_allocation_uses_the_plan_cache_risk_buckets():
+    assert allocation_for_risk_level("aggressive") == allocation_for_risk_level("high")
+    assert allocation_for_risk_level("Conservative") == allocation_for_risk_level("low")
+    assert allocation_for_risk_level("unknown") == allocation_for_risk_level("medium")
+
+
+def test_allocation_is_optimized_once_per_bucket_and_returned_as_a_copy():
+    allocation = allocation_for_risk_level("high")
+    allocation["large_cap"] = 1.0
+    hits = _bucket_weights.cache_info().hits
+    assert allocation_for_risk_level("Aggressive")["large_cap"] < 1.0
+    assert _bucket_weights.cache_info().hits == hits + 1
+
+
+@pytest.mark.parametrize("duration, years", [
+    ("Less than 1 year", 0.5),
+    ("1-3 years", 3.0),
+    ("3-5 years", 5.0),
+    ("10+ years", 10.0),
+    ("6 months", 0.5),
+    ("long term", 7.0),
+    (None, 5.0),
+])
+def test_parse_duration_years(duration, years):
+    assert parse_duration_years(duration) == pytest.approx(years)
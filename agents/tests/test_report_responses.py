@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from starlette.requests import Request
+
+from common.report_responses import report_not_modified_response, report_validators
+from common.report_store import StoredReport
+
+REPORT = StoredReport(
+    namespace="equity", filename="plan.md", digest="ab" * 32, size=10, stored_size=8,
+    created_at=1_700_000_000.0, codec="zlib", path=Path("unused"),
+)
+
+
+def _request(etag: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"if-none-match", etag.encode())]})
+
+
+def test_json_representation_has_its_own_etag():
+    raw, wrapped = report_validators(REPORT)["ETag"], report_validators(REPORT, "json")["ETag"]
+    assert raw != wrapped
+    assert report_not_modified_response(_request(raw), REPORT, "json") is None
+    assert report_not_modified_response(_request(wrapped), REPORT) is None
+
+
+def test_matching_etag_is_not_modified():
+    wrapped = report_validators(REPORT, "json")["ETag"]
+    assert report_not_modified_response(_request(wrapped), REPORT, "json").status_code == 304
+    raw = report_validators(REPORT)["ETag"]
+    assert report_not_modified_response(_request(raw), REPORT).status_code == 304
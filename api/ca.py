@@ -1,6 +1,7 @@
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -1,6 +1,8 @@
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+# Agents share top-level helpers (e.g. common/) imported without the agents. prefix
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,7 +15,9 @@ from agents.ITR_agent.router import router as itr_router
 from agents.equity_agent.router import router as equity_router
 from agents.assest_agent.router import router as asset_router
 from agents.chatbot.router import router as chatbot_router
-from agents.pict_route import router as pict_router
+# Top-level like the CA agent's import, so both share one PictorialCache
+from pict_route import router as pict_router
+from common.readiness import readiness
 
 # Create FastAPI app
 app = FastAPI(title="FinAI API", version="1.0.0")
@@ -57,7 +61,13 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "service": "FinAI API"}
+    return {**readiness.liveness(), "service": "FinAI API"}
+
+@app.get("/api/ready")
+async def ready_check():
+    # No lifespan events under Mangum, so the check loop starts on the first probe
+    readiness.ensure_started()
+    return readiness.readiness_response()
 
 # Mangum handler for Vercel
 handler = Mangum(app)
\ No newline at end of file
@@ -3,14 +3,17 @@ import { NextRequest, NextResponse } from 'next/server'
 export async function POST(request: NextRequest) {
   try {
     const formData = await request.formData()
-    const markdownInput = formData.get('markdown_input') as string
+    const markdownInput = formData.get('markdown_input') as string | null
+    const docId = formData.get('doc_id') as string | null
     const userQuestion = formData.get('user_question') as string
+    const sessionId = formData.get('session_id') as string | null
+    const stream = formData.get('stream') === 'true'
 
-    if (!markdownInput || !userQuestion) {
+    if ((!markdownInput && !docId) || !userQuestion) {
       return NextResponse.json(
         { 
           success: false, 
-          error: 'Both markdown_input and user_question are required' 
+          error: 'user_question and either doc_id or markdown_input are required' 
         },
         { status: 400 }
       )
@@ -18,20 +21,42 @@ export async function POST(request: NextRequest) {
 
     // Forward the request to the Python backend
     const backendFormData = new FormData()
-    backendFormData.append('markdown_input', markdownInput)
+    if (docId) backendFormData.append('doc_id', docId)
+    if (markdownInput) backendFormData.append('markdown_input', markdownInput)
     backendFormData.append('user_question', userQuestion)
+    if (sessionId) backendFormData.append('session_id', sessionId)
 
-    const response = await fetch('http://localhost:8000/chatbot/chat', {
+    const response = await fetch(`http://localhost:8000/chatbot/chat${stream ? '/stream' : ''}`, {
       method: 'POST',
       body: backendFormData,
+      // Aborts the backend request (and its Gemini stream) when the browser disconnects
+      signal: request.signal,
     })
 
-    if (!response.ok) {
+    // Pass Server-Sent Events straight through without buffering
+    if (stream && response.ok && response.body) {
+      return new Response(response.body, {
+        headers: {
+          'Content-Type': 'text/event-stream',
+          'Cache-Control': 'no-cache, no-transform',
+          'Connection': 'keep-alive',
+          'X-Accel-Buffering': 'no',
+        },
+      })
+    }
+
+    // 404 means the doc_id expired on the server; pass it on so the client re-registers.
+    // 429 means the assistant is busy; pass it on with its Retry-After
+    if (!response.ok && ![404, 429].includes(response.status)) {
       throw new Error(`Backend responded with status: ${response.status}`)
     }
 
     const data = await response.json()
-    return NextResponse.json(data)
+    const retryAfter = response.headers.get('Retry-After')
+    return NextResponse.json(data, {
+      status: response.status,
+      headers: retryAfter ? { 'Retry-After': retryAfter } : undefined,
+    })
 
   } catch (error) {
     console.error('Chatbot API Error:', error)
@@ -50,7 +75,8 @@ export async function GET() {
     { 
       message: 'Chatbot API is running. Use POST method to send chat requests.',
       endpoints: {
-        chat: 'POST /api/chatbot/chat'
+        chat: 'POST /api/chatbot/chat (stream=true for Server-Sent Events)',
+        documents: 'POST /api/chatbot/documents'
       }
     }
   )
@@ -0,0 +1,44 @@
+import { NextRequest, NextResponse } from 'next/server'
+
+export async function POST(request: NextRequest) {
+  try {
+    const formData = await request.formData()
+    const markdownInput = formData.get('markdown_input') as string
+
+    if (!markdownInput) {
+      return NextResponse.json(
+        { 
+          success: false, 
+          error: 'markdown_input is required' 
+        },
+        { status: 400 }
+      )
+    }
+
+    // Register the report once; chat requests then reference it by doc_id
+    const backendFormData = new FormData()
+    backendFormData.append('markdown_input', markdownInput)
+
+    const response = await fetch('http://localhost:8000/chatbot/documents', {
+      method: 'POST',
+      body: backendFormData,
+    })
+
+    if (!response.ok) {
+      throw new Error(`Backend responded with status: ${response.status}`)
+    }
+
+    const data = await response.json()
+    return NextResponse.json(data)
+
+  } catch (error) {
+    console.error('Chatbot document registration error:', error)
+    return NextResponse.json(
+      { 
+        success: false, 
+        error: 'Failed to register the report. Please ensure the backend server is running.' 
+      },
+      { status: 500 }
+    )
+  }
+}
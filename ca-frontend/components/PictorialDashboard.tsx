@@ -286,6 +286,21 @@ interface PictorialData {
   asset_breakdown?: AssetBreakdown;
 }
 
+// Dashboard sections that get a loading placeholder until they arrive from the stream
+const STREAMED_SECTIONS: { key: keyof PictorialData; label: string; reportTypes?: string[] }[] = [
+  { key: 'tax_regime_comparison', label: 'Tax Regime Comparison', reportTypes: ['salaried'] },
+  { key: 'income_sources', label: 'Income & Expense Breakdown' },
+  { key: 'business_kpis', label: 'Business KPIs', reportTypes: ['self_employed', 'business', 'corporate'] },
+  { key: 'quarterly_performance', label: 'Quarterly Performance', reportTypes: ['self_employed', 'business', 'corporate'] },
+  { key: 'cost_structure', label: 'Cost Structure', reportTypes: ['self_employed', 'business', 'corporate'] },
+  { key: 'asset_breakdown', label: 'Asset Breakdown', reportTypes: ['self_employed', 'business', 'corporate'] },
+  { key: 'key_metrics', label: 'Key Financial Metrics' },
+  { key: 'highlights', label: 'Key Highlights' },
+  { key: 'charts_data', label: 'Financial Visualizations' },
+  { key: 'risk_alerts', label: 'Risk Analysis' },
+  { key: 'recommendations', label: 'AI Recommendations' }
+];
+
 interface PictorialDashboardProps {
   markdownContent: string;
   reportType: string;
@@ -294,6 +309,7 @@ interface PictorialDashboardProps {
 export default function PictorialDashboard({ markdownContent, reportType }: PictorialDashboardProps) {
   const [data, setData] = useState<PictorialData | null>(null);
   const [loading, setLoading] = useState(true);
+  const [streaming, setStreaming] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [isVisible, setIsVisible] = useState(true);
 
@@ -420,12 +436,47 @@ export default function PictorialDashboard({ markdownContent, reportType }: Pict
     }
   };
 
+  // Read the Server-Sent Events stream, showing each section as soon as it arrives.
+  // Only received sections are shown meanwhile; the rest keep their loading placeholders.
+  const readSectionStream = async (response: Response, received: Partial<PictorialData>) => {
+    const reader = response.body!.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const events = buffer.split('\n\n');
+      buffer = events.pop() || '';
+      for (const raw of events) {
+        const event = raw.match(/^event: (.*)$/m)?.[1];
+        const data = raw.match(/^data: (.*)$/m)?.[1];
+        if (!event || !data) continue;
+        const payload = JSON.parse(data);
+        if (event === 'section') {
+          (received as Record<string, unknown>)[payload.key] = payload.value;
+          setData({ ...received } as PictorialData);
+          setLoading(false);
+        } else if (event === 'error') {
+          throw new Error(payload.error || 'Failed to extract pictorial data');
+        }
+      }
+    }
+  };
+
   const extractPictorialData = async () => {
+    // Merge API data with fallback data to ensure all components have data
+    const fallbackData = getFallbackDataByUserType(reportType);
+    const received: Partial<PictorialData> = {};
     try {
       setLoading(true);
+      setStreaming(true);
+      setData(null);
       setError(null);
 
-      const response = await fetch('http://127.0.0.1:8000/api/extract-pictorial-data', {
+      const response = await fetch('http://127.0.0.1:8000/api/extract-pictorial-data/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -440,22 +491,18 @@ export default function PictorialDashboard({ markdownContent, reportType }: Pict
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const pictorialData = await response.json();
-      
-      // Merge API data with fallback data to ensure all components have data
-      const fallbackData = getFallbackDataByUserType(reportType);
-      const mergedData = { ...fallbackData, ...pictorialData };
-      
-      setData(mergedData);
+      await readSectionStream(response, received);
+      // Sections the report has no data for fall back once the stream is done
+      setData({ ...fallbackData, ...received });
     } catch (err) {
       console.error('Error extracting pictorial data:', err);
       
-      // Even on error, provide fallback data so components can still render
-      const fallbackData = getFallbackDataByUserType(reportType);
-      setData(fallbackData);
+      // Even on error, keep what has arrived (with fallbacks for the rest) so components can still render
+      setData({ ...fallbackData, ...received });
       setError(err instanceof Error ? err.message : 'Unknown error occurred');
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -560,6 +607,11 @@ export default function PictorialDashboard({ markdownContent, reportType }: Pict
 
   if (!data) return null;
 
+  const pendingSections = streaming
+    ? STREAMED_SECTIONS.filter(section =>
+        (!section.reportTypes || section.reportTypes.includes(reportType.toLowerCase())) && data[section.key] === undefined)
+    : [];
+
   return (
     <motion.div
       initial={{ opacity: 0, y: 20 }}
@@ -577,6 +629,12 @@ export default function PictorialDashboard({ markdownContent, reportType }: Pict
             <p className="text-gray-600">
               AI-powered insights and visualizations from your CA report
             </p>
+            {streaming && (
+              <p className="text-sm text-amber-700 mt-1 flex items-center">
+                <span className="animate-spin rounded-full h-3 w-3 border-b-2 border-amber-600 mr-2"></span>
+                Generating remaining sections...
+              </p>
+            )}
           </div>
           <Button
             onClick={() => setIsVisible(!isVisible)}
@@ -945,6 +1003,22 @@ export default function PictorialDashboard({ markdownContent, reportType }: Pict
                   </div>
                 </motion.section>
               )}
+
+              {/* Placeholders for sections still being generated */}
+              {pendingSections.length > 0 && (
+                <section className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+                  {pendingSections.map(section => (
+                    <Card key={section.key} className="animate-pulse border-amber-200">
+                      <CardContent className="p-6">
+                        <h4 className="font-semibold text-gray-500 mb-4">{section.label}</h4>
+                        <div className="h-4 bg-amber-100 rounded w-3/4 mb-3"></div>
+                        <div className="h-4 bg-amber-100 rounded w-1/2 mb-3"></div>
+                        <div className="h-24 bg-amber-50 rounded"></div>
+                      </CardContent>
+                    </Card>
+                  ))}
+                </section>
+              )}
             </motion.div>
           )}
         </AnimatePresence>
@@ -21,6 +21,10 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
   const [inputMessage, setInputMessage] = useState('')
   const [isLoading, setIsLoading] = useState(false)
   const [reportData, setReportData] = useState<string>('')
+  const docIdRef = useRef<string | null>(null)
+  // Server-side conversation memory; a new report starts a new conversation
+  const sessionIdRef = useRef<string>(crypto.randomUUID())
+  const abortRef = useRef<AbortController | null>(null)
   const messagesEndRef = useRef<HTMLDivElement>(null)
 
   // Load report data based on report type
@@ -58,11 +62,16 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
           break
       }
       setReportData(data)
+      docIdRef.current = null
+      sessionIdRef.current = crypto.randomUUID()
     } catch (error) {
       console.error('Error loading report data:', error)
     }
   }, [reportType])
 
+  // Stop any answer still streaming when the overlay unmounts
+  useEffect(() => () => abortRef.current?.abort(), [])
+
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
@@ -82,6 +91,77 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
     }
   }, [reportType, messages.length])
 
+  // Register the report once so each question only sends its doc_id
+  const registerReport = async (): Promise<string | null> => {
+    try {
+      const formData = new FormData()
+      formData.append('markdown_input', reportData)
+      const response = await fetch('/api/chatbot/documents', {
+        method: 'POST',
+        body: formData
+      })
+      const data = await response.json()
+      docIdRef.current = data.success ? data.doc_id : null
+    } catch (error) {
+      console.error('Error registering report:', error)
+      docIdRef.current = null
+    }
+    return docIdRef.current
+  }
+
+  const askQuestion = async (question: string, docId: string | null) => {
+    const formData = new FormData()
+    if (docId) {
+      formData.append('doc_id', docId)
+    } else {
+      // Registration failed; fall back to sending the report with the question
+      formData.append('markdown_input', reportData)
+    }
+    formData.append('user_question', question)
+    formData.append('session_id', sessionIdRef.current)
+    formData.append('stream', 'true')
+
+    return fetch('/api/chatbot/chat', {
+      method: 'POST',
+      body: formData,
+      signal: abortRef.current?.signal
+    })
+  }
+
+  // Read Server-Sent Events from the chat stream, updating the bot message as tokens arrive
+  const readAnswerStream = async (response: Response, messageId: string) => {
+    const reader = response.body!.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let answer = ''
+
+    const updateMessage = (content: string) =>
+      setMessages(prev => prev.map(m => (m.id === messageId ? { ...m, content } : m)))
+
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+
+      const events = buffer.split('\n\n')
+      buffer = events.pop() || ''
+      for (const raw of events) {
+        const event = raw.match(/^event: (.*)$/m)?.[1]
+        const data = raw.match(/^data: (.*)$/m)?.[1]
+        if (!event || !data) continue
+        const payload = JSON.parse(data)
+        if (event === 'token') {
+          answer += payload.text
+          updateMessage(answer)
+        } else if (event === 'done') {
+          updateMessage(payload.response)
+        } else if (event === 'error') {
+          throw new Error(payload.error || 'Failed to get response')
+        }
+      }
+    }
+  }
+
   const sendMessage = async () => {
     if (!inputMessage.trim() || isLoading) return
 
@@ -95,16 +175,22 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
     setMessages(prev => [...prev, userMessage])
     setInputMessage('')
     setIsLoading(true)
+    abortRef.current = new AbortController()
 
     try {
-      const formData = new FormData()
-      formData.append('markdown_input', reportData)
-      formData.append('user_question', inputMessage)
+      const question = userMessage.content
+      let response = await askQuestion(question, docIdRef.current ?? await registerReport())
+      if (response.status === 404) {
+        // The server evicted the report; register it again and retry once
+        response = await askQuestion(question, await registerReport())
+      }
 
-      const response = await fetch('/api/chatbot/chat', {
-        method: 'POST',
-        body: formData
-      })
+      if (response.ok && response.headers.get('content-type')?.includes('text/event-stream')) {
+        const botMessageId = (Date.now() + 1).toString()
+        setMessages(prev => [...prev, { id: botMessageId, type: 'bot', content: '', timestamp: new Date() }])
+        await readAnswerStream(response, botMessageId)
+        return
+      }
 
       const data = await response.json()
 
@@ -120,6 +206,7 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
         throw new Error(data.error || 'Failed to get response')
       }
     } catch (error) {
+      if (error instanceof DOMException && error.name === 'AbortError') return
       console.error('Error sending message:', error)
       let errorContent = 'Sorry, I encountered an error while processing your question. Please try again later.'
       
@@ -128,6 +215,9 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
           errorContent = 'Unable to connect to the AI service. Please check if the backend server is running and try again.'
         } else if (error.message.includes('NetworkError')) {
           errorContent = 'Network error occurred. Please check your internet connection and try again.'
+        } else if (error.message.includes('busy')) {
+          // 429 from the backend queue; its message already says to retry shortly
+          errorContent = error.message
         }
       }
       
@@ -137,7 +227,8 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
         content: errorContent,
         timestamp: new Date()
       }
-      setMessages(prev => [...prev, errorMessage])
+      // Drop the empty bubble of a stream that failed before its first token
+      setMessages(prev => [...prev.filter(m => m.content), errorMessage])
     } finally {
       setIsLoading(false)
     }
@@ -232,7 +323,10 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
                 </div>
               </div>
               <button
-                onClick={() => setIsOpen(false)}
+                onClick={() => {
+                  abortRef.current?.abort()
+                  setIsOpen(false)
+                }}
                 className="text-white/80 hover:text-white transition-colors"
               >
                 <X className="w-5 h-5" />
@@ -276,8 +370,8 @@ export default function ChatbotOverlay({ reportType }: ChatbotOverlayProps) {
                 </div>
               ))}
               
-              {/* Loading indicator */}
-              {isLoading && (
+              {/* Loading indicator (hidden once a streamed answer starts) */}
+              {isLoading && messages[messages.length - 1]?.type !== 'bot' && (
                 <div className="flex justify-start">
                   <div className="bg-gray-100 p-3 rounded-2xl">
                     <div className="flex items-center space-x-2">